@@ -7,7 +7,7 @@ from typing import Sequence, Union
 
 from sqlalchemy import engine_from_config, pool
 from sqlalchemy.engine import Connection
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from alembic import context
 
@@ -28,7 +28,7 @@ if config.config_file_name is not None:
 # Load app metadata & DB URL
 # ------------------------------------------------------------
 # We import the app's DB normalizer and models so autogenerate can see them.
-from app.db import DB_URL
+from app.db import DB_URL, engine as app_engine
 
 # Import models to register tables with SQLAlchemy's registry
 from app.models.skip import Base as SkipBase  
@@ -89,19 +89,24 @@ def run_migrations_online() -> None:
     """Run migrations in 'online' mode with async engine."""
     connectable: Union[AsyncEngine, Connection]
 
-    # Use async engine for async drivers (postgresql+asyncpg / sqlite+aiosqlite)
-    if DB_URL.startswith("postgresql+") or DB_URL.startswith("sqlite+"):
-        connectable = create_async_engine(DB_URL, poolclass=pool.NullPool)
+    # Use the app's registered engine for async drivers (postgresql+asyncpg / sqlite+aiosqlite)
+    # so migrations get the same URL normalisation, SSL context and pool settings as the app.
+    db_url = DB_URL.render_as_string(hide_password=False)
+    if db_url.startswith("postgresql+") or db_url.startswith("sqlite+"):
+        connectable = app_engine
 
         async def _run_async_migrations() -> None:
-            async with connectable.connect() as connection:  # type: ignore[assignment]
-                await connection.run_sync(do_run_migrations)
+            try:
+                async with connectable.connect() as connection:  # type: ignore[assignment]
+                    await connection.run_sync(do_run_migrations)
+            finally:
+                await app_engine.dispose()
 
         asyncio.run(_run_async_migrations())
     else:
         # Fallback to sync engine if a sync driver is used
         config_section = config.get_section(config.config_ini_section) or {}
-        config_section["sqlalchemy.url"] = DB_URL
+        config_section["sqlalchemy.url"] = db_url
         connectable = engine_from_config(
             config_section,
             prefix="sqlalchemy.",
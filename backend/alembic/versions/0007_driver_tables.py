@@ -26,7 +26,7 @@ def upgrade():
         sa.Column("driver_user_id", sa.String(length=36), nullable=False),
         sa.Column("skip_id", sa.String(length=36), nullable=False),
         sa.Column("status", sa.String(length=20), nullable=False, server_default="assigned"),
-        sa.Column("open", sa.Boolean(), nullable=False, server_default=sa.text("1")),
+        sa.Column("open", sa.Boolean(), nullable=False, server_default=sa.true()),
         sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("(datetime('now'))")),
         sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.text("(datetime('now'))")),
     )
@@ -1,5 +1,6 @@
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
 
 # revision identifiers, used by Alembic.
 revision = "0008_admin_core"
@@ -16,7 +17,7 @@ def upgrade() -> None:
         sa.Column("email", sa.String(), nullable=True),
         sa.Column("phone", sa.String(), nullable=True),
         sa.Column("billing_address", sa.String(), nullable=True),
-        sa.Column("active", sa.Boolean(), nullable=False, server_default=sa.text("1")),
+        sa.Column("active", sa.Boolean(), nullable=False, server_default=sa.true()),
         sa.Column("created_at", sa.DateTime(), server_default=sa.text("(CURRENT_TIMESTAMP)")),
         sa.Column("updated_at", sa.DateTime(), nullable=True),
     )
@@ -27,20 +28,25 @@ def upgrade() -> None:
         sa.Column("make_model", sa.String(), nullable=True),
         sa.Column("capacity_kg", sa.Float(), nullable=True),
         sa.Column("contractor_id", sa.String(), sa.ForeignKey("contractors.id", ondelete="SET NULL")),
-        sa.Column("active", sa.Boolean(), nullable=False, server_default=sa.text("1")),
+        sa.Column("active", sa.Boolean(), nullable=False, server_default=sa.true()),
     )
     op.create_table(
         "skip_assignments",
         sa.Column("id", sa.String(), primary_key=True),
-        sa.Column("skip_id", sa.String(), sa.ForeignKey("skips.id", ondelete="CASCADE"), nullable=False),
+        sa.Column(
+            "skip_id",
+            UUID(as_uuid=True).with_variant(sa.String(36), "sqlite"),  # same type as skips.id
+            sa.ForeignKey("skips.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
         sa.Column("contractor_id", sa.String(), sa.ForeignKey("contractors.id", ondelete="CASCADE"), nullable=False),
         sa.Column("assigned_at", sa.DateTime(), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=False),
         sa.Column("unassigned_at", sa.DateTime(), nullable=True),
+        # inline, not ALTER TABLE ... ADD CONSTRAINT: SQLite cannot add one later
+        sa.UniqueConstraint("skip_id", "unassigned_at", name="uq_skip_active_assignment"),
     )
-    op.create_unique_constraint("uq_skip_active_assignment", "skip_assignments", ["skip_id", "unassigned_at"])
 
 def downgrade() -> None:
-    op.drop_constraint("uq_skip_active_assignment", "skip_assignments", type_="unique")
     op.drop_table("skip_assignments")
     op.drop_table("vehicles")
     op.drop_table("contractors")
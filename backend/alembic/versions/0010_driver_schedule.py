@@ -23,7 +23,7 @@ def upgrade() -> None:
         sa.Column("gross_kg", sa.Float(), nullable=True),
         sa.Column("tare_kg", sa.Float(), nullable=True),
         sa.Column("scheduled_at", sa.DateTime(), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=False),
-        sa.Column("done", sa.Boolean(), nullable=False, server_default=sa.text("0")),
+        sa.Column("done", sa.Boolean(), nullable=False, server_default=sa.false()),
         sa.Column("completed_at", sa.DateTime(), nullable=True),
         sa.Column("created_at", sa.DateTime(), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=False),
     )
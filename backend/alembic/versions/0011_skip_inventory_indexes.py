@@ -0,0 +1,32 @@
+# path: backend/alembic/versions/0011_skip_inventory_indexes.py
+"""partial (filter, created_at, id) indexes for the keyset skip inventory"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011_skip_inventory_indexes"
+down_revision = "0010_driver_schedule"
+branch_labels = None
+depends_on = None
+
+_LIVE = sa.text("deleted_at IS NULL")
+
+# name -> leading filter column (None = unfiltered listing)
+_INDEXES = {
+    "ix_skips_live_created": None,
+    "ix_skips_live_status": "status",
+    "ix_skips_live_zone": "zone_id",
+    "ix_skips_live_owner": "owner_org_id",
+    "ix_skips_live_commodity": "assigned_commodity_id",
+}
+
+
+def upgrade() -> None:
+    for name, col in _INDEXES.items():
+        cols = ([col] if col else []) + ["created_at", "id"]
+        op.create_index(name, "skips", cols, postgresql_where=_LIVE, sqlite_where=_LIVE)
+
+
+def downgrade() -> None:
+    for name in reversed(list(_INDEXES)):
+        op.drop_index(name, table_name="skips")
@@ -0,0 +1,32 @@
+# path: backend/alembic/versions/0012_skip_summary.py
+"""skip_summary: live skip counts per (owner_org_id, zone_id, status)"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0012_skip_summary"
+down_revision = "0011_skip_inventory_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "skip_summary",
+        sa.Column("owner_org_id", sa.String(36), primary_key=True, server_default=""),
+        sa.Column("zone_id", sa.String(36), primary_key=True, server_default=""),
+        sa.Column("status", sa.String(32), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=False),
+    )
+    # backfill; from here on the app keeps it current
+    op.execute(
+        "INSERT INTO skip_summary (owner_org_id, zone_id, status, count) "
+        "SELECT COALESCE(CAST(owner_org_id AS VARCHAR(36)), ''), COALESCE(CAST(zone_id AS VARCHAR(36)), ''), status, COUNT(*) "
+        "FROM skips WHERE deleted_at IS NULL "
+        "GROUP BY COALESCE(CAST(owner_org_id AS VARCHAR(36)), ''), COALESCE(CAST(zone_id AS VARCHAR(36)), ''), status"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("skip_summary")
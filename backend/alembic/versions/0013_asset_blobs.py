@@ -0,0 +1,98 @@
+# path: backend/alembic/versions/0013_asset_blobs.py
+"""content-addressed asset_blobs; dedupe skip_assets.bytes into it"""
+
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0013_asset_blobs"
+down_revision = "0012_skip_summary"
+branch_labels = None
+depends_on = None
+
+_CHUNK = 500
+
+blobs = sa.table(
+    "asset_blobs",
+    sa.column("sha256", sa.String),
+    sa.column("size", sa.Integer),
+    sa.column("content_type", sa.String),
+    sa.column("refcount", sa.Integer),
+    sa.column("bytes", sa.LargeBinary),
+)
+assets = sa.table(
+    "skip_assets",
+    sa.column("id", sa.String),
+    sa.column("content_type", sa.String),
+    sa.column("blob_sha256", sa.String),
+    sa.column("bytes", sa.LargeBinary),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "asset_blobs",
+        sa.Column("sha256", sa.String(64), primary_key=True),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("content_type", sa.String(64), nullable=False),
+        sa.Column("refcount", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("bytes", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=False),
+    )
+    with op.batch_alter_table("skip_assets") as batch:
+        batch.add_column(sa.Column("blob_sha256", sa.String(64), nullable=True))
+        batch.alter_column("bytes", existing_type=sa.LargeBinary(), nullable=True)
+        batch.create_foreign_key("fk_skip_assets_blob", "asset_blobs", ["blob_sha256"], ["sha256"])
+    op.create_index("ix_skip_assets_blob_sha256", "skip_assets", ["blob_sha256"])
+
+    # move inline bytes into blobs, a chunk at a time (ordered by id, so no OFFSET)
+    conn = op.get_bind()
+    refs: dict[str, int] = {}
+    while True:
+        rows = conn.execute(
+            sa.select(assets.c.id, assets.c.content_type, assets.c.bytes)
+            .where(assets.c.blob_sha256.is_(None), assets.c.bytes.isnot(None))
+            .order_by(assets.c.id)
+            .limit(_CHUNK)
+        ).all()
+        if not rows:
+            break
+        fresh = {}
+        links = []
+        for aid, ct, data in rows:
+            sha = hashlib.sha256(bytes(data)).hexdigest()
+            if sha not in refs and sha not in fresh:
+                fresh[sha] = {"sha256": sha, "size": len(data), "content_type": ct, "refcount": 0, "bytes": bytes(data)}
+            refs[sha] = refs.get(sha, 0) + 1
+            links.append({"a_id": aid, "a_sha": sha})
+        if fresh:
+            conn.execute(blobs.insert(), list(fresh.values()))
+        conn.execute(
+            assets.update()
+            .where(assets.c.id == sa.bindparam("a_id"))
+            .values(blob_sha256=sa.bindparam("a_sha"), bytes=None),
+            links,
+        )
+    if refs:
+        conn.execute(
+            blobs.update().where(blobs.c.sha256 == sa.bindparam("b_sha")).values(refcount=sa.bindparam("b_n")),
+            [{"b_sha": k, "b_n": v} for k, v in refs.items()],
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(
+        assets.update()
+        .where(assets.c.blob_sha256.isnot(None))
+        .values(
+            bytes=sa.select(blobs.c.bytes).where(blobs.c.sha256 == assets.c.blob_sha256).scalar_subquery()
+        )
+    )
+    op.drop_index("ix_skip_assets_blob_sha256", table_name="skip_assets")
+    with op.batch_alter_table("skip_assets") as batch:
+        batch.drop_constraint("fk_skip_assets_blob", type_="foreignkey")
+        batch.drop_column("blob_sha256")
+        batch.alter_column("bytes", existing_type=sa.LargeBinary(), nullable=False)
+    op.drop_table("asset_blobs")
@@ -0,0 +1,24 @@
+# path: backend/alembic/versions/0014_asset_blob_path.py
+"""asset_blobs.path: bytes may live in the asset store instead of the row"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0014_asset_blob_path"
+down_revision = "0013_asset_blobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # existing bytes stay put; scripts/migrate_assets_to_store.py moves them out
+    with op.batch_alter_table("asset_blobs") as batch:
+        batch.add_column(sa.Column("path", sa.String(255), nullable=True))
+        batch.alter_column("bytes", existing_type=sa.LargeBinary(), nullable=True)
+
+
+def downgrade() -> None:
+    # run `scripts/migrate_assets_to_store.py --to-db` first, or file-held blobs lose their bytes
+    with op.batch_alter_table("asset_blobs") as batch:
+        batch.alter_column("bytes", existing_type=sa.LargeBinary(), nullable=False)
+        batch.drop_column("path")
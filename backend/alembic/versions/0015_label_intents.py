@@ -0,0 +1,31 @@
+# path: backend/alembic/versions/0015_label_intents.py
+"""label_intents: skips whose labels render on first request (LABEL_RENDER_MODE=lazy)"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0015_label_intents"
+down_revision = "0014_asset_blob_path"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "label_intents",
+        # same type as skips.id (0005): a VARCHAR key cannot reference a uuid column
+        sa.Column(
+            "skip_id",
+            UUID(as_uuid=True).with_variant(sa.String(36), "sqlite"),
+            sa.ForeignKey("skips.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("org_name", sa.String(80), nullable=False, server_default="OWNER"),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    # skips still pending lose their deferred labels; re-seed them (POST /skips/_seed) to render eagerly
+    op.drop_table("label_intents")
@@ -0,0 +1,30 @@
+# path: backend/alembic/versions/0016_normalise_asset_kinds.py
+"""skip_assets.kind: legacy spellings -> label_png / labels_pdf, so lookups are one indexed equality"""
+
+from alembic import op
+
+revision = "0016_normalise_asset_kinds"
+down_revision = "0015_label_intents"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # older writers used "pdf" / "png", or only got content_type right
+    op.execute(
+        "UPDATE skip_assets SET kind = 'labels_pdf' "
+        "WHERE kind <> 'labels_pdf' AND (kind = 'pdf' OR content_type = 'application/pdf')"
+    )
+    op.execute(
+        "UPDATE skip_assets SET kind = 'label_png' "
+        "WHERE kind <> 'label_png' AND (kind = 'png' OR content_type = 'image/png')"
+    )
+    # 0006 made it; databases bootstrapped with create_all and then stamped may not have it
+    op.create_index(
+        "ix_skip_assets_skip_kind", "skip_assets", ["skip_id", "kind", "idx"], unique=False, if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    # the old spellings are not recoverable and the readers that needed them are gone: nothing to undo
+    pass
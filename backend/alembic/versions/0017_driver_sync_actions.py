@@ -0,0 +1,26 @@
+# path: backend/alembic/versions/0017_driver_sync_actions.py
+"""driver_sync_actions: idempotency ledger for POST /driver/sync"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0017_driver_sync_actions"
+down_revision = "0016_normalise_asset_kinds"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "driver_sync_actions",
+        sa.Column("key", sa.String(100), primary_key=True),
+        sa.Column("action", sa.String(32), nullable=False),
+        sa.Column("skip_id", sa.String(36), nullable=True),
+        sa.Column("result", sa.Text(), nullable=True),
+        sa.Column("client_at", sa.DateTime(), nullable=True),
+        sa.Column("applied_at", sa.DateTime(), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("driver_sync_actions")
@@ -0,0 +1,29 @@
+# path: backend/alembic/versions/0018_idempotency_keys.py
+"""idempotency_keys: stored responses for the Idempotency-Key header"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0018_idempotency_keys"
+down_revision = "0017_driver_sync_actions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("scope", sa.String(64), primary_key=True),
+        sa.Column("fingerprint", sa.String(64), nullable=True),
+        sa.Column("status", sa.Integer(), nullable=True),
+        sa.Column("headers", sa.Text(), nullable=True),
+        sa.Column("body", sa.LargeBinary(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_keys_expires_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
@@ -0,0 +1,19 @@
+# path: backend/alembic/versions/0019_skip_version.py
+"""skips.version: compare-and-set counter for driver state changes"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0019_skip_version"
+down_revision = "0018_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("skips", sa.Column("version", sa.Integer(), server_default=sa.text("0"), nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("skips") as batch:
+        batch.drop_column("version")
@@ -0,0 +1,44 @@
+# path: backend/alembic/versions/0020_current_placement.py
+"""skips.current_placement_id + partial index on open skip_placements"""
+
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0020_current_placement"
+down_revision = "0019_skip_version"
+branch_labels = None
+depends_on = None
+
+_OPEN = sa.text("removed_at IS NULL")
+
+
+def _has_placements() -> bool:
+    # offline the chain is being built from scratch: 0022 creates the table, empty
+    return not context.is_offline_mode() and sa.inspect(op.get_bind()).has_table("skip_placements")
+
+
+def upgrade() -> None:
+    op.add_column("skips", sa.Column("current_placement_id", sa.String(36), nullable=True))
+    # skip_placements comes from 0022, or earlier from the dev create_all: only touch
+    # it if present
+    if not _has_placements():
+        return
+    op.create_index(
+        "ix_skip_placements_open", "skip_placements", ["skip_id", "placed_at"],
+        postgresql_where=_OPEN, sqlite_where=_OPEN, if_not_exists=True,
+    )
+    # backfill: the newest open placement (POST /admin/skips/placements/repair re-checks later)
+    op.execute(
+        "UPDATE skips SET current_placement_id = ("
+        " SELECT p.id FROM skip_placements p"
+        # skips.id is uuid on Postgres (0005), the placement's skip_id may be text
+        " WHERE CAST(p.skip_id AS VARCHAR(36)) = CAST(skips.id AS VARCHAR(36)) AND p.removed_at IS NULL"
+        " ORDER BY p.placed_at DESC, p.id DESC LIMIT 1)"
+    )
+
+
+def downgrade() -> None:
+    if _has_placements():
+        op.drop_index("ix_skip_placements_open", table_name="skip_placements", if_exists=True)
+    with op.batch_alter_table("skips") as batch:
+        batch.drop_column("current_placement_id")
@@ -0,0 +1,51 @@
+# path: backend/alembic/versions/0021_jobs_table.py
+"""jobs: admin-scheduled driver jobs (app.models.job)"""
+
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0021_jobs_table"
+down_revision = "0020_current_placement"
+branch_labels = None
+depends_on = None
+
+_JOB_TYPES = ("DELIVER_EMPTY", "RELOCATE_EMPTY", "COLLECT_FULL", "RETURN_EMPTY")
+_JOB_STATUSES = ("PENDING", "IN_PROGRESS", "DONE", "FAILED")
+
+
+def upgrade() -> None:
+    # dev databases already have it from create_all (offline: emit it)
+    if not context.is_offline_mode() and sa.inspect(op.get_bind()).has_table("jobs"):
+        return
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("type", sa.Enum(*_JOB_TYPES, name="jobtype"), nullable=False),
+        sa.Column("skip_qr", sa.String(64), nullable=True),
+        sa.Column("from_zone_id", sa.String(64), nullable=True),
+        sa.Column("to_zone_id", sa.String(64), nullable=True),
+        sa.Column("site_id", sa.String(64), nullable=True),
+        sa.Column("destination_type", sa.String(64), nullable=True),
+        sa.Column("destination_name", sa.String(128), nullable=True),
+        sa.Column("window_start", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("window_end", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("assigned_driver_id", sa.String(64), nullable=True),
+        sa.Column("assigned_vehicle_id", sa.String(64), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("status", sa.Enum(*_JOB_STATUSES, name="jobstatus"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_jobs_status", "jobs", ["status"])
+    op.create_index("ix_jobs_driver_status", "jobs", ["assigned_driver_id", "status"])
+    op.create_index("ix_jobs_window", "jobs", ["window_start", "window_end"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_window", table_name="jobs")
+    op.drop_index("ix_jobs_driver_status", table_name="jobs")
+    op.drop_index("ix_jobs_status", table_name="jobs")
+    op.drop_table("jobs")
+    if op.get_context().dialect.name == "postgresql":
+        op.execute("DROP TYPE IF EXISTS jobstatus")
+        op.execute("DROP TYPE IF EXISTS jobtype")
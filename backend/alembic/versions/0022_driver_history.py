@@ -0,0 +1,113 @@
+# path: backend/alembic/versions/0022_driver_history.py
+"""movements, weights, transfers, wtns, skip_placements (app.models.driver)"""
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0022_driver_history"
+down_revision = "0021_jobs_table"
+branch_labels = None
+depends_on = None
+
+_OPEN = sa.text("removed_at IS NULL")
+_MOVEMENT_TYPES = ("DELIVERY_EMPTY", "RELOCATION_EMPTY", "COLLECTION_FULL", "RETURN_EMPTY")
+_WEIGHT_SOURCES = ("LOAD_CELL", "WEIGHBRIDGE", "ESTIMATE")
+_DESTINATION_TYPES = ("RECYCLING", "LANDFILL", "SORTATION", "TRANSFER_STATION", "HAZARDOUS")
+
+
+def _skip_fk() -> sa.Column:
+    # same type as skips.id (0005)
+    return sa.Column(
+        "skip_id",
+        UUID(as_uuid=True).with_variant(sa.String(36), "sqlite"),
+        sa.ForeignKey("skips.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+
+def _missing(table: str) -> bool:
+    # dev databases already have them from create_all (offline: emit them)
+    return context.is_offline_mode() or not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    if _missing("skip_placements"):
+        op.create_table(
+            "skip_placements",
+            sa.Column("id", sa.String(36), primary_key=True),
+            _skip_fk(),
+            sa.Column("zone_id", sa.String(36), nullable=True),
+            sa.Column("placed_at", sa.DateTime(), nullable=False),
+            sa.Column("removed_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_skip_placements_skip_id", "skip_placements", ["skip_id"])
+        op.create_index(
+            "ix_skip_placements_open", "skip_placements", ["skip_id", "placed_at"],
+            postgresql_where=_OPEN, sqlite_where=_OPEN,
+        )
+    if _missing("movements"):
+        op.create_table(
+            "movements",
+            sa.Column("id", sa.String(36), primary_key=True),
+            _skip_fk(),
+            sa.Column("type", sa.Enum(*_MOVEMENT_TYPES, name="movementtype"), nullable=False),
+            sa.Column("from_zone_id", sa.String(36), nullable=True),
+            sa.Column("to_zone_id", sa.String(36), nullable=True),
+            sa.Column("when", sa.DateTime(), nullable=False),
+            sa.Column("driver_name", sa.String(120), nullable=True),
+            sa.Column("vehicle_reg", sa.String(64), nullable=True),
+            sa.Column("note", sa.String(300), nullable=True),
+        )
+        op.create_index("ix_movements_skip_id", "movements", ["skip_id"])
+    if _missing("weights"):
+        op.create_table(
+            "weights",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("movement_id", sa.String(36), sa.ForeignKey("movements.id", ondelete="CASCADE"), nullable=False, unique=True),
+            sa.Column("source", sa.Enum(*_WEIGHT_SOURCES, name="weightsource"), nullable=False),
+            sa.Column("gross_kg", sa.Float(), nullable=True),
+            sa.Column("tare_kg", sa.Float(), nullable=True),
+            sa.Column("net_kg", sa.Float(), nullable=True),
+            sa.Column("at", sa.DateTime(), nullable=False),
+        )
+    if _missing("transfers"):
+        op.create_table(
+            "transfers",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("movement_id", sa.String(36), sa.ForeignKey("movements.id", ondelete="CASCADE"), nullable=False, unique=True),
+            sa.Column("destination_type", sa.Enum(*_DESTINATION_TYPES, name="destinationtype"), nullable=False),
+            sa.Column("destination_name", sa.String(200), nullable=True),
+            sa.Column("destination_address", sa.String(300), nullable=True),
+            sa.Column("site_id", sa.String(36), nullable=True),
+            sa.Column("commodity_id", sa.String(36), nullable=True),
+            sa.Column("transfer_time", sa.DateTime(), nullable=False),
+        )
+    if _missing("wtns"):
+        op.create_table(
+            "wtns",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("transfer_id", sa.String(36), sa.ForeignKey("transfers.id", ondelete="CASCADE"), nullable=False, unique=True),
+            sa.Column("description", sa.String(300), nullable=False),
+            sa.Column("ewc_code", sa.String(20), nullable=True),
+            sa.Column("quantity_kg", sa.Float(), nullable=True),
+            sa.Column("producer_name", sa.String(120), nullable=True),
+            sa.Column("carrier_name", sa.String(120), nullable=True),
+            sa.Column("destination_name", sa.String(200), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    # movement history goes with it: only for a database built from migrations
+    op.drop_table("wtns")
+    op.drop_table("transfers")
+    op.drop_table("weights")
+    op.drop_index("ix_movements_skip_id", table_name="movements")
+    op.drop_table("movements")
+    op.drop_index("ix_skip_placements_open", table_name="skip_placements")
+    op.drop_index("ix_skip_placements_skip_id", table_name="skip_placements")
+    op.drop_table("skip_placements")
+    if op.get_context().dialect.name == "postgresql":
+        for name in ("destinationtype", "weightsource", "movementtype"):
+            op.execute(f"DROP TYPE IF EXISTS {name}")
@@ -1,13 +1,15 @@
 # path: backend/app/api/deps.py
 from __future__ import annotations
 
+import asyncio
 import os
 from typing import AsyncIterator, Optional, Dict, Any
 
-from fastapi import Header, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from fastapi import Header, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import engine
+from app.db import AsyncSessionLocal, ReadSessionLocal, REPLICA_MAY_LAG
+from app.core import timeouts
 try:
     # optional; we read ENV/admin key from settings if present
     from app.core.config import settings  # type: ignore
@@ -16,15 +18,74 @@ except Exception:
 
 # --- DB session dependency ------------------------------------------------------
 
-SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
+SessionLocal = AsyncSessionLocal  # bound to the shared engine in app.db
+ReadLocal = ReadSessionLocal      # replica if DATABASE_REPLICA_URL is set, else primary
+
+def _open(factory) -> AsyncSession:
+    session = factory()
+    session.info["wms_tracked"] = True
+    timeouts.session_opened()  # a request holding a session is not hard-cancelled on disconnect
+    return session
+
+async def _close(session: AsyncSession) -> None:
+    # Shielded so the connection always makes it back to the pool, even if
+    # the request is being cancelled around us.
+    if session.info.pop("wms_tracked", False):
+        timeouts.session_closed()
+    await asyncio.shield(session.close())
+
+async def release_db(session: AsyncSession) -> None:
+    """Return the connection early, e.g. before a slow render that needs no DB."""
+    await _close(session)
 
 async def get_db() -> AsyncIterator[AsyncSession]:
     """Yield an AsyncSession and ensure it closes cleanly."""
-    async with SessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+    session = _open(SessionLocal)
+    try:
+        yield session
+    finally:
+        await _close(session)
+
+# --- Read-only session (replica routing) ---------------------------------------
+
+# Clients echo either of these back to read their own writes while the replica catches up.
+DB_PIN_HEADER = "X-DB-Pin"
+DB_PIN_COOKIE = "wms_db_pin"
+
+def _pin_seconds() -> int:
+    return int(getattr(settings, "DB_REPLICA_PIN_SECONDS", 10) if settings else 10)
+
+def is_pinned_to_primary(request: Request) -> bool:
+    if getattr(request.state, "db_pin_primary", False):
+        return True
+    if (request.headers.get(DB_PIN_HEADER) or "").strip().lower() == "primary":
+        return True
+    return request.cookies.get(DB_PIN_COOKIE) == "primary"
+
+def pin_primary(request: Request, response: Optional[Response] = None) -> None:
+    """
+    Route this request's later reads — and, via cookie/header, the caller's
+    next few requests — to the primary. Call right after committing a write
+    the client is about to read back (e.g. collect_full -> /wtn/{id}.pdf).
+    """
+    request.state.db_pin_primary = True
+    if response is not None:
+        response.set_cookie(DB_PIN_COOKIE, "primary", max_age=_pin_seconds(), httponly=True, samesite="lax")
+        response.headers[DB_PIN_HEADER] = "primary"
+
+def reads_may_lag(session: AsyncSession) -> bool:
+    """True if `session` reads a replica that can trail the primary's last commit."""
+    return bool(session.info.get("wms_replica"))
+
+async def get_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Session for read-only routes: replica unless the request is pinned to primary."""
+    pinned = is_pinned_to_primary(request)
+    session = _open(SessionLocal if pinned else ReadLocal)
+    session.info["wms_replica"] = REPLICA_MAY_LAG and not pinned
+    try:
+        yield session
+    finally:
+        await _close(session)
 
 # --- Auth: simple admin stub ----------------------------------------------------
 
@@ -61,4 +122,4 @@ async def get_current_user(
 
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
-__all__ = ["get_db", "get_current_user"]
+__all__ = ["get_db", "get_read_db", "pin_primary", "is_pinned_to_primary", "reads_may_lag", "get_current_user"]
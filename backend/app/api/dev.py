@@ -12,6 +12,8 @@ from app.core.config import settings
 from app.api.deps import get_db
 from app.models.skip import Skip  # single source of truth
 from app.models import models as m  # used in seed only
+from app.services.skip_cache import skip_cache
+from app.services import skip_summary
 
 router = APIRouter(tags=["dev"])
 
@@ -68,8 +70,11 @@ async def ensure_skip(
     if not skip:
         skip = Skip(qr_code=qr_val, status="available")  # why: lets driver flow proceed
         db.add(skip)
+        await db.flush()
+        await skip_summary.added(db, skip)
         await db.commit()
         await db.refresh(skip)
+        skip_cache.invalidate(qr_val)
 
     return EnsureSkipOut(id=str(skip.id), qr=skip.qr_code, status=getattr(skip, "status", None))
 
@@ -100,5 +105,7 @@ async def seed_skip(
     )
     session.add(skip)
     await session.flush()  # why: ensure id populated before commit
+    await skip_summary.added(session, skip)
     await session.commit()
+    skip_cache.invalidate(skip.qr_code)
     return {"id": str(skip.id), "qr_code": skip.qr_code}
@@ -1,17 +1,28 @@
 # path: backend/app/api/driver.py
 from __future__ import annotations
 
-from datetime import datetime
+import asyncio
+import json
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
 from functools import lru_cache
 from types import SimpleNamespace
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Awaitable, Callable, List, Literal, Tuple, TypeVar
 
-from fastapi import APIRouter, Depends, Body, Query, HTTPException, status
-from pydantic import BaseModel, ConfigDict
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Body, Query, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db
+from app.core.config import settings
+from app.api.deps import get_db, get_read_db, pin_primary, reads_may_lag
+from app.services.skip_cache import skip_cache, SkipRef
+from app.services import skip_summary
+from app.services.skip_versions import VersionConflict, skip_versions
 
 # Core models we know exist
 from app.models import Skip, SkipStatus
@@ -20,10 +31,13 @@ from app.models.driver import (
     Weight, WeightSource,
     Transfer, DestinationType,
     WasteTransferNote,
+    DriverSyncAction,
 )
 
 router = APIRouter(tags=["driver"])
 
+T = TypeVar("T")
+
 # ===================== Schemas (outputs) =====================
 class ScanOut(BaseModel):
     id: str
@@ -31,6 +45,13 @@ class ScanOut(BaseModel):
     status: Optional[str] = None
     zone_id: Optional[str] = None
 
+class ScanBatchIn(BaseModel):
+    codes: List[str]
+
+class ScanBatchOut(BaseModel):
+    items: List[ScanOut]
+    not_found: List[str]
+
 class MovementOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -54,6 +75,31 @@ class ReturnEmptyOut(BaseModel):
     placement_id: str | None = None
     status: str | None = None
 
+class SyncActionIn(BaseModel):
+    key: str = Field(..., min_length=1, max_length=100)  # client idempotency key
+    type: Literal["deliver-empty", "relocate-empty", "collect-full", "return-empty"]
+    at: Optional[datetime] = None  # when the driver did it (device clock)
+    payload: Dict[str, Any]
+
+class SyncIn(BaseModel):
+    actions: List[SyncActionIn]
+
+class SyncResult(BaseModel):
+    key: str
+    type: str
+    status: Literal["applied", "duplicate", "failed", "skipped"]
+    code: int
+    result: Optional[Dict[str, Any]] = None
+    detail: Any = None
+
+class SyncOut(BaseModel):
+    results: List[SyncResult]
+    applied: int
+    duplicate: int
+    failed: int
+    skipped: int
+    elapsed_ms: float
+
 # ===================== Helpers =====================
 def get_str(d: Dict[str, Any] | None, *keys: str) -> Optional[str]:
     if not d: return None
@@ -109,46 +155,61 @@ def _get_placement_model():
         pass
     return None
 
-async def _get_active_placement(db: AsyncSession, *, skip: Skip):
+def _open_placement_filter(PM, skip: Skip, current_id: Optional[str]):
+    # the pointer makes it a primary-key lookup; skips without one (not yet
+    # repaired) fall back to the open-placements index
+    if current_id:
+        return (PM.id == current_id, PM.removed_at.is_(None))
+    return (PM.skip_id == skip.id, PM.removed_at.is_(None))
+
+async def _close_all_active_placements(db: AsyncSession, *, skip: Skip, current_id: Optional[str], when: datetime) -> None:
+    """Close the open placement (one UPDATE) if model exists; otherwise no-op."""
+    PM = _get_placement_model()
+    if PM is None:
+        return
+    await db.execute(update(PM).where(*_open_placement_filter(PM, skip, current_id)).values(removed_at=when))
+
+async def _active_placement(db: AsyncSession, *, skip: Skip) -> Optional[SimpleNamespace]:
     """
-    Return active placement row if model is available, otherwise a
-    lightweight fallback using skip.zone_id to keep the flow moving.
+    The skip's open placement (its id and zone) as of this read, taking no
+    locks; None if it has none. If the model is missing, skip.zone_id stands
+    in for the active placement.
     """
     PM = _get_placement_model()
     if PM is None:
-        # fallback: treat zone_id as current placement indicator
-        if getattr(skip, "zone_id", None):
-            return SimpleNamespace(zone_id=skip.zone_id)
-        return None
-
-    res = await db.execute(
-        select(PM)
-        .where(PM.skip_id == skip.id)
-        .where(PM.removed_at.is_(None))
-        .order_by(PM.placed_at.desc())
-        .limit(1)
-    )
-    return res.scalars().first()
+        return SimpleNamespace(id=None, zone_id=skip.zone_id) if getattr(skip, "zone_id", None) else None
+    row = (
+        await db.execute(
+            select(PM.id, PM.zone_id)
+            .where(*_open_placement_filter(PM, skip, skip.current_placement_id))
+            .order_by(PM.placed_at.desc())
+            .limit(1)
+        )
+    ).first()
+    return SimpleNamespace(id=row.id, zone_id=row.zone_id) if row else None
 
-async def _close_all_active_placements(db: AsyncSession, *, skip: Skip, when: datetime) -> None:
-    """Close open placements if model exists; otherwise no-op."""
+async def _take_active_placement(db: AsyncSession, *, skip: Skip, current_id: Optional[str], when: datetime) -> bool:
+    """
+    Close the open placement read before the claim (`current_id`, the
+    pointer as read), in one UPDATE ... RETURNING; False if it is no longer
+    open. Runs after skip_versions.bump, so every action locks the skip row
+    before its placements.
+    """
     PM = _get_placement_model()
     if PM is None:
-        return
-    res = await db.execute(
-        select(PM)
-        .where(PM.skip_id == skip.id)
-        .where(PM.removed_at.is_(None))
-    )
-    for pl in res.scalars().all():
-        pl.removed_at = when
-
-async def _open_placement(db: AsyncSession, *, skip: Skip, zone_id: Optional[str], when: datetime) -> None:
+        return True
+    cond = _open_placement_filter(PM, skip, current_id)
+    stmt = update(PM).where(*cond).values(removed_at=when)
+    if db.get_bind().dialect.update_returning:
+        return bool((await db.execute(stmt.returning(PM.id))).all())
+    return bool((await db.execute(stmt)).rowcount)  # pragma: no cover - SQLite < 3.35
+
+def _open_placement(db: AsyncSession, *, skip: Skip, placement_id: Optional[str], zone_id: Optional[str], when: datetime) -> None:
     """Open a placement if model exists and zone provided."""
     PM = _get_placement_model()
-    if PM is None or not zone_id:
+    if PM is None or not placement_id or not zone_id:
         return
-    db.add(PM(skip_id=skip.id, zone_id=zone_id, placed_at=when))
+    db.add(PM(id=placement_id, skip_id=skip.id, zone_id=zone_id, placed_at=when))
 
 def _calc_net(g: Optional[float], t: Optional[float], n: Optional[float]) -> Optional[float]:
     if n is not None:
@@ -159,21 +220,37 @@ def _calc_net(g: Optional[float], t: Optional[float], n: Optional[float]) -> Opt
         except Exception: return None
     return None
 
-async def _safe_place(db: AsyncSession, *, skip: Skip, to_zone_id: Optional[str], when: datetime, movement_type: MovementType) -> None:
-    """Best-effort placement + state update; never raises."""
-    try:
-        await _close_all_active_placements(db, skip=skip, when=when)
-        await _open_placement(db, skip=skip, zone_id=to_zone_id, when=when)
-        skip.zone_id = to_zone_id
-        try:
-            if movement_type in (MovementType.DELIVERY_EMPTY, MovementType.RETURN_EMPTY):
-                skip.status = getattr(SkipStatus, "DEPLOYED", SkipStatus).value
-            elif movement_type == MovementType.COLLECTION_FULL:
-                skip.status = getattr(SkipStatus, "IN_TRANSIT", SkipStatus).value
-        except Exception:
-            pass
-    except Exception as e:
-        print(f"[place] best-effort failed: {e.__class__.__name__}: {e}", flush=True)
+async def _safe_place(
+    db: AsyncSession, *, skip: Skip, to_zone_id: Optional[str], when: datetime, movement_type: MovementType,
+    placements_closed: bool = False,
+) -> Optional[str]:
+    """
+    Claim the skip and set its new zone/status/current placement in one UPDATE
+    (version compare-and-set; raises VersionConflict if another action changed
+    it since it was read), then close/open its placements and move it between
+    skip_summary counters in the same transaction. Returns the id of the placement opened, if any.
+    `placements_closed`: the caller closes them after the claim (_take_active_placement).
+    """
+    before = skip_summary.key_of(skip)
+    state: Dict[str, Any] = {"zone_id": to_zone_id}
+    if movement_type in (MovementType.DELIVERY_EMPTY, MovementType.RETURN_EMPTY):
+        state["status"] = SkipStatus.DEPLOYED.value
+    elif movement_type == MovementType.COLLECTION_FULL:
+        state["status"] = SkipStatus.IN_TRANSIT.value
+    placement_id: Optional[str] = None
+    if _get_placement_model() is not None:
+        placement_id = str(uuid.uuid4()) if to_zone_id else None
+        state["current_placement_id"] = placement_id
+    open_id = skip.current_placement_id  # as read; the claim replaces it
+    await skip_versions.bump(db, skip, **state)
+    # no try: a failure here must roll back the claim too, or the new
+    # current_placement_id would point at a placement that was never written
+    if not placements_closed:
+        await _close_all_active_placements(db, skip=skip, current_id=open_id, when=when)
+    _open_placement(db, skip=skip, placement_id=placement_id, zone_id=to_zone_id, when=when)
+    # same transaction as the state change: if the counters can't move, neither does the skip
+    await skip_summary.moved(db, before, skip_summary.key_of(skip))
+    return placement_id
 
 # ===================== Endpoints =====================
 @router.api_route("/scan", methods=["GET", "POST"], response_model=ScanOut)
@@ -181,21 +258,60 @@ async def scan(
     qr: Optional[str] = Query(None),
     q: Optional[str] = Query(None),
     payload: Dict[str, Any] | None = Body(default=None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     code = qr or q or get_str(payload, "qr", "q")
     if not code: raise HTTPException(400, "qr is required")
-    skip = await _get_skip_by_qr(db, code)
-    return {"id": str(skip.id), "qr_code": skip.qr_code, "status": getattr(skip, "status", None), "zone_id": getattr(skip, "zone_id", None)}
+    ref = skip_cache.get(code)
+    if ref is None:
+        skip = await _get_skip_by_qr(db, code)
+        ref = SkipRef(str(skip.id), getattr(skip, "status", None), getattr(skip, "zone_id", None))
+        # a lagging replica could re-cache what a write just invalidated, for
+        # the whole TTL; then only the write path (remember) fills the cache
+        if not reads_may_lag(db):
+            skip_cache.put(code, ref)
+    return {"id": ref.id, "qr_code": code, "status": ref.status, "zone_id": ref.zone_id}
+
+@router.post("/scan/batch", response_model=ScanBatchOut)
+async def scan_batch(payload: ScanBatchIn, db: AsyncSession = Depends(get_read_db)):
+    """
+    Resolve a row of scanned codes in one round trip: cache first, then one
+    `qr_code IN (...)` query for the rest. `items` keeps request order
+    (duplicates collapsed); unknown codes are listed in `not_found`.
+    """
+    codes = list(dict.fromkeys(c.strip() for c in payload.codes if c and c.strip()))
+    limit = int(getattr(settings, "DRIVER_SCAN_BATCH_MAX", 500))
+    if not codes: raise HTTPException(400, "codes is required")
+    if len(codes) > limit: raise HTTPException(413, f"at most {limit} codes per batch")
+
+    found: Dict[str, SkipRef] = {}
+    missing: List[str] = []
+    for code in codes:
+        ref = skip_cache.get(code)
+        if ref is None: missing.append(code)
+        else: found[code] = ref
+    if missing:
+        res = await db.execute(
+            select(Skip.id, Skip.qr_code, Skip.status, Skip.zone_id).where(Skip.qr_code.in_(missing))
+        )
+        fill = not reads_may_lag(db)  # see scan()
+        for sid, qr, st, zone in res.all():
+            found[qr] = SkipRef(str(sid), st, zone)
+            if fill:
+                skip_cache.put(qr, found[qr])
 
-@router.post("/deliver-empty", response_model=MovementOut, status_code=status.HTTP_201_CREATED)
-async def deliver_empty(payload: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_db)):
-    skip_qr = get_str(payload, "skip_qr", "qr", "skipId", "skip_id")
-    to_zone_id = get_str(payload, "to_zone_id", "zone_id", "toZoneId")
-    if not skip_qr or not to_zone_id: raise HTTPException(400, "skip_qr and to_zone_id required")
-    skip = await _get_skip_by_qr(db, skip_qr)
+    return {
+        "items": [{"id": found[c].id, "qr_code": c, "status": found[c].status, "zone_id": found[c].zone_id} for c in codes if c in found],
+        "not_found": [c for c in codes if c not in found],
+    }
 
-    when = datetime.utcnow()
+# ===================== Actions =====================
+# Shared by the single-action endpoints and /sync: each validates before it
+# writes anything, then adds and flushes in the caller's transaction. The
+# caller commits.
+async def _apply_deliver_empty(db: AsyncSession, skip: Skip, payload: Dict[str, Any], when: datetime) -> Dict[str, Any]:
+    to_zone_id = get_str(payload, "to_zone_id", "zone_id", "toZoneId")
+    if not to_zone_id: raise HTTPException(400, "skip_qr and to_zone_id required")
     mv = Movement(
         skip_id=skip.id, type=MovementType.DELIVERY_EMPTY,
         from_zone_id=None, to_zone_id=to_zone_id, when=when,
@@ -205,17 +321,12 @@ async def deliver_empty(payload: Dict[str, Any] = Body(...), db: AsyncSession =
     )
     db.add(mv)
     await _safe_place(db, skip=skip, to_zone_id=to_zone_id, when=when, movement_type=MovementType.DELIVERY_EMPTY)
-    await db.commit(); await db.refresh(mv)
-    return MovementOut.model_validate(mv)
+    await db.flush()
+    return MovementOut.model_validate(mv).model_dump()
 
-@router.post("/relocate-empty", response_model=MovementOut, status_code=status.HTTP_201_CREATED)
-async def relocate_empty(payload: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_db)):
-    skip_qr = get_str(payload, "skip_qr", "qr", "skipId", "skip_id")
+async def _apply_relocate_empty(db: AsyncSession, skip: Skip, payload: Dict[str, Any], when: datetime) -> Dict[str, Any]:
     to_zone_id = get_str(payload, "to_zone_id", "zone_id", "toZoneId")
-    if not skip_qr or not to_zone_id: raise HTTPException(400, "skip_qr and to_zone_id required")
-    skip = await _get_skip_by_qr(db, skip_qr)
-
-    when = datetime.utcnow()
+    if not to_zone_id: raise HTTPException(400, "skip_qr and to_zone_id required")
     mv = Movement(
         skip_id=skip.id, type=MovementType.RELOCATION_EMPTY,
         from_zone_id=getattr(skip, "zone_id", None), to_zone_id=to_zone_id, when=when,
@@ -225,33 +336,34 @@ async def relocate_empty(payload: Dict[str, Any] = Body(...), db: AsyncSession =
     )
     db.add(mv)
     await _safe_place(db, skip=skip, to_zone_id=to_zone_id, when=when, movement_type=MovementType.RELOCATION_EMPTY)
-    await db.commit(); await db.refresh(mv)
-    return MovementOut.model_validate(mv)
-
-@router.post("/collect-full", response_model=CollectFullOut, status_code=status.HTTP_201_CREATED)
-async def collect_full(payload: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_db)):
-    skip_qr = get_str(payload, "skip_qr", "qr", "skipId", "skip_id")
-    if not skip_qr: raise HTTPException(400, "skip_qr (or qr) required")
-    skip = await _get_skip_by_qr(db, skip_qr)
+    await db.flush()
+    return MovementOut.model_validate(mv).model_dump()
 
-    # Require "active placement" or fallback via zone_id when model missing
-    active = await _get_active_placement(db, skip=skip)
+async def _apply_collect_full(db: AsyncSession, skip: Skip, payload: Dict[str, Any], when: datetime) -> Dict[str, Any]:
+    # Require "active placement" (fallback via zone_id when model missing); a
+    # plain read, so a skip that isn't deployed fails before anything is written
+    active = await _active_placement(db, skip=skip)
     if not active:
         raise HTTPException(400, "skip not deployed on a site")
+    open_id = skip.current_placement_id  # as read; the claim clears it
 
-    when = datetime.utcnow()
+    # ids are ours, so nothing has to be flushed early to learn them
+    mv_id, tr_id, wtn_id = (str(uuid.uuid4()) for _ in range(3))
     mv = Movement(
-        skip_id=skip.id, type=MovementType.COLLECTION_FULL,
+        id=mv_id, skip_id=skip.id, type=MovementType.COLLECTION_FULL,
         from_zone_id=getattr(active, "zone_id", None), to_zone_id=None, when=when,
         driver_name=get_str(payload, "driver_name", "driver"),
         vehicle_reg=get_str(payload, "vehicle_reg", "vehicle", "vehicle_reg_no"),
         note=get_str(payload, "gate_pass_ref", "note"),
     )
-    db.add(mv)
-
-    # Close placements + set state safely (model may be absent; helpers handle it)
-    await _safe_place(db, skip=skip, to_zone_id=None, when=when, movement_type=MovementType.COLLECTION_FULL)
-    await db.flush()  # mv.id
+    # claim + set state before adding rows, so the claim's autoflush has nothing to send;
+    # the skip row is locked before the placement, the same order as every other action
+    await _safe_place(
+        db, skip=skip, to_zone_id=None, when=when, movement_type=MovementType.COLLECTION_FULL, placements_closed=True
+    )
+    if not await _take_active_placement(db, skip=skip, current_id=open_id, when=when):
+        # closed since the read without the version moving (repair, manual fix): re-read and retry
+        raise VersionConflict(f"skip {skip.id} placement {open_id or active.id} is no longer open")
 
     gross = get_num(payload, "gross_kg", "gross")
     tare  = get_num(payload, "tare_kg", "tare")
@@ -259,24 +371,22 @@ async def collect_full(payload: Dict[str, Any] = Body(...), db: AsyncSession = D
     net_val = _calc_net(gross, tare, net) or 0.0
 
     w = Weight(
-        movement_id=mv.id,
+        movement_id=mv_id,
         source=parse_enum(WeightSource, str(payload.get("weight_source", "")), default=WeightSource.WEIGHBRIDGE),
         gross_kg=gross, tare_kg=tare, net_kg=net_val,
     )
-    db.add(w)
 
     tr = Transfer(
-        movement_id=mv.id,
+        id=tr_id, movement_id=mv_id,
         site_id=get_str(payload, "site_id") or "SITE-DEV",
         commodity_id=get_str(payload, "commodity_id") or "COM-DEV",
         destination_type=parse_enum(DestinationType, str(payload.get("destination_type", "")), default=DestinationType.RECYCLING),
         destination_name=get_str(payload, "destination_name", "dest_name") or "ECO MRF",
         destination_address=get_str(payload, "destination_address"),
     )
-    db.add(tr); await db.flush()
 
     wtn = WasteTransferNote(
-        transfer_id=str(tr.id),
+        id=wtn_id, transfer_id=tr_id,
         description=f"Collection of skip {getattr(skip, 'qr_code', '')}",
         ewc_code=None, quantity_kg=float(net_val),
         producer_name=None,
@@ -284,30 +394,22 @@ async def collect_full(payload: Dict[str, Any] = Body(...), db: AsyncSession = D
         destination_name=tr.destination_name,
         created_at=datetime.utcnow(),
     )
-    db.add(wtn)
-    await db.flush()
-
-    # COMMIT so /wtn/{id}.pdf (new session) can read the row
-    await db.commit()
+    db.add_all([mv, w, tr, wtn])
+    await db.flush()  # one flush: the four INSERTs, in FK order
 
     return {
-        "movement_id": str(mv.id),
+        "movement_id": mv_id,
         "weight_net_kg": float(net_val),
-        "transfer_id": str(tr.id),
-        "wtn_id": str(wtn.id),
-        "wtn_pdf_url": f"/wtn/{wtn.id}.pdf",
+        "transfer_id": tr_id,
+        "wtn_id": wtn_id,
+        "wtn_pdf_url": f"/wtn/{wtn_id}.pdf",
     }
 
-@router.post("/return-empty", response_model=ReturnEmptyOut, status_code=status.HTTP_201_CREATED)
-async def return_empty(payload: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_db)):
-    skip_qr = get_str(payload, "skip_qr", "qr", "skipId", "skip_id")
+async def _apply_return_empty(db: AsyncSession, skip: Skip, payload: Dict[str, Any], when: datetime) -> Dict[str, Any]:
     to_zone_id = get_str(payload, "to_zone_id", "zone_id", "toZoneId")
-    if not skip_qr or not to_zone_id:
+    if not to_zone_id:
         raise HTTPException(400, "skip_qr and to_zone_id required")
 
-    skip = await _get_skip_by_qr(db, skip_qr)
-    when = datetime.utcnow()
-
     mv = Movement(
         skip_id=skip.id,
         type=MovementType.RETURN_EMPTY,
@@ -319,25 +421,11 @@ async def return_empty(payload: Dict[str, Any] = Body(...), db: AsyncSession = D
     )
     db.add(mv)
 
-    # Best-effort: open new placement + set status
-    await _safe_place(db, skip=skip, to_zone_id=to_zone_id, when=when, movement_type=MovementType.RETURN_EMPTY)
-
-    # Ensure IDs are available
-    await db.flush()   # mv.id + any new placement id
-
-    # Try to fetch the most recent placement as the one we just opened
-    placement_id: str | None = None
-    PM = _get_placement_model()
-    if PM is not None:
-        res = await db.execute(
-            select(PM)
-            .where(PM.skip_id == skip.id)
-            .order_by(PM.placed_at.desc())
-            .limit(1)
-        )
-        last_pl = res.scalars().first()
-        if last_pl:
-            placement_id = str(getattr(last_pl, "id", None))
+    # Best-effort: open new placement + set status; its id is ours, no re-query
+    placement_id = await _safe_place(
+        db, skip=skip, to_zone_id=to_zone_id, when=when, movement_type=MovementType.RETURN_EMPTY
+    )
+    await db.flush()   # mv.id
 
     return ReturnEmptyOut(
         movement_id=str(mv.id),
@@ -345,4 +433,226 @@ async def return_empty(payload: Dict[str, Any] = Body(...), db: AsyncSession = D
         to_zone_id=to_zone_id,
         placement_id=placement_id,
         status=getattr(skip, "status", None),
-    )
+    ).model_dump()
+
+_ACTIONS = {
+    "deliver-empty": _apply_deliver_empty,
+    "relocate-empty": _apply_relocate_empty,
+    "collect-full": _apply_collect_full,
+    "return-empty": _apply_return_empty,
+}
+
+async def _retry_on_conflict(db: AsyncSession, skip: Skip, action: str, attempt_fn: Callable[[Skip], Awaitable[T]]) -> T:
+    """
+    Run attempt_fn(skip) (apply + commit). On a version conflict roll back,
+    wait a jittered backoff, re-read the skip and run it again against the new
+    state (it re-validates: e.g. collect-full on a skip someone else just
+    collected is a 400). 409 once DRIVER_CAS_MAX_ATTEMPTS are used up.
+    """
+    skip_id = skip.id
+    attempt = 1
+    while True:
+        try:
+            return await attempt_fn(skip)
+        except VersionConflict:
+            await db.rollback()
+            if not skip_versions.retry(action, attempt):
+                raise HTTPException(409, "skip was changed by a concurrent action; retry")
+            await asyncio.sleep(skip_versions.backoff(attempt))
+            attempt += 1
+            skip = await db.get(Skip, skip_id, populate_existing=True)
+            if skip is None: raise HTTPException(404, "skip not found")
+
+async def _commit_action(db: AsyncSession, skip: Skip, action: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def attempt(s: Skip) -> Dict[str, Any]:
+        out = await _ACTIONS[action](db, s, payload, datetime.utcnow())
+        await db.commit()
+        return out
+    return await _retry_on_conflict(db, skip, action, attempt)
+
+@router.post("/deliver-empty", response_model=MovementOut, status_code=status.HTTP_201_CREATED)
+async def deliver_empty(payload: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_db)):
+    skip_qr = get_str(payload, "skip_qr", "qr", "skipId", "skip_id")
+    to_zone_id = get_str(payload, "to_zone_id", "zone_id", "toZoneId")
+    if not skip_qr or not to_zone_id: raise HTTPException(400, "skip_qr and to_zone_id required")
+    skip = await _get_skip_by_qr(db, skip_qr)
+    out = await _commit_action(db, skip, "deliver-empty", payload)
+    skip_cache.remember(skip)
+    return out
+
+@router.post("/relocate-empty", response_model=MovementOut, status_code=status.HTTP_201_CREATED)
+async def relocate_empty(payload: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_db)):
+    skip_qr = get_str(payload, "skip_qr", "qr", "skipId", "skip_id")
+    to_zone_id = get_str(payload, "to_zone_id", "zone_id", "toZoneId")
+    if not skip_qr or not to_zone_id: raise HTTPException(400, "skip_qr and to_zone_id required")
+    skip = await _get_skip_by_qr(db, skip_qr)
+    out = await _commit_action(db, skip, "relocate-empty", payload)
+    skip_cache.remember(skip)
+    return out
+
+@router.post("/collect-full", response_model=CollectFullOut, status_code=status.HTTP_201_CREATED)
+async def collect_full(
+    request: Request,
+    response: Response,
+    payload: Dict[str, Any] = Body(...),
+    db: AsyncSession = Depends(get_db),
+):
+    skip_qr = get_str(payload, "skip_qr", "qr", "skipId", "skip_id")
+    if not skip_qr: raise HTTPException(400, "skip_qr (or qr) required")
+    skip = await _get_skip_by_qr(db, skip_qr)
+    # commits, so /wtn/{id}.pdf (new session) can read the row
+    out = await _commit_action(db, skip, "collect-full", payload)
+    skip_cache.remember(skip)
+    # the client fetches wtn_pdf_url next; keep it off a lagging replica
+    pin_primary(request, response)
+    return out
+
+@router.post("/return-empty", response_model=ReturnEmptyOut, status_code=status.HTTP_201_CREATED)
+async def return_empty(payload: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_db)):
+    skip_qr = get_str(payload, "skip_qr", "qr", "skipId", "skip_id")
+    to_zone_id = get_str(payload, "to_zone_id", "zone_id", "toZoneId")
+    if not skip_qr or not to_zone_id:
+        raise HTTPException(400, "skip_qr and to_zone_id required")
+
+    skip = await _get_skip_by_qr(db, skip_qr)
+    out = await _commit_action(db, skip, "return-empty", payload)
+    skip_cache.invalidate(skip.qr_code)  # status/zone changed; next scan re-reads
+    return out
+
+# ===================== Offline sync =====================
+def _client_time(at: Optional[datetime]) -> datetime:
+    """Device timestamp as naive UTC (like every stored `when`), never later than now."""
+    now = datetime.utcnow()
+    if at is None:
+        return now
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(at, now)  # a fast device clock must not date movements in the future
+
+def _sync_result(a: SyncActionIn, state: str, code: int, result: Any = None, detail: Any = None) -> Dict[str, Any]:
+    return {"key": a.key, "type": a.type, "status": state, "code": code, "result": result, "detail": detail}
+
+async def _sync_skip(db: AsyncSession, skip: Skip, items: List[Tuple[int, SyncActionIn]], results: List[Any]) -> bool:
+    """
+    Replay one skip's actions in order in one transaction. An action that
+    fails validation is reported and the rest of this skip's queue is held
+    back (they were recorded after it); what applied before it commits.
+    Returns True if anything was committed.
+    """
+    applied: List[Tuple[int, SyncActionIn]] = []
+    failed: Optional[SyncActionIn] = None
+    try:
+        for i, a in items:
+            if failed is not None:
+                results[i] = _sync_result(a, "skipped", 424, detail=f"after failed action {failed.key}")
+                continue
+            when = _client_time(a.at)
+            try:
+                out = jsonable_encoder(await _ACTIONS[a.type](db, skip, a.payload, when))
+            except HTTPException as e:
+                results[i] = _sync_result(a, "failed", e.status_code, detail=e.detail)
+                failed = a
+                continue
+            db.add(DriverSyncAction(
+                key=a.key, action=a.type, skip_id=str(skip.id), result=json.dumps(out),
+                client_at=when, applied_at=datetime.utcnow(),
+            ))
+            results[i] = _sync_result(a, "applied", 201, result=out)
+            applied.append((i, a))
+        if not applied:
+            await db.rollback()  # end the transaction the failed action's reads opened
+            return False
+        await db.commit()
+        return True
+    except VersionConflict:
+        raise  # _retry_on_conflict rolls back and replays the whole queue
+    except IntegrityError:
+        # a concurrent sync (a retry of this batch) recorded one of these keys first
+        await db.rollback()
+        stored = dict((await db.execute(
+            select(DriverSyncAction.key, DriverSyncAction.result)
+            .where(DriverSyncAction.key.in_([a.key for _, a in applied]))
+        )).all())
+        for i, a in applied:
+            if a.key in stored:
+                results[i] = _sync_result(a, "duplicate", 200, result=json.loads(stored[a.key] or "null"))
+            else:
+                results[i] = _sync_result(a, "failed", 409, detail="rolled back with a concurrent replay; retry")
+        return False
+    except Exception as e:
+        await db.rollback()
+        for i, a in items:  # the applied ones, the one that raised and any after it
+            if results[i] is None or results[i]["status"] == "applied":
+                results[i] = _sync_result(a, "failed", 500, detail=f"rolled back: {e.__class__.__name__}")
+        return False
+
+@router.post("/sync", response_model=SyncOut)
+async def sync(
+    request: Request,
+    response: Response,
+    payload: SyncIn,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Replay actions queued while offline, in one round trip. Each action is
+    one of deliver-empty / relocate-empty / collect-full / return-empty with
+    the same payload as its endpoint, a client timestamp `at` (used as the
+    movement time) and an idempotency `key`. Actions are grouped by skip and
+    applied in request order, one transaction per skip; a key seen before
+    returns its stored result as `duplicate`. `results` follows request order.
+    """
+    t0 = time.perf_counter()
+    actions = payload.actions
+    limit = int(getattr(settings, "DRIVER_SYNC_MAX_ACTIONS", 200))
+    if len(actions) > limit: raise HTTPException(413, f"at most {limit} actions per sync")
+
+    results: List[Any] = [None] * len(actions)
+    done = dict((await db.execute(
+        select(DriverSyncAction.key, DriverSyncAction.result)
+        .where(DriverSyncAction.key.in_(list({a.key for a in actions})))
+    )).all()) if actions else {}
+    groups: Dict[str, List[Tuple[int, SyncActionIn]]] = {}
+    seen: set[str] = set()
+    for i, a in enumerate(actions):
+        if a.key in done:
+            results[i] = _sync_result(a, "duplicate", 200, result=json.loads(done[a.key] or "null"))
+        elif a.key in seen:
+            results[i] = _sync_result(a, "duplicate", 200, detail="key repeated in this batch")
+        else:
+            seen.add(a.key)
+            qr = get_str(a.payload, "skip_qr", "qr", "skipId", "skip_id")
+            if qr: groups.setdefault(qr, []).append((i, a))
+            else: results[i] = _sync_result(a, "failed", 400, detail="skip_qr required")
+
+    skip_ids: Dict[str, Any] = {}
+    if groups:
+        res = await db.execute(select(Skip).where(Skip.qr_code.in_(list(groups))))
+        skip_ids = {s.qr_code: s.id for s in res.scalars().all()}
+    wrote_wtn = False
+    for qr, items in groups.items():
+        sid = skip_ids.get(qr)
+        if sid is None:
+            for i, a in items: results[i] = _sync_result(a, "failed", 404, detail="skip not found")
+            continue
+        # ids, not the loaded objects: an earlier skip's rollback expires them all
+        skip = await db.get(Skip, sid)
+        try:
+            committed = await _retry_on_conflict(db, skip, "sync", lambda s: _sync_skip(db, s, items, results))
+        except HTTPException as e:  # conflicts outlasted the retries
+            for i, a in items: results[i] = _sync_result(a, "failed", e.status_code, detail=e.detail)
+            committed = False
+        if committed:
+            skip_cache.invalidate(qr)
+            wrote_wtn |= any(results[i]["type"] == "collect-full" and results[i]["status"] == "applied" for i, _ in items)
+    if wrote_wtn:
+        pin_primary(request, response)  # the client fetches the new WTN PDFs next
+
+    counts = Counter(r["status"] for r in results)
+    return {
+        "results": results,
+        "applied": counts.get("applied", 0),
+        "duplicate": counts.get("duplicate", 0),
+        "failed": counts.get("failed", 0),
+        "skipped": counts.get("skipped", 0),
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000.0, 1),
+    }
@@ -10,7 +10,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db
+from app.api.deps import get_db, get_read_db
 from app.models.driver_schedule import DriverTask
 
 router = APIRouter(prefix="/driver", tags=["driver:schedule"])
@@ -19,7 +19,7 @@ router = APIRouter(prefix="/driver", tags=["driver:schedule"])
 async def get_schedule(
     driver: str = Query(..., min_length=1),
     only_pending: bool = Query(True),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Dict[str, Any]:
     q = select(DriverTask).where(DriverTask.driver_name == driver).order_by(DriverTask.scheduled_at.asc())
     rows = (await db.execute(q)).scalars().all()
@@ -10,8 +10,7 @@ from fastapi import APIRouter, Request, Body, Depends, Header, HTTPException
 from pydantic import BaseModel
 
 from app.api.guards import admin_gate
-from app.models import models as m
-from app.db import engine
+from app.db import Base, engine
 
 try:
     from app.core.config import settings
@@ -94,6 +93,7 @@ if _EXPOSE:
         ("app.api.admin_vehicles",    "admin:vehicles"),
         ("app.api.admin_drivers",     "admin:drivers"),
         ("app.api.admin_bin_assignments", "admin:bins"),
+        ("app.api.skips_demo",            "admin:skips"),  # /admin/skips, X-Admin-Key gated inside
     ]:
         try:
             _safe_include("", mod, tag)
@@ -142,7 +142,7 @@ async def debug_admin_expose() -> dict:
 @api_router.post("/__admin/bootstrap", tags=["__debug"], dependencies=[Depends(admin_gate)])
 async def bootstrap():
     async with engine.begin() as conn:
-        await conn.run_sync(m.Base.metadata.create_all)
+        await conn.run_sync(Base.metadata.create_all)
     return {"ok": True}
 
 __all__ = ["api_router", "__mount_report__"]
@@ -1,9 +1,17 @@
 # path: backend/app/api/skips.py
 from __future__ import annotations
 
+import asyncio
+import codecs
+import csv
+import json
 import os
+import tempfile
+import time
 import uuid
-from typing import Any, Optional
+from collections import Counter
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from fastapi import (
     APIRouter,
@@ -11,19 +19,27 @@ from fastapi import (
     Header,
     HTTPException,
     Query,
+    Request,
     status,
 )
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from sqlalchemy import select, insert, or_, false
+from fastapi.responses import FileResponse, Response
+from pydantic import BaseModel, ValidationError
+from starlette.background import BackgroundTask
+from sqlalchemy import delete, func, select, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.api.deps import get_db, get_current_user
-from app.models.models import Skip
-from app.models.labels import SkipAsset, SkipAssetKind
-from app.schemas.skip import SkipCreate, SkipOut
-from app.services.qr_labels import LabelMeta, make_qr_png, make_three_up_pdf
+from app.api.deps import get_db, get_read_db, get_current_user, release_db
+from app.db import AsyncSessionLocal
+from app.models.labels import AssetBlob, LabelIntent, SkipAsset, SkipAssetKind
+from app.models.skip import Skip, SkipStatus
+from app.schemas.skip import LabelSheetIn, SkipCreate, SkipImportRow, SkipOut
+from app.services.label_pool import LabelRenderTimeout, label_pool
+from app.services.lazy_labels import lazy_labels
+from app.services.qr_labels import SheetLabel, render_label_sheet
+from app.services.skip_cache import skip_cache
+from app.services import asset_blobs, skip_summary
 
 # Optional Organization model (skip gracefully if not present)
 try:
@@ -55,11 +71,6 @@ def _admin_key_ok_q(
         return
     raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
-def _asset_blob_and_ct(a):
-    blob = getattr(a, "data", None) or getattr(a, "bytes", None)
-    ct = getattr(a, "content_type", None) or getattr(a, "mime", "application/octet-stream")
-    return blob, ct
-
 def _kind_value(v) -> str:
     if hasattr(v, "value"):
         return str(v.value)
@@ -73,6 +84,13 @@ def _qr_deeplink(code: str) -> str:
         return f"{base.rstrip('/')}/driver/qr/{code}"
     return code
 
+async def _render_labels(qr_code: str, org_name: str) -> tuple[bytes, bytes]:
+    """(PNG, 3-up PDF) from the label pool; CPU-bound, so never on the event loop."""
+    try:
+        return await label_pool.render(_qr_deeplink(qr_code), qr_code, org_name)
+    except LabelRenderTimeout as e:
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
 def _to_int(v) -> Optional[int]:
     if v is None:
         return None
@@ -81,125 +99,229 @@ def _to_int(v) -> Optional[int]:
     except Exception:
         return None
     
-def _pdf_where(skip_id: str):
-    tests = []
-    kcol = getattr(SkipAsset, "kind", None)
-    if kcol is not None:
-        # cover common representations
-        tests += [
-            kcol == _kind_value(SkipAssetKind.labels_pdf),
-            kcol == "labels_pdf",
-            kcol == "pdf",
-        ]
-    if hasattr(SkipAsset, "content_type"):
-        tests.append(SkipAsset.content_type == "application/pdf")
-    if hasattr(SkipAsset, "mime"):
-        tests.append(SkipAsset.mime == "application/pdf")
-    return (SkipAsset.skip_id == str(skip_id)), (or_(*tests) if tests else false())
-
-def _png_where(skip_id: str, idx: int):
-    tests = []
-    kcol = getattr(SkipAsset, "kind", None)
-    if kcol is not None:
-        tests += [
-            kcol == _kind_value(SkipAssetKind.label_png),
-            kcol == "label_png",
-            kcol == "png",
-        ]
-    if hasattr(SkipAsset, "content_type"):
-        tests.append(SkipAsset.content_type == "image/png")
-    if hasattr(SkipAsset, "mime"):
-        tests.append(SkipAsset.mime == "image/png")
-    base = (SkipAsset.skip_id == str(skip_id))
-    kind_ok = or_(*tests) if tests else false()
-    idx_ok = (getattr(SkipAsset, "idx") == idx) if hasattr(SkipAsset, "idx") else None
-    return base, kind_ok, idx_ok
-
-async def _insert_asset_row(
-    session: AsyncSession,
-    *,
-    skip_id: str,
-    kind: int | str,
-    idx: int | None,
-    content_type: str,
-    blob: bytes,
-) -> None:
+def _pdf_where(skip_id: str) -> List[Any]:
+    # kinds are normalised (alembic 0016), so this is an ix_skip_assets_skip_kind lookup
+    return [SkipAsset.skip_id == str(skip_id), SkipAsset.kind == _kind_value(SkipAssetKind.labels_pdf)]
+
+def _png_where(skip_id: str, idx: int) -> List[Any]:
+    return [
+        SkipAsset.skip_id == str(skip_id),
+        SkipAsset.kind == _kind_value(SkipAssetKind.label_png),
+        SkipAsset.idx == idx,
+    ]
+
+async def _store_label_assets(session: AsyncSession, labels: List[tuple[str, bytes, bytes]]) -> None:
     """
-    Insert into skip_assets (id set explicitly if present).
-    Supports: data/bytes and content_type/mime; stores normalized kind.
+    Write the 3 PNG + 1 PDF asset rows for each (skip_id, png, pdf). Bytes go to
+    asset_blobs once per distinct hash; the rows only reference it.
     """
-    tbl = SkipAsset.__table__  # type: ignore[attr-defined]
-    cols = tbl.c
+    if not labels:
+        return
+    items: List[tuple[bytes, str]] = []
+    for _, png, pdf in labels:
+        items += [(png, "image/png")] * 3 + [(pdf, "application/pdf")]
+    shas = iter(await asset_blobs.put_many(session, items))
+
+    png_kind, pdf_kind = _kind_value(SkipAssetKind.label_png), _kind_value(SkipAssetKind.labels_pdf)
+    rows: List[Dict[str, Any]] = []
+    for skip_id, _, _ in labels:
+        for i in range(1, 4):
+            rows.append({"id": str(uuid.uuid4()), "skip_id": str(skip_id), "kind": png_kind, "idx": i,
+                         "content_type": "image/png", "blob_sha256": next(shas)})
+        rows.append({"id": str(uuid.uuid4()), "skip_id": str(skip_id), "kind": pdf_kind, "idx": None,
+                     "content_type": "application/pdf", "blob_sha256": next(shas)})
+    await session.execute(insert(SkipAsset.__table__), rows)
+
+async def _defer_label_assets(session: AsyncSession, labels: List[tuple[str, str]]) -> None:
+    """LABEL_RENDER_MODE=lazy: record (skip_id, org_name) instead of rendering now."""
+    if not labels:
+        return
+    now = datetime.utcnow()
+    await session.execute(
+        insert(LabelIntent.__table__),
+        [{"skip_id": str(sid), "org_name": org, "created_at": now} for sid, org in labels],
+    )
+    lazy_labels.deferred += len(labels)
 
-    values: dict[str, object] = {}
+async def _render_deferred_labels(skip_id: str) -> bool:
+    """
+    Render a lazy skip's labels and store them; False if none were owed. The
+    render runs outside any transaction; deleting the intent row is the claim,
+    so of two workers racing here only one inserts the asset rows.
+    """
+    async with AsyncSessionLocal() as db:
+        row = (
+            await db.execute(
+                select(Skip.qr_code, LabelIntent.org_name)
+                .join(LabelIntent, LabelIntent.skip_id == Skip.id)
+                .where(Skip.id == skip_id)
+            )
+        ).first()
+        if row is None:
+            return False
+        await db.rollback()  # hand the connection back for the render
+        png_bytes, pdf_bytes = await _render_labels(row.qr_code, row.org_name)
+        claimed = await db.execute(delete(LabelIntent).where(LabelIntent.skip_id == skip_id))
+        if claimed.rowcount != 1:
+            await db.rollback()
+            lazy_labels.claim_lost()
+            return False
+        await _store_label_assets(db, [(skip_id, png_bytes, pdf_bytes)])
+        await db.commit()
+        return True
+
+async def _relabel_lost(skip_id: str) -> bool:
+    """
+    A label row points at a blob the asset store no longer has (e.g. a redeploy
+    without a persistent disk). Drop the skip's asset rows, owe its labels again
+    and render them as for a lazy skip. Deleting the rows is the claim: a worker
+    that finds none left just joins the render.
+    """
+    async with AsyncSessionLocal() as db:
+        owner = (await db.execute(select(Skip.owner_org_id).where(Skip.id == skip_id))).first()
+        if owner is None:
+            return False
+        gone = (
+            await db.execute(
+                delete(SkipAsset).where(SkipAsset.skip_id == skip_id).returning(SkipAsset.blob_sha256)
+            )
+        ).scalars().all()
+        if not gone:
+            await db.rollback()
+            return await _render_deferred_labels(skip_id)
+        await asset_blobs.release(db, gone)
+        org_name = "OWNER"
+        if Organization is not None and owner.owner_org_id:
+            org_name = (
+                await db.execute(select(Organization.name).where(Organization.id == owner.owner_org_id))  # type: ignore[attr-defined]
+            ).scalar_one_or_none() or org_name
+        if await db.get(LabelIntent, skip_id) is None:
+            await _defer_label_assets(db, [(skip_id, org_name)])
+        await db.commit()
+    lazy_labels.relabels += 1
+    return await _render_deferred_labels(skip_id)
+
+# Label bytes never change once written, so responses carry the content hash as
+# a strong ETag and may be cached for a year ("private": they are key-gated).
+_IMMUTABLE = "private, max-age=31536000, immutable"
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+def _byte_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """Single `bytes=a-b` / `a-` / `-n` range -> (start, end) inclusive; None = send it all."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None  # multi-range: a full 200 is a valid answer
+    first, _, last = header[6:].strip().partition("-")
+    try:
+        if first:
+            start, end = int(first), (int(last) if last else size - 1)
+        else:
+            start, end = size - int(last), size - 1
+    except ValueError:
+        return None
+    start, end = max(0, start), min(end, size - 1)
+    if start > end:
+        raise HTTPException(
+            status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
 
-    # explicit primary key if present
-    if "id" in cols.keys():
-        values["id"] = str(uuid.uuid4())
 
-    values["skip_id"] = str(skip_id)
-    values["kind"] = _kind_value(kind)
-    if "idx" in cols.keys():
-        values["idx"] = idx
+# _asset_response: the row exists but the asset store lost its object
+_LOST = object()
 
-    if "content_type" in cols.keys():
-        values["content_type"] = content_type
-    elif "mime" in cols.keys():
-        values["mime"] = content_type
 
-    if "data" in cols.keys():
-        values["data"] = blob
-    elif "bytes" in cols.keys():
-        values["bytes"] = blob
+async def _asset_response(session: AsyncSession, request: Request, where: List[Any], default_ct: str, what: str):
+    """
+    Serve a label asset (None if there is no such row, _LOST if its blob is
+    gone from the store). Resolving a revalidation (If-None-Match) reads only
+    the asset's hash, never the bytes. File-backed blobs go out as FileResponse
+    (sendfile via the ASGI pathsend extension where the server has it, chunked
+    otherwise; Range handled there); DB-held and legacy inline bytes are sent
+    from memory with single-range support.
+    """
+    meta = (
+        await session.execute(select(SkipAsset.id, SkipAsset.blob_sha256, SkipAsset.content_type).where(*where))
+    ).first()
+    if meta is None:
+        return None
+    asset_id, sha, ct = meta
+    ct = ct or default_ct
+
+    if sha:
+        etag = f'"{sha}"'
+        cache = {"ETag": etag, "Cache-Control": _IMMUTABLE}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache)
+        ref = await asset_blobs.locate(session, sha)
+        if ref is None:
+            return _LOST
+        if ref.path is not None:
+            return FileResponse(ref.path, media_type=ct, headers=cache)
+        blob = ref.data
     else:
-        raise RuntimeError("skip_assets table has neither 'data' nor 'bytes' column")
+        # legacy inline row (pre-0013): the hash needs the bytes anyway
+        blob = (await session.execute(select(SkipAsset.data).where(SkipAsset.id == asset_id))).scalar_one_or_none()
+        if blob:
+            etag = f'"{asset_blobs.digest(blob)}"'
+            cache = {"ETag": etag, "Cache-Control": _IMMUTABLE}
+            if _etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache)
+    if not blob:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"{what} empty")
+
+    headers = {**cache, "Accept-Ranges": "bytes"}
+    if_range = request.headers.get("if-range")
+    rng = _byte_range(request.headers.get("range"), len(blob)) if if_range in (None, etag) else None
+    if rng is None:
+        return Response(content=blob, media_type=ct, headers=headers)
+    start, end = rng
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(blob)}"
+    return Response(
+        content=blob[start:end + 1], status_code=status.HTTP_206_PARTIAL_CONTENT, media_type=ct, headers=headers
+    )
 
-    await session.execute(insert(tbl).values(**values))
+async def _label_response(
+    session: AsyncSession, request: Request, skip_id: str, where: List[Any], default_ct: str, what: str
+):
+    """
+    _asset_response, rendering deferred labels on the first request and
+    re-rendering labels whose stored object was lost (single-flight).
+    """
+    resp = await _asset_response(session, request, where, default_ct, what)
+    if resp is None or resp is _LOST:
+        sid = str(skip_id)
+        render = _relabel_lost if resp is _LOST else _render_deferred_labels
+        await session.rollback()  # don't sit on a pooled connection while the render runs
+        await lazy_labels.run(sid, lambda: render(sid))
+        # the rows were just written on the primary; don't look for them on a replica
+        async with AsyncSessionLocal() as db:
+            resp = await _asset_response(db, request, where, default_ct, what)
+    if resp is None or resp is _LOST:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"{what} not found")
+    return resp
 
 async def _ensure_label_assets(session: AsyncSession, skip: Skip, org_name: str) -> None:
     """Create PNG+PDF assets if they don't exist yet (idempotent)."""
-
-    # Build an OR of whatever columns exist to detect an existing PDF
-    pdf_preds = []
-    if hasattr(SkipAsset, "kind"):
-        pdf_preds.append(SkipAsset.kind == _kind_value(SkipAssetKind.labels_pdf))
-    if hasattr(SkipAsset, "content_type"):
-        pdf_preds.append(SkipAsset.content_type == "application/pdf")
-    if hasattr(SkipAsset, "mime"):
-        pdf_preds.append(SkipAsset.mime == "application/pdf")
-
-    base, kind_ok = _pdf_where(skip.id)
     existing_pdf = (
-        await session.execute(select(SkipAsset).where(base, kind_ok))
-    ).scalar_one_or_none()
+        await session.execute(select(SkipAsset.id).where(*_pdf_where(skip.id)).limit(1))
+    ).first()
     if existing_pdf:
         return
+    if lazy_labels.lazy:
+        owed = await session.get(LabelIntent, str(skip.id))
+        if owed is None:
+            await _defer_label_assets(session, [(str(skip.id), org_name)])
+        return
 
-    deeplink = _qr_deeplink(skip.qr_code)
-    png_bytes = make_qr_png(deeplink)
-    meta = LabelMeta(qr_text=deeplink, qr_code=skip.qr_code, org_name=org_name)
-    pdf_bytes = make_three_up_pdf(meta, png_bytes)
-
-    # 3 PNGs
-    for i in range(1, 4):
-        await _insert_asset_row(
-            session,
-            skip_id=str(skip.id),
-            kind=_kind_value(SkipAssetKind.label_png),
-            idx=i,
-            content_type="image/png",
-            blob=png_bytes,
-        )
-
-    # 1 PDF
-    await _insert_asset_row(
-        session,
-        skip_id=str(skip.id),
-        kind=_kind_value(SkipAssetKind.labels_pdf),
-        idx=None,
-        content_type="application/pdf",
-        blob=pdf_bytes,
-    )
+    png_bytes, pdf_bytes = await _render_labels(skip.qr_code, org_name)
+    await _store_label_assets(session, [(str(skip.id), png_bytes, pdf_bytes)])
 
     await session.flush()
 
@@ -273,8 +395,10 @@ async def seed_skip(
     session.add(sk)
     try:
         await session.flush()
+        await skip_summary.added(session, sk)
         await _ensure_label_assets(session, sk, org_name)
         await session.commit()
+        skip_cache.invalidate(qr)
     except Exception:
         await session.rollback()
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="seed_failed")
@@ -326,34 +450,17 @@ async def create_skip(
     )
     session.add(skip)
     await session.flush()  # get skip.id
+    await skip_summary.added(session, skip)
 
     # labels
-    deeplink = _qr_deeplink(qr_code)
-    png_bytes = make_qr_png(deeplink)
-    meta = LabelMeta(qr_text=deeplink, qr_code=qr_code, org_name=org_name)
-    pdf_bytes = make_three_up_pdf(meta, png_bytes)
-
-    for i in range(1, 4):
-        await _insert_asset_row(
-        session,
-        skip_id=str(skip.id),
-        kind=_kind_value(SkipAssetKind.label_png),
-        idx=i,
-        content_type="image/png",
-        blob=png_bytes,
-    )
-
-    # PDF
-    await _insert_asset_row(
-        session,
-        skip_id=str(skip.id),
-        kind=_kind_value(SkipAssetKind.labels_pdf),     # <-- PDF kind
-        idx=None,
-        content_type="application/pdf",
-        blob=pdf_bytes,
-    )
+    if lazy_labels.lazy:
+        await _defer_label_assets(session, [(str(skip.id), org_name)])
+    else:
+        png_bytes, pdf_bytes = await _render_labels(qr_code, org_name)
+        await _store_label_assets(session, [(str(skip.id), png_bytes, pdf_bytes)])
 
     await session.commit()
+    skip_cache.invalidate(qr_code)
 
     return SkipOut(
         id=skip.id,
@@ -363,101 +470,390 @@ async def create_skip(
         label_png_urls=[f"/skips/{skip.id}/labels/{i}.png" for i in range(1, 4)],
     )
 
+# -----------------------------------------------------------------------------
+# Bulk import (CSV / NDJSON, streamed)
+# -----------------------------------------------------------------------------
+_IMPORT_FIELDS = ("qr_code", "owner_org_id", "assigned_commodity_id", "zone_id", "status")
+
+
+async def _body_lines(request: Request) -> AsyncIterator[str]:
+    """Decode the request body incrementally and yield non-empty lines."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    tail = ""
+    async for chunk in request.stream():
+        tail += decoder.decode(chunk)
+        *lines, tail = tail.split("\n")
+        for line in lines:
+            if line.strip():
+                yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail.strip():
+        yield tail.rstrip("\r")
+
+
+async def _import_rows(request: Request, fmt: str) -> AsyncIterator[tuple[int, Any]]:
+    """(row number, dict | error string); CSV needs a header line, one record per line."""
+    header: Optional[List[str]] = None
+    n = 0
+    async for line in _body_lines(request):
+        if fmt == "csv" and header is None:
+            header = [h.strip() for h in next(csv.reader([line]))]
+            continue
+        n += 1
+        try:
+            if fmt == "csv":
+                rec: Any = dict(zip(header or [], next(csv.reader([line]))))
+            else:
+                rec = json.loads(line)
+                if not isinstance(rec, dict):
+                    raise ValueError("expected a JSON object")
+        except Exception as e:
+            yield n, f"unparseable row: {e}"
+            continue
+        yield n, rec
+
+
+async def _flush_import_batch(
+    session: AsyncSession,
+    batch: List[tuple[int, SkipImportRow]],
+    *,
+    labels: bool,
+    org_name: str,
+) -> List[Dict[str, Any]]:
+    """One round of: bulk uniqueness check, executemany insert, label assets, commit."""
+    for attempt in (1, 2):
+        qrs = [row.qr_code for _, row in batch]
+        taken = set(
+            (await session.execute(select(Skip.qr_code).where(Skip.qr_code.in_(qrs)))).scalars().all()
+        )
+        results: List[Dict[str, Any]] = []
+        now = datetime.utcnow()
+        skips: List[Dict[str, Any]] = []
+        for n, row in batch:
+            if row.qr_code in taken:
+                results.append({"row": n, "qr_code": row.qr_code, "result": "exists"})
+                continue
+            sid = str(uuid.uuid4())
+            results.append({"row": n, "qr_code": row.qr_code, "result": "created", "id": sid})
+            skips.append({
+                "id": sid,
+                "qr_code": row.qr_code,
+                "owner_org_id": str(row.owner_org_id),
+                "assigned_commodity_id": str(row.assigned_commodity_id) if row.assigned_commodity_id else None,
+                "zone_id": str(row.zone_id) if row.zone_id else None,
+                "status": row.status or SkipStatus.IN_STOCK.value,
+                "created_at": now,
+                "updated_at": now,
+            })
+        if not skips:
+            return results
+
+        rendered: List[Any] = []
+        if labels and not lazy_labels.lazy:
+            rendered = await asyncio.gather(*(_render_labels(s["qr_code"], org_name) for s in skips))
+        try:
+            cols = set(Skip.__table__.c.keys())  # type: ignore[attr-defined]
+            await session.execute(insert(Skip.__table__), [{k: v for k, v in s.items() if k in cols} for s in skips])
+            await skip_summary.bump(
+                session, Counter(skip_summary.key(s["owner_org_id"], s["zone_id"], s["status"]) for s in skips)
+            )
+            await _store_label_assets(
+                session, [(s["id"], png, pdf) for s, (png, pdf) in zip(skips, rendered)]
+            )
+            if labels and lazy_labels.lazy:
+                await _defer_label_assets(session, [(s["id"], org_name) for s in skips])
+            await session.commit()
+        except IntegrityError:
+            # a concurrent writer took one of these qr_codes after our check: re-check once
+            await session.rollback()
+            if attempt == 2:
+                raise
+            continue
+        for s in skips:
+            skip_cache.invalidate(s["qr_code"])
+        return results
+    return []
+
+
+@router.post("/import", tags=["dev"])
+async def import_skips(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$", description="default: from Content-Type"),
+    labels: bool = Query(True, description="render label PNG/PDF assets for created skips"),
+    org_name: str = Query("OWNER", max_length=40, description="printed on generated labels"),
+    session: AsyncSession = Depends(get_db),
+    _: None = Depends(_admin_key_ok),
+):
+    """
+    Stream skips in as CSV (header line; qr_code, owner_org_id[, assigned_commodity_id,
+    zone_id, status]) or NDJSON (one object per line). Rows are validated as they
+    arrive and written in SKIP_IMPORT_BATCH_SIZE chunks, each one commit; existing
+    qr_codes are reported, not overwritten. Returns one result per row; past
+    SKIP_IMPORT_MAX_ROWS the rest of the body is ignored and `truncated` is set.
+    """
+    ctype = (request.headers.get("content-type") or "").lower()
+    fmt = fmt or ("csv" if "csv" in ctype else "ndjson")
+    batch_size = max(1, int(getattr(settings, "SKIP_IMPORT_BATCH_SIZE", 500)))
+    max_rows = int(getattr(settings, "SKIP_IMPORT_MAX_ROWS", 50000))
+
+    t0 = time.perf_counter()
+    report: List[Dict[str, Any]] = []
+    batch: List[tuple[int, SkipImportRow]] = []
+    seen: set[str] = set()
+    rows = 0
+    truncated = False
+    async for n, rec in _import_rows(request, fmt):
+        if n > max_rows:
+            # earlier batches are already committed: stop reading, keep what we have
+            truncated = True
+            break
+        rows = n
+        if isinstance(rec, str):
+            report.append({"row": n, "result": "invalid", "error": rec})
+            continue
+        try:
+            row = SkipImportRow.model_validate(
+                {k: (v.strip() or None) if isinstance(v, str) else v for k, v in rec.items() if k in _IMPORT_FIELDS}
+            )
+        except ValidationError as e:
+            errs = "; ".join(f"{'.'.join(map(str, x['loc']))}: {x['msg']}" for x in e.errors())
+            report.append({"row": n, "qr_code": rec.get("qr_code"), "result": "invalid", "error": errs})
+            continue
+        if row.qr_code in seen:
+            report.append({"row": n, "qr_code": row.qr_code, "result": "duplicate"})
+            continue
+        seen.add(row.qr_code)
+        batch.append((n, row))
+        if len(batch) >= batch_size:
+            report += await _flush_import_batch(session, batch, labels=labels, org_name=org_name)
+            batch = []
+    if batch:
+        report += await _flush_import_batch(session, batch, labels=labels, org_name=org_name)
+
+    elapsed = time.perf_counter() - t0
+    report.sort(key=lambda r: r["row"])
+    counts = Counter(r["result"] for r in report)
+    return {
+        "rows": rows,
+        "created": counts.get("created", 0),
+        "exists": counts.get("exists", 0),
+        "duplicate": counts.get("duplicate", 0),
+        "invalid": counts.get("invalid", 0),
+        "truncated": truncated,
+        "elapsed_ms": round(elapsed * 1000.0, 1),
+        "rows_per_s": round(rows / elapsed, 1) if elapsed > 0 else None,
+        "results": report,
+    }
+
 # -----------------------------------------------------------------------------
 # Labels (PNG/PDF) — allow ?key=...
 # -----------------------------------------------------------------------------
+# -----------------------------------------------------------------------------
+# Content-addressed asset blobs
+# -----------------------------------------------------------------------------
+@router.get("/_assets/stats")
+async def asset_blob_stats(
+    session: AsyncSession = Depends(get_read_db),
+    _: None = Depends(_admin_key_ok_q),
+):
+    """Blob count/bytes vs. the bytes the asset rows reference (dedupe savings)."""
+    return await asset_blobs.stats(session)
+
+
+@router.post("/_assets/gc")
+async def asset_blob_gc(
+    session: AsyncSession = Depends(get_db),
+    _: None = Depends(_admin_key_ok),
+):
+    """
+    Full GC: recompute refcounts from skip_assets, drop unreferenced blobs and
+    their store objects, then sweep store objects older than
+    ASSET_SWEEP_MIN_AGE_SECONDS that no blob row points at.
+    """
+    out = await asset_blobs.collect(session)
+    await session.commit()
+    keys = out.pop("keys")
+    out["objects_removed"] = await asset_blobs.remove_objects(session, keys)
+    out["orphans_swept"] = await asset_blobs.sweep(
+        session, float(getattr(settings, "ASSET_SWEEP_MIN_AGE_SECONDS", 3600))
+    )
+    return out
+
+# -----------------------------------------------------------------------------
+# N-up label sheets (many skips, one PDF)
+# -----------------------------------------------------------------------------
+async def _sheet_labels(session: AsyncSession, body: LabelSheetIn, limit: int) -> List[SheetLabel]:
+    """One SheetLabel per skip: request order for ids, created order for a filter."""
+    cached_qr = (
+        select(SkipAsset.blob_sha256)
+        .where(
+            SkipAsset.skip_id == Skip.id,
+            SkipAsset.kind == _kind_value(SkipAssetKind.label_png),
+            SkipAsset.idx == 1,
+        )
+        .limit(1)
+        .correlate(Skip)
+        .scalar_subquery()
+    )
+    q = select(Skip.id, Skip.qr_code, cached_qr)
+    if body.skip_ids:
+        ids = list(dict.fromkeys(str(i) for i in body.skip_ids))
+        if len(ids) > limit:
+            raise HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"at most {limit} labels per sheet")
+        found: Dict[str, Any] = {}
+        for i in range(0, len(ids), 500):
+            for row in (await session.execute(q.where(Skip.id.in_(ids[i:i + 500])))).all():
+                found[str(row[0])] = row
+        rows = [found[i] for i in ids if i in found]
+    else:
+        q = q.where(Skip.deleted_at.is_(None))
+        if body.owner_org_id:
+            q = q.where(Skip.owner_org_id == str(body.owner_org_id))
+        if body.zone_id:
+            q = q.where(Skip.zone_id == str(body.zone_id))
+        if body.status:
+            q = q.where(Skip.status == body.status)
+        rows = (await session.execute(q.order_by(Skip.created_at, Skip.id).limit(limit + 1))).all()
+        if len(rows) > limit:
+            raise HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"more than {limit} skips match")
+
+    refs = await asset_blobs.locate_many(session, (sha for _, _, sha in rows))
+    out: List[SheetLabel] = []
+    for _, qr_code, sha in rows:
+        ref = refs.get(sha) if sha else None
+        qr = (str(ref.path) if ref.path is not None else ref.data) if ref is not None else None
+        out.append((_qr_deeplink(qr_code), qr_code, body.org_name, qr))
+    return out
+
+
+def _unlink_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+@router.post("/labels/sheet", tags=["labels"])
+async def label_sheet(
+    body: LabelSheetIn,
+    session: AsyncSession = Depends(get_read_db),
+    _: None = Depends(_admin_key_ok),
+):
+    """
+    One multi-page PDF of `cols` x `rows` labels per page for the given
+    skip_ids (in that order) or for live skips matching owner_org_id /
+    zone_id / status. QR images come from each skip's stored label PNG
+    (rendered only when a skip has none yet). The sheet is written page by
+    page to a temp file on the label pool and streamed from there.
+    """
+    if not (body.skip_ids or body.owner_org_id or body.zone_id or body.status):
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail="give skip_ids or a filter")
+    labels = await _sheet_labels(session, body, int(getattr(settings, "LABEL_SHEET_MAX_LABELS", 5000)))
+    if not labels:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="no skips matched")
+    await release_db(session)
+
+    fd, path = tempfile.mkstemp(prefix="labels-", suffix=".pdf")
+    os.close(fd)
+    try:
+        pages = await label_pool.run(
+            render_label_sheet, path, labels, body.cols, body.rows, body.page,
+            timeout=float(getattr(settings, "LABEL_SHEET_TIMEOUT_SECONDS", 120)),
+        )
+    except LabelRenderTimeout as e:
+        _unlink_quietly(path)
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except BaseException:
+        _unlink_quietly(path)
+        raise
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        filename=f"labels-{len(labels)}.pdf",
+        content_disposition_type="inline",
+        headers={"X-Label-Count": str(len(labels)), "X-Page-Count": str(pages)},
+        background=BackgroundTask(_unlink_quietly, path),
+    )
+
+# -----------------------------------------------------------------------------
+# Lazy labels (LABEL_RENDER_MODE=lazy)
+# -----------------------------------------------------------------------------
+@router.get("/_labels/stats")
+async def lazy_label_stats(
+    session: AsyncSession = Depends(get_read_db),
+    _: None = Depends(_admin_key_ok_q),
+):
+    """
+    On-demand render counters for this worker, plus skips whose labels are
+    still owed. `renders_avoided` = never requested so far + requests that
+    shared a render already in flight.
+    """
+    pending = (await session.execute(select(func.count()).select_from(LabelIntent))).scalar_one()
+    out = lazy_labels.stats()
+    out["pending"] = int(pending)
+    out["renders_avoided"] = int(pending) + out["coalesced"]
+    return out
+
 @router.get("/{skip_id}/labels.pdf")
 async def get_skip_labels_pdf(
     skip_id: str,
-    session: AsyncSession = Depends(get_db),
+    request: Request,
+    session: AsyncSession = Depends(get_read_db),
     _: None = Depends(_admin_key_ok_q),   # header X-API-Key or ?key=
 ):
-    base, kind_ok = _pdf_where(skip_id)
-    asset = (
-        await session.execute(select(SkipAsset).where(base, kind_ok))
-    ).scalar_one_or_none()
-    if not asset:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Labels PDF not found")
-
-    blob = getattr(asset, "data", None) or getattr(asset, "bytes", None)
-    if not blob:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Labels PDF empty")
-    ct = getattr(asset, "content_type", None) or getattr(asset, "mime", "application/pdf")
-    return StreamingResponse(iter([blob]), media_type=ct)
+    return await _label_response(session, request, skip_id, _pdf_where(skip_id), "application/pdf", "Labels PDF")
 
 
 @router.get("/{skip_id}/labels/{idx}.png")
 async def get_skip_label_png(
     skip_id: str,
     idx: int,
-    session: AsyncSession = Depends(get_db),
+    request: Request,
+    session: AsyncSession = Depends(get_read_db),
     _: None = Depends(_admin_key_ok_q),   # header X-API-Key or ?key=
 ):
-    base, kind_ok, idx_ok = _png_where(skip_id, idx)
-    where = [base, kind_ok]
-    if idx_ok is not None:
-        where.append(idx_ok)
-
-    asset = (
-        await session.execute(select(SkipAsset).where(*where))
-    ).scalar_one_or_none()
-    if not asset:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Label PNG not found")
-
-    blob = getattr(asset, "data", None) or getattr(asset, "bytes", None)
-    if not blob:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Label PNG empty")
-    ct = getattr(asset, "content_type", None) or getattr(asset, "mime", "image/png")
-    return StreamingResponse(iter([blob]), media_type=ct)
+    return await _label_response(session, request, skip_id, _png_where(skip_id, idx), "image/png", "Label PNG")
 
 # -----------------------------------------------------------------------------
 # Debug: list stored assets for a skip (very helpful for validation)
 # -----------------------------------------------------------------------------
-@router.get("/{skip_id}/__assets")
-async def debug_list_assets(
-    skip_id: str,
-    session: AsyncSession = Depends(get_db),
-    _: None = Depends(_admin_key_ok_q),  # allows ?key= or X-API-Key
-):
-    from sqlalchemy import func
-
-    blob_col = func.length(getattr(SkipAsset, "data", None) or getattr(SkipAsset, "bytes"))
-    ct_col = getattr(SkipAsset, "content_type", None) or getattr(SkipAsset, "mime")
-
-    rows = await session.execute(
+def _asset_listing(skip_id: str):
+    """Asset metadata for a skip; sizes come from asset_blobs (or length() for legacy rows), never the bytes."""
+    return (
         select(
+            SkipAsset.id,
             SkipAsset.kind,
             SkipAsset.idx,
-            ct_col.label("content_type"),
-            blob_col.label("blob_len"),
+            SkipAsset.content_type,
+            SkipAsset.blob_sha256,
+            func.coalesce(AssetBlob.size, func.length(SkipAsset.data), 0).label("size_bytes"),
         )
+        .outerjoin(AssetBlob, AssetBlob.sha256 == SkipAsset.blob_sha256)
         .where(SkipAsset.skip_id == str(skip_id))
         .order_by(SkipAsset.kind, SkipAsset.idx)
     )
 
-    # Row -> dict safely in SA 2.0
-    return [dict(r._mapping) for r in rows]
+@router.get("/{skip_id}/__assets")
+async def debug_list_assets(
+    skip_id: str,
+    session: AsyncSession = Depends(get_read_db),
+    _: None = Depends(_admin_key_ok_q),  # allows ?key= or X-API-Key
+):
+    rows = await session.execute(_asset_listing(skip_id))
+    return [
+        {"kind": r.kind, "idx": r.idx, "content_type": r.content_type, "blob_len": r.size_bytes,
+         "blob_sha256": r.blob_sha256}
+        for r in rows
+    ]
 
 @router.get("/{skip_id}/assets/_debug")
-async def debug_list_assets(
+async def debug_asset_details(
     skip_id: str,
-    session: AsyncSession = Depends(get_db),
+    session: AsyncSession = Depends(get_read_db),
     _: None = Depends(_admin_key_ok_q),  # header OR ?key=
 ):
-    rows = (await session.execute(
-        select(SkipAsset).where(SkipAsset.skip_id == str(skip_id))
-    )).scalars().all()
-    out = []
-    for a in rows:
-        blob, ct = _asset_blob_and_ct(a)
-        out.append({
-            "id": getattr(a, "id", None),
-            "kind": getattr(a, "kind", None),
-            "idx": getattr(a, "idx", None),
-            "content_type": ct,
-            "size_bytes": len(blob) if blob else 0,
-        })
-    return {"assets": out}
+    rows = await session.execute(_asset_listing(skip_id))
+    return {"assets": [dict(r._mapping) for r in rows]}
 
 @router.get("/__routes")
 def _skips_routes():
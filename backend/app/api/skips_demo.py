@@ -1,22 +1,27 @@
 # path: backend/app/api/skips_demo.py
 from __future__ import annotations
 
+import base64
+import json
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException, status
-from sqlalchemy import select, desc
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import delete as sa_delete, exists, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.api.deps import get_db # AsyncSession provider
-from app.models import Skip, SkipStatus
+from app.api.deps import get_db, get_read_db # AsyncSession providers
+from app.models import Base, LabelIntent, Skip, SkipAsset, SkipStatus
+from app.models.driver import Movement, SkipPlacement
+from app.services.skip_cache import skip_cache
+from app.services import asset_blobs, placements, skip_summary
 
 router = APIRouter(prefix="/admin/skips", tags=["admin-skips"]) # hidden behind X-Admin-Key
 
 
 async def require_admin(
-    x_admin_key: Optional[str] = Header(default=None, convert_underscores=False),
+    x_admin_key: Optional[str] = Header(default=None, alias="X-Admin-Key"),
 ):
     # why: hard gate; prevents accidental exposure in prod demos
     if not x_admin_key or x_admin_key != settings.ADMIN_API_KEY:
@@ -38,8 +43,11 @@ async def create_skip(
     if obj is None:
         obj = Skip(qr_code=qr, status=SkipStatus.IN_STOCK.value)
         db.add(obj)
+        await db.flush()
+        await skip_summary.added(db, obj)
         await db.commit()
         await db.refresh(obj)
+        skip_cache.invalidate(qr)
 
     return {
         "id": obj.id,
@@ -49,29 +57,124 @@ async def create_skip(
         "created_at": obj.created_at,
     }
 
+# ---- inventory listing (keyset) ----------------------------------------------
+# Ordered by (created_at DESC, id DESC); the cursor is the last row's pair, so
+# page N costs the same as page 1 (no OFFSET scan). Backed by the partial
+# (filter, created_at, id) indexes from alembic 0011.
+_LIST_FIELDS = (
+    "id", "qr_code", "status", "zone_id", "owner_org_id",
+    "assigned_commodity_id", "created_at", "updated_at", "deleted_at",
+)
+_DEFAULT_FIELDS = ("id", "qr_code", "status", "zone_id", "created_at")
+
+
+def _encode_cursor(created_at: datetime, skip_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), str(skip_id)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, sid = json.loads(raw)
+        return datetime.fromisoformat(ts), str(sid)
+    except Exception:
+        raise HTTPException(status_code=400, detail="bad cursor")
+
+
 @router.get("", dependencies=[Depends(require_admin)])
 async def list_skips(
-    limit: int = 20,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    limit: int = Query(20, description="page size, clamped to 1..500"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page: bool = Query(False, description="return {items, next_cursor} instead of a bare list"),
+    status_: Optional[str] = Query(None, alias="status"),
+    zone_id: Optional[str] = None,
+    owner_org_id: Optional[str] = None,
+    assigned_commodity_id: Optional[str] = None,
+    include_deleted: bool = False,
+    fields: Optional[str] = Query(None, description=f"comma list of: {', '.join(_LIST_FIELDS)}"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    limit = max(1, min(200, int(limit)))
-    res = await db.execute(
-        select(Skip).order_by(desc(Skip.created_at)).limit(limit)
+    """
+    Newest first. A bare list of rows, as this endpoint has always returned;
+    the next page's cursor is in the X-Next-Cursor header. With `page=true`
+    or a `cursor` the body is {items, next_cursor}.
+    """
+    limit = max(1, min(500, int(limit)))
+    want = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(_DEFAULT_FIELDS)
+    unknown = sorted(set(want) - set(_LIST_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown fields: {', '.join(unknown)}")
+
+    # id + created_at are always read: they make the cursor
+    cols = list(dict.fromkeys(["id", "created_at", *want]))
+    stmt = select(*(getattr(Skip, c) for c in cols))
+    if not include_deleted:
+        stmt = stmt.where(Skip.deleted_at.is_(None))
+    for col, val in (
+        (Skip.status, status_),
+        (Skip.zone_id, zone_id),
+        (Skip.owner_org_id, owner_org_id),
+        (Skip.assigned_commodity_id, assigned_commodity_id),
+    ):
+        if val is not None:
+            stmt = stmt.where(col == val)
+    if cursor:
+        c_at, c_id = _decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Skip.created_at, Skip.id) < tuple_(c_at, c_id))
+    stmt = stmt.order_by(Skip.created_at.desc(), Skip.id.desc()).limit(limit + 1)
+
+    rows = (await db.execute(stmt)).mappings().all()
+    items = [{f: r[f] for f in want} for r in rows[:limit]]
+    next_cursor = (
+        _encode_cursor(rows[limit - 1]["created_at"], rows[limit - 1]["id"]) if len(rows) > limit else None
     )
-    rows = res.scalars().all()
-    return [
-        {
-            "id": s.id,
-            "qr_code": s.qr_code,
-            "status": s.status,
-            "zone_id": s.zone_id,
-            "created_at": s.created_at,
-        }
-        for s in rows
-]
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if page or cursor:
+        return {"items": items, "next_cursor": next_cursor}
+    return items
+
+# ---- fleet summary -----------------------------------------------------------
+@router.get("/summary", dependencies=[Depends(require_admin)])
+async def fleet_summary(
+    by: Optional[str] = Query("status", description="comma list of: owner_org_id, zone_id, status (empty = grand total)"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Live skip totals from skip_summary: reads one row per group, not per skip."""
+    fields = [f.strip() for f in (by or "").split(",") if f.strip()]
+    unknown = sorted(set(fields) - set(skip_summary.GROUP_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown group fields: {', '.join(unknown)}")
+    return await skip_summary.totals(db, list(dict.fromkeys(fields)))
+
+
+@router.post("/summary/rebuild", dependencies=[Depends(require_admin)])
+async def rebuild_summary(db: AsyncSession = Depends(get_db)):
+    """Repair job: recompute skip_summary from the skips table."""
+    groups = await skip_summary.rebuild(db)
+    await db.commit()
+    return {"ok": True, "groups": groups}
+
+
+# ---- current placement pointer -------------------------------------------------
+@router.get("/placements/verify", dependencies=[Depends(require_admin)])
+async def verify_placements(db: AsyncSession = Depends(get_read_db)):
+    """Integrity check: skips.current_placement_id vs the open skip_placements rows (read-only)."""
+    return await placements.verify(db)
+
+
+@router.post("/placements/repair", dependencies=[Depends(require_admin)])
+async def repair_placements(db: AsyncSession = Depends(get_db)):
+    """Repair job: close duplicate open placements and reset every drifted pointer."""
+    out = await placements.verify(db, repair=True)
+    await db.commit()
+    return {"ok": True, **out}
+
 
 @router.get("/by_qr/{qr}", dependencies=[Depends(require_admin)])
-async def get_by_qr(qr: str, db: AsyncSession = Depends(get_db)):
+async def get_by_qr(qr: str, db: AsyncSession = Depends(get_read_db)):
     res = await db.execute(select(Skip).where(Skip.qr_code == qr).limit(1))
     s = res.scalar_one_or_none()
     if not s:
@@ -89,12 +192,56 @@ def ping():
     return {"ok": True}
 
 @router.delete("/{skip_id}", dependencies=[Depends(require_admin)])
-async def delete_skip(skip_id: str, db: AsyncSession = Depends(get_db)):
+async def delete_skip(skip_id: str, hard: bool = False, db: AsyncSession = Depends(get_db)):
     res = await db.execute(select(Skip).where(Skip.id == skip_id).limit(1))
     s = res.scalar_one_or_none()
     if not s:
         # idempotent delete
         return {"ok": True, "deleted": False}
+    if hard:
+        return await _hard_delete(db, s)
+    before = skip_summary.key_of(s)
     s.deleted_at = datetime.utcnow() # soft delete
+    await skip_summary.moved(db, before, None)
     await db.commit()
+    skip_cache.invalidate(s.qr_code)
     return {"ok": True, "deleted": True, "id": skip_id}
+
+
+def _history_checks(skip_id: str) -> dict:
+    """EXISTS per table of retained records about the skip (movement history and
+    the transfers/WTNs hanging off it, placements, contractor assignments)."""
+    checks = {
+        "movements": exists().where(Movement.skip_id == skip_id),
+        "placements": exists().where(SkipPlacement.skip_id == skip_id),
+    }
+    assignments = Base.metadata.tables.get("skip_assignments")  # only if that model is loaded
+    if assignments is not None:
+        checks["assignments"] = exists().where(assignments.c.skip_id == skip_id)
+    return checks
+
+
+async def _hard_delete(db: AsyncSession, s: Skip) -> dict:
+    """Remove the row and its assets; blobs whose last reference this was are GC'd."""
+    skip_id, qr = str(s.id), s.qr_code
+    # Checked here rather than left to the database: the FKs are ON DELETE
+    # CASCADE (Postgres would silently wipe the records) and SQLite runs
+    # without foreign_keys (it would orphan them).
+    checks = _history_checks(skip_id)
+    row = (await db.execute(select(*(c.label(name) for name, c in checks.items())))).one()
+    held = [name for name in checks if row._mapping[name]]
+    if held:
+        raise HTTPException(
+            status_code=409, detail=f"skip has {', '.join(held)} history; soft delete it instead"
+        )
+    shas = (await db.execute(select(SkipAsset.blob_sha256).where(SkipAsset.skip_id == skip_id))).scalars().all()
+    await skip_summary.moved(db, skip_summary.key_of(s), None)
+    await db.execute(sa_delete(SkipAsset).where(SkipAsset.skip_id == skip_id))
+    await db.execute(sa_delete(LabelIntent).where(LabelIntent.skip_id == skip_id))
+    await asset_blobs.release(db, shas)
+    await db.execute(sa_delete(Skip).where(Skip.id == skip_id))
+    gc = await asset_blobs.collect(db, shas)
+    await db.commit()
+    await asset_blobs.remove_objects(db, gc["keys"])
+    skip_cache.invalidate(qr)
+    return {"ok": True, "deleted": True, "hard": True, "id": skip_id, "blobs_freed": gc["deleted"]}
@@ -1,6 +1,7 @@
 # path: backend/app/api/wtn.py
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
 from typing import Dict, Any, Optional
 from uuid import UUID
@@ -11,7 +12,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import desc
 
-from app.api.deps import get_db
+from app.api.deps import get_read_db, release_db
 from app.models.driver import WasteTransferNote
 
 router = APIRouter(tags=["wtn"])
@@ -248,7 +249,7 @@ async def get_wtn_pdf_or_html(
     wtn_id: str = Path(..., description="WTN identifier (UUID or string)"),
     format: str = Query("pdf", pattern="^(pdf|html)$", description="pdf or html"),
     as_attachment: bool = Query(False, description="force download"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Returns PDF if WeasyPrint is installed and `format=pdf`, else HTML.
@@ -259,11 +260,14 @@ async def get_wtn_pdf_or_html(
 
     ctx = _ctx_from_wtn(wtn)
     html = _render_html(ctx)
+    # Done with the DB: hand the connection back before the (slow) render.
+    await release_db(db)
 
     want_pdf = (format == "pdf")
     if want_pdf and _HAS_PDF:
         # Inline CSS already in the HTML; you can add CSS() files here if needed.
-        pdf_bytes = HTML(string=html).write_pdf()  # type: ignore
+        # Off the event loop, so a client disconnect can cancel the wait.
+        pdf_bytes = await asyncio.to_thread(lambda: HTML(string=html).write_pdf())  # type: ignore
         disp = 'attachment' if as_attachment else 'inline'
         return Response(
             content=pdf_bytes,
@@ -279,7 +283,7 @@ async def get_wtn_pdf_or_html(
     )
 
 @router.get("/__debug/wtns")
-async def debug_list_wtns(limit: int = 10, db: AsyncSession = Depends(get_db)):
+async def debug_list_wtns(limit: int = 10, db: AsyncSession = Depends(get_read_db)):
     res = await db.execute(
         select(WasteTransferNote).order_by(desc(WasteTransferNote.created_at)).limit(limit)
     )
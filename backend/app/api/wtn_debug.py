@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db
+from app.api.deps import get_read_db
 from app.core.config import settings
 from app.models.driver import WasteTransferNote
 
@@ -21,7 +21,7 @@ def admin_gate(x_api_key: str | None = Header(default=None, alias="X-API-Key"))
         raise HTTPException(status_code=403, detail="Admin key required")
 
 @router.get("/__debug/wtns", dependencies=[Depends(admin_gate)])
-async def list_recent_wtns(limit: int = 10, db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
+async def list_recent_wtns(limit: int = 10, db: AsyncSession = Depends(get_read_db)) -> Dict[str, Any]:
     stmt = select(WasteTransferNote).order_by(desc(WasteTransferNote.created_at)).limit(max(1, min(limit, 50)))
     res = await db.execute(stmt)
     rows: List[WasteTransferNote] = list(res.scalars().all())
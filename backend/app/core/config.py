@@ -120,6 +120,78 @@ class Settings(BaseSettings):
     # DB
     DATABASE_URL: str = "sqlite+aiosqlite:///./dev.db"
 
+    # Optional read replica; read-only routes use it when set (see app.api.deps.get_read_db)
+    DATABASE_REPLICA_URL: str = ""
+    DB_REPLICA_PIN_SECONDS: int = 10  # read-your-own-writes window after a write
+
+    # DB pool (one shared engine per process; see app.db)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_RECYCLE: int = 1800      # seconds; Render/pgbouncer drop idle conns
+    DB_POOL_TIMEOUT: float = 30.0    # seconds to wait for a free connection
+    DB_POOL_PRE_PING: bool = True
+    DB_PREWARM_CONNECTIONS: int = 5  # opened concurrently at startup (capped at pool size); 0 = off
+    DRAIN_TIMEOUT_SECONDS: float = 20.0  # shutdown waits this long for in-flight requests
+
+    # Per-route-class statement timeouts (0 = none); see app.core.timeouts
+    DB_TIMEOUT_READ_MS: int = 5000
+    DB_TIMEOUT_WRITE_MS: int = 10000
+    DB_TIMEOUT_REPORT_MS: int = 15000
+    DISCONNECT_CANCEL_METHODS: str = "GET,HEAD"  # cancel these handlers when the client goes away
+
+    # In-process qr_code -> (id, status, zone) cache for /driver/scan (0 = off)
+    SKIP_CACHE_SIZE: int = 5000
+    SKIP_CACHE_TTL_SECONDS: float = 30.0  # bounds staleness across workers
+    DRIVER_SCAN_BATCH_MAX: int = 500  # codes per POST /driver/scan/batch
+    DRIVER_SYNC_MAX_ACTIONS: int = 200  # queued actions per POST /driver/sync
+    DRIVER_CAS_MAX_ATTEMPTS: int = 5  # tries per driver action on a skip version conflict, then 409
+    DRIVER_CAS_BACKOFF_MS: float = 10.0  # jittered, doubling between tries
+    SKIP_IMPORT_BATCH_SIZE: int = 500  # rows per executemany/commit in POST /skips/import
+    SKIP_IMPORT_MAX_ROWS: int = 50000
+
+    # Label rendering (app.services.label_pool): "process" or "thread"
+    LABEL_POOL_MODE: str = "process"
+    LABEL_POOL_WORKERS: int = 2
+    LABEL_POOL_MAX_QUEUE: int = 64  # renders submitted at once; later callers wait
+    LABEL_RENDER_TIMEOUT_SECONDS: float = 20.0
+    LABEL_RENDER_MODE: str = "eager"  # "lazy": creation records a label_intents row; first GET renders
+    LABEL_SHEET_MAX_LABELS: int = 5000  # per POST /skips/labels/sheet
+    LABEL_SHEET_TIMEOUT_SECONDS: float = 120.0
+
+    # Asset blob bytes (app.services.asset_store): "local" directory or "db".
+    # "local" needs ASSET_STORE_DIR on a persistent disk; on an ephemeral
+    # filesystem every deploy loses the objects and labels get re-rendered.
+    ASSET_STORE_BACKEND: str = "local"
+    ASSET_STORE_DIR: str = ""  # default: backend/var/assets
+    ASSET_SWEEP_MIN_AGE_SECONDS: float = 3600.0  # orphan objects younger than this are kept
+
+    # Idempotency-Key on POSTs (app.middleware_idempotency): replay the stored response
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 3600
+    IDEMPOTENCY_LEASE_SECONDS: float = 60.0  # a first request still running blocks its key this long
+    IDEMPOTENCY_CACHE_SIZE: int = 2000  # in-process LRU in front of the table
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 256 * 1024  # larger (or file) responses are not stored
+    IDEMPOTENCY_SWEEP_SECONDS: float = 300.0  # background delete of expired keys (0 = off)
+
+    # Schema check runs once at startup; >0 also re-inspects (no DDL) on this interval
+    SCHEMA_REVERIFY_SECONDS: int = 0
+
+    # Background DB pinger behind /__health (0 = ping live on every probe, the old behaviour)
+    HEALTH_PING_SECONDS: float = 5.0
+    HEALTH_PING_TIMEOUT: float = 2.0
+
+    # SQLite deployment mode (small depots): WAL + 1 writer connection + read-only pool
+    SQLITE_WAL_MODE: bool = False
+    SQLITE_READ_POOL_SIZE: int = 4
+    SQLITE_MMAP_BYTES: int = 256 * 1024 * 1024
+    SQLITE_CACHE_KIB: int = 64 * 1024
+
+    # SQL instrumentation (Server-Timing, slow log, N+1 hints; see app.core.sql_metrics)
+    SQL_INSTRUMENTATION: bool = True
+    SQL_SLOW_MS: float = 200.0
+    SQL_SLOW_LOG_SIZE: int = 200
+    SQL_NPLUSONE_THRESHOLD: int = 5  # same statement shape this many times in one request
+
     # CORS / frontend base
     # Prefer explicit origins in prod (comma/semicolon separated).
     CORS_ORIGINS: str = "*"
@@ -146,6 +218,7 @@ settings = Settings()
 
 # Normalize DATABASE_URL using merged env (not os.getenv).
 settings.DATABASE_URL = _normalize_db_url(settings.DATABASE_URL)
+settings.DATABASE_REPLICA_URL = _normalize_db_url(settings.DATABASE_REPLICA_URL)
 
 # Build CORS origins list from both envs
 _origins = []
@@ -184,6 +257,13 @@ SETTINGS_SUMMARY = {
     "debug": settings.DEBUG,
     "expose_admin_routes": settings.EXPOSE_ADMIN_ROUTES,
     "db_url_driver": settings.DATABASE_URL.split("://", 1)[0],
+    "db_replica": bool(settings.DATABASE_REPLICA_URL),
+    "db_pool": {
+        "size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "recycle": settings.DB_POOL_RECYCLE,
+        "timeout": settings.DB_POOL_TIMEOUT,
+    },
     "cors_origins": CORS_ORIGINS_LIST,
     "cors_allow_credentials": CORS_ALLOW_CREDENTIALS_EFFECTIVE,
     "wildcard": WILDCARD,
@@ -0,0 +1,140 @@
+# path: backend/app/core/health.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+log = logging.getLogger("uvicorn")
+
+# Latest DB ping, written by the background pinger; /__health reads it without
+# touching the pool, so LB/uptime probes never compete with real traffic.
+_STATE: Dict[str, Any] = {
+    "ok": False,
+    "latency_ms": None,
+    "checked_at": None,
+    "last_ok_at": None,
+    "last_error": None,
+    "last_error_at": None,
+    "consecutive_failures": 0,
+}
+_checked_mono: Optional[float] = None
+_started_mono = time.monotonic()
+_pinger_task: Optional[asyncio.Task] = None
+_pinger_stop: Optional[asyncio.Event] = None
+_interval: float = 0.0
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+async def ping(engine: AsyncEngine, timeout: float = 2.0) -> Dict[str, Any]:
+    """
+    One live `select 1`; updates and returns the cached state. The checkout is
+    bounded by the pool's own timeout (cancelling it mid-checkout would throw
+    the connection away); `timeout` and the latency cover the query only.
+    """
+    global _checked_mono
+    t0 = time.perf_counter()
+    try:
+        async with engine.connect() as conn:
+            t0 = time.perf_counter()
+            await asyncio.wait_for(conn.execute(text("select 1")), timeout=timeout)
+    except Exception as e:
+        err = "timeout" if isinstance(e, asyncio.TimeoutError) else f"{type(e).__name__}: {e}"
+        _STATE.update(
+            ok=False,
+            latency_ms=round((time.perf_counter() - t0) * 1000.0, 2),
+            last_error=err,
+            last_error_at=_now(),
+            consecutive_failures=_STATE["consecutive_failures"] + 1,
+        )
+    else:
+        _STATE.update(
+            ok=True,
+            latency_ms=round((time.perf_counter() - t0) * 1000.0, 2),
+            last_ok_at=_now(),
+            consecutive_failures=0,
+        )
+    _STATE["checked_at"] = _now()
+    _checked_mono = time.monotonic()
+    return dict(_STATE)
+
+
+def db_state() -> Dict[str, Any]:
+    """Cached ping result plus its age; `stale` once a few intervals pass with no ping."""
+    age = None if _checked_mono is None else round(time.monotonic() - _checked_mono, 3)
+    stale = age is None or (_interval > 0 and age > max(3 * _interval, _interval + 5))
+    return {**_STATE, "age_s": age, "stale": stale, "interval_s": _interval}
+
+
+def pinger_running() -> bool:
+    return _pinger_task is not None and not _pinger_task.done()
+
+
+def uptime_s() -> float:
+    return round(time.monotonic() - _started_mono, 3)
+
+
+async def _pinger_loop(engine: AsyncEngine, interval: float, timeout: float, stop: asyncio.Event) -> None:
+    was_ok: Optional[bool] = _STATE["ok"] if _checked_mono is not None else None
+    while True:
+        # sleep first: startup has just pinged; waking on `stop` means we never
+        # get cancelled in the middle of a checkout
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+            return
+        except asyncio.TimeoutError:
+            pass
+        try:
+            st = await ping(engine, timeout)
+            if st["ok"] != was_ok and was_ok is not None:
+                if st["ok"]:
+                    log.info("[health] db ping recovered (%.1fms)", st["latency_ms"])
+                else:
+                    log.warning("[health] db ping failing: %s", st["last_error"])
+            was_ok = st["ok"]
+        except Exception as e:  # never let the loop die
+            log.warning("[health] pinger error: %s", e)
+
+
+def start_pinger(engine: AsyncEngine, interval: float, timeout: float = 2.0) -> None:
+    """Ping every `interval` seconds in the background; 0 disables (then /__health pings live)."""
+    global _pinger_task, _pinger_stop, _interval
+    if interval <= 0 or _pinger_task is not None:
+        return
+    _interval = float(interval)
+    _pinger_stop = asyncio.Event()
+    _pinger_task = asyncio.get_running_loop().create_task(
+        _pinger_loop(engine, _interval, timeout, _pinger_stop)
+    )
+
+
+async def stop_pinger(grace: float = 5.0) -> None:
+    """Let an in-flight ping finish (bounded by `grace`), then stop."""
+    global _pinger_task, _pinger_stop
+    task, _pinger_task = _pinger_task, None
+    stop, _pinger_stop = _pinger_stop, None
+    if task is None:
+        return
+    if stop is not None:
+        stop.set()
+    try:
+        await asyncio.wait_for(task, timeout=grace)
+    except (asyncio.TimeoutError, asyncio.CancelledError, Exception):
+        pass
+
+
+__all__ = [
+    "ping",
+    "db_state",
+    "pinger_running",
+    "uptime_s",
+    "start_pinger",
+    "stop_pinger",
+]
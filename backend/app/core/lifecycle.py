@@ -0,0 +1,202 @@
+# path: backend/app/core/lifecycle.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+log = logging.getLogger("uvicorn")
+
+# Process phase: starting -> ready -> draining -> stopped. Readiness and the
+# in-flight middleware read it; startup/shutdown hooks in main.py advance it.
+_BOOT_MONO = time.monotonic()
+_STATE: Dict[str, Any] = {
+    "phase": "starting",
+    "prewarm": {},
+    "ready_after_s": None,
+    "first_request": None,
+    "drain": None,
+}
+_ready_mono: Optional[float] = None
+_in_flight = 0
+_idle: Optional[asyncio.Event] = None
+
+
+def phase() -> str:
+    return _STATE["phase"]
+
+
+def is_ready() -> bool:
+    return _STATE["phase"] == "ready"
+
+
+def is_draining() -> bool:
+    return _STATE["phase"] == "draining"
+
+
+def in_flight() -> int:
+    return _in_flight
+
+
+def lifecycle_state() -> Dict[str, Any]:
+    return {**_STATE, "in_flight": _in_flight, "uptime_s": round(time.monotonic() - _BOOT_MONO, 3)}
+
+
+# ---- startup ----------------------------------------------------------------
+def _pool_capacity(engine: AsyncEngine) -> int:
+    size = getattr(engine.sync_engine.pool, "size", None)
+    return int(size()) if callable(size) else 0
+
+
+async def prewarm(engine: AsyncEngine, connections: int, timeout: float = 10.0) -> Dict[str, Any]:
+    """
+    Open up to `connections` pooled connections at once (capped at pool_size)
+    so the TLS handshake + pre-ping cost lands before traffic, not on the first
+    requests after a deploy. All are held until every one is open; otherwise
+    the pool would hand the same connection back each time.
+    """
+    n = min(int(connections), _pool_capacity(engine))
+    if n <= 0:
+        return {"requested": connections, "opened": 0, "ms": 0.0, "errors": []}
+
+    t0 = time.perf_counter()
+    release, all_open = asyncio.Event(), asyncio.Event()
+    opened = 0
+    errors: list[str] = []
+
+    async def _one() -> None:
+        nonlocal opened
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("select 1"))
+                opened += 1
+                if opened + len(errors) >= n:
+                    all_open.set()
+                await release.wait()
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            if opened + len(errors) >= n:
+                all_open.set()
+
+    tasks = [asyncio.ensure_future(_one()) for _ in range(n)]
+    try:
+        await asyncio.wait_for(all_open.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        errors.append(f"timeout after {timeout}s")
+    finally:
+        release.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "requested": connections,
+        "opened": opened,
+        "ms": round((time.perf_counter() - t0) * 1000.0, 2),
+        "errors": errors[:5],
+    }
+
+
+async def prewarm_all(engines: Dict[str, AsyncEngine], connections: int, timeout: float = 10.0) -> Dict[str, Any]:
+    results = await asyncio.gather(*(prewarm(e, connections, timeout) for e in engines.values()))
+    _STATE["prewarm"] = dict(zip(engines.keys(), results))
+    return _STATE["prewarm"]
+
+
+def mark_ready() -> None:
+    global _ready_mono
+    _ready_mono = time.monotonic()
+    _STATE["phase"] = "ready"
+    _STATE["ready_after_s"] = round(_ready_mono - _BOOT_MONO, 3)
+
+
+# ---- request tracking (driven by InFlightMiddleware) ------------------------
+def request_started() -> float:
+    global _in_flight
+    _in_flight += 1
+    if _idle is not None:
+        _idle.clear()
+    return time.perf_counter()
+
+
+def first_byte(t0: float, path: str) -> None:
+    """Record time-to-first-byte of the first request this process served."""
+    if _STATE["first_request"] is not None:
+        return
+    now = time.monotonic()
+    _STATE["first_request"] = {
+        "path": path,
+        "ttfb_ms": round((time.perf_counter() - t0) * 1000.0, 2),
+        "since_ready_s": round(now - _ready_mono, 3) if _ready_mono is not None else None,
+    }
+    log.info("[lifecycle] first request %s ttfb=%.1fms", path, _STATE["first_request"]["ttfb_ms"])
+
+
+def request_finished() -> None:
+    global _in_flight
+    _in_flight = max(0, _in_flight - 1)
+    if _in_flight == 0 and _idle is not None:
+        _idle.set()
+
+
+# ---- shutdown ---------------------------------------------------------------
+def _checked_out(engines: Dict[str, AsyncEngine]) -> int:
+    total = 0
+    for eng in engines.values():
+        co = getattr(eng.sync_engine.pool, "checkedout", None)
+        total += int(co()) if callable(co) else 0
+    return total
+
+
+async def drain(engines: Dict[str, AsyncEngine], deadline_s: float) -> Dict[str, Any]:
+    """
+    Stop taking new requests (middleware answers 503), then wait until
+    in-flight requests finish and every pooled connection is checked back in,
+    or `deadline_s` passes. The caller disposes engines afterwards.
+    """
+    global _idle
+    _STATE["phase"] = "draining"
+    t0 = time.perf_counter()
+    _idle = asyncio.Event()
+    if _in_flight == 0:
+        _idle.set()
+    timed_out = False
+    try:
+        await asyncio.wait_for(_idle.wait(), timeout=max(0.0, deadline_s))
+        # background work (pinger, re-verify) may still hold a connection briefly
+        while _checked_out(engines) and time.perf_counter() - t0 < deadline_s:
+            await asyncio.sleep(0.05)
+        timed_out = bool(_checked_out(engines))
+    except asyncio.TimeoutError:
+        timed_out = True
+    _STATE["drain"] = {
+        "ms": round((time.perf_counter() - t0) * 1000.0, 2),
+        "timed_out": timed_out,
+        "abandoned_requests": _in_flight,
+        "checked_out": _checked_out(engines),
+    }
+    if timed_out:
+        log.warning("[lifecycle] drain deadline hit: %s", _STATE["drain"])
+    return _STATE["drain"]
+
+
+def mark_stopped() -> None:
+    _STATE["phase"] = "stopped"
+
+
+__all__ = [
+    "phase",
+    "is_ready",
+    "is_draining",
+    "in_flight",
+    "lifecycle_state",
+    "prewarm",
+    "prewarm_all",
+    "mark_ready",
+    "request_started",
+    "first_byte",
+    "request_finished",
+    "drain",
+    "mark_stopped",
+]
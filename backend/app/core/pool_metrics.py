@@ -0,0 +1,159 @@
+# path: backend/app/core/pool_metrics.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+# Upper bounds (ms) for the checkout wait histogram; last bucket is +Inf.
+WAIT_BUCKETS_MS: tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics:
+    """Counters for one engine's pool. Cheap enough to update on every checkout."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.checkout_failures = 0
+            self.last_failure: Optional[str] = None
+            self.wait_count = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.wait_buckets: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_wait(self, ms: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total_ms += ms
+            if ms > self.wait_max_ms:
+                self.wait_max_ms = ms
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if ms <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+
+    def record_failure(self, exc: BaseException) -> None:
+        with self._lock:
+            self.checkout_failures += 1
+            self.last_failure = f"{type(exc).__name__}: {exc}"[:300]
+
+    def snapshot(self, pool: Optional[Pool] = None) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"le_{int(b)}ms" for b in WAIT_BUCKETS_MS] + ["gt_%dms" % int(WAIT_BUCKETS_MS[-1])]
+            out: Dict[str, Any] = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "checkout_failures": self.checkout_failures,
+                "last_failure": self.last_failure,
+                "wait_ms": {
+                    "count": self.wait_count,
+                    "avg": round(self.wait_total_ms / self.wait_count, 3) if self.wait_count else 0.0,
+                    "max": round(self.wait_max_ms, 3),
+                    "histogram": dict(zip(labels, self.wait_buckets)),
+                },
+            }
+        if pool is not None:
+            out["pool"] = _pool_state(pool)
+        return out
+
+
+def _pool_state(pool: Pool) -> Dict[str, Any]:
+    """Live pool gauges; only QueuePool-style pools expose size/overflow."""
+    state: Dict[str, Any] = {"class": type(pool).__name__, "status": pool.status()}
+    for attr in ("size", "checkedout", "checkedin", "overflow"):
+        fn = getattr(pool, attr, None)
+        if callable(fn):
+            try:
+                state[attr] = fn()
+            except Exception:
+                pass
+    timeout = getattr(pool, "timeout", None)
+    if callable(timeout):
+        state["timeout"] = timeout()
+    return state
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times how long each checkout waited for a connection."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):  # type: ignore[override]
+        t0 = time.perf_counter()
+        try:
+            rec = super()._do_get()
+        except Exception as exc:
+            if self.metrics is not None:
+                self.metrics.record_failure(exc)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait((time.perf_counter() - t0) * 1000.0)
+        return rec
+
+    def recreate(self):  # type: ignore[override]
+        # why: engine.dispose() swaps in a fresh pool; keep counting into the same bucket
+        new = super().recreate()
+        new.metrics = self.metrics
+        return new
+
+
+_REGISTRY: Dict[str, PoolMetrics] = {}
+
+
+def attach_pool_metrics(engine: AsyncEngine, name: str) -> PoolMetrics:
+    """Hook pool events for `engine` and register its metrics under `name`."""
+    metrics = _REGISTRY.get(name) or PoolMetrics(name)
+    _REGISTRY[name] = metrics
+
+    pool = engine.sync_engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        pool.metrics = metrics
+
+    def _on_connect(dbapi_conn, rec) -> None:
+        metrics.connects += 1
+
+    def _on_checkout(dbapi_conn, rec, proxy) -> None:
+        metrics.checkouts += 1
+
+    def _on_checkin(dbapi_conn, rec) -> None:
+        metrics.checkins += 1
+
+    def _on_invalidate(dbapi_conn, rec, exc) -> None:
+        metrics.invalidations += 1
+
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "connect", _on_connect)
+    event.listen(sync_engine, "checkout", _on_checkout)
+    event.listen(sync_engine, "checkin", _on_checkin)
+    event.listen(sync_engine, "invalidate", _on_invalidate)
+    return metrics
+
+
+def get_pool_metrics(name: str) -> Optional[PoolMetrics]:
+    return _REGISTRY.get(name)
+
+
+__all__ = [
+    "WAIT_BUCKETS_MS",
+    "PoolMetrics",
+    "InstrumentedQueuePool",
+    "attach_pool_metrics",
+    "get_pool_metrics",
+]
@@ -0,0 +1,141 @@
+# path: backend/app/core/schema_registry.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+log = logging.getLogger("uvicorn")
+
+# Last startup/re-verify result; served by /__debug/schema. Handlers never run DDL.
+_STATE: Dict[str, Any] = {"ok": False, "checked_at": None, "note": "not checked yet"}
+_reverify_task: Optional[asyncio.Task] = None
+
+
+def model_bases() -> List[Tuple[str, Any]]:
+    """Every declarative base the app maps, imported so their tables are registered."""
+    from app.models.base import Base as CoreBase
+    from app.models.job import Base as JobsBase
+    # table modules on the shared Base
+    import app.models.skip  # noqa: F401
+    import app.models.skip_summary  # noqa: F401
+    import app.models.idempotency  # noqa: F401
+    import app.models.labels  # noqa: F401
+    import app.models.driver  # noqa: F401
+    import app.models.driver_schedule  # noqa: F401
+    for optional in ("app.models.vehicle", "app.models.contractor", "app.models.skip_assignment"):
+        try:
+            __import__(optional)
+        except Exception as e:  # keep booting if an optional model breaks
+            log.warning("[schema] skipped %s: %s", optional, e)
+    return [("core", CoreBase), ("jobs", JobsBase)]
+
+
+def _inspect(sync_conn, bases: List[Tuple[str, Any]]) -> Dict[str, Any]:
+    insp = inspect(sync_conn)
+    present = set(insp.get_table_names())
+    out: Dict[str, Any] = {}
+    missing_tables: List[str] = []
+    missing_indexes: List[str] = []
+    for name, base in bases:
+        tables: Dict[str, Any] = {}
+        for tname, table in sorted(base.metadata.tables.items()):
+            exists = tname in present
+            idx_live = {i["name"] for i in insp.get_indexes(tname)} if exists else set()
+            idx_want = {i.name for i in table.indexes if i.name}
+            gaps = sorted(idx_want - idx_live)
+            tables[tname] = {"exists": exists, "indexes": sorted(idx_live), "missing_indexes": gaps}
+            if not exists:
+                missing_tables.append(tname)
+            missing_indexes.extend(f"{tname}.{g}" for g in gaps)
+        out[name] = tables
+    return {"bases": out, "missing_tables": missing_tables, "missing_indexes": missing_indexes}
+
+
+async def ensure_schema(engine: AsyncEngine, *, create: bool) -> Dict[str, Any]:
+    """
+    One schema pass: optionally create_all for every base, then record which
+    tables/indexes exist. Called at startup (and by the optional re-verify loop).
+    """
+    global _STATE
+    t0 = time.perf_counter()
+    bases = model_bases()
+    errors: List[str] = []
+    try:
+        async with engine.begin() as conn:
+            if create:
+                for name, base in bases:
+                    try:
+                        await conn.run_sync(base.metadata.create_all)
+                        log.info("[schema] ensured %s", name)
+                    except Exception as e:
+                        errors.append(f"create_all({name}): {type(e).__name__}: {e}")
+                        log.warning("[schema] create_all(%s) failed: %s", name, e)
+            report = await conn.run_sync(_inspect, bases)
+    except Exception as e:
+        report = {"bases": {}, "missing_tables": [], "missing_indexes": []}
+        errors.append(f"{type(e).__name__}: {e}")
+        log.warning("[schema] check failed: %s", e)
+
+    _STATE = {
+        "ok": not errors and not report["missing_tables"],
+        "checked_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "duration_ms": round((time.perf_counter() - t0) * 1000.0, 2),
+        "created": create,
+        "dialect": engine.dialect.name,
+        "errors": errors,
+        **report,
+    }
+    if report["missing_tables"]:
+        log.warning("[schema] missing tables: %s", ", ".join(report["missing_tables"]))
+    return _STATE
+
+
+def schema_state() -> Dict[str, Any]:
+    return _STATE
+
+
+def schema_ready() -> bool:
+    return bool(_STATE.get("ok"))
+
+
+async def _reverify_loop(engine: AsyncEngine, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await ensure_schema(engine, create=False)
+        except Exception as e:  # never let the loop die
+            log.warning("[schema] re-verify failed: %s", e)
+
+
+def start_reverify(engine: AsyncEngine, interval: float) -> None:
+    """Background inspection (no DDL) every `interval` seconds; 0 disables."""
+    global _reverify_task
+    if interval <= 0 or _reverify_task is not None:
+        return
+    _reverify_task = asyncio.get_running_loop().create_task(_reverify_loop(engine, interval))
+
+
+async def stop_reverify() -> None:
+    global _reverify_task
+    task, _reverify_task = _reverify_task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+__all__ = [
+    "model_bases",
+    "ensure_schema",
+    "schema_state",
+    "schema_ready",
+    "start_reverify",
+    "stop_reverify",
+]
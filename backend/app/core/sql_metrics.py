@@ -0,0 +1,199 @@
+# path: backend/app/core/sql_metrics.py
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+try:
+    from app.core.config import settings  # type: ignore
+except Exception:  # pragma: no cover
+    settings = None  # type: ignore
+
+
+def _cfg(name: str, default):
+    return getattr(settings, name, default) if settings is not None else default
+
+
+# ---- statement shapes -------------------------------------------------------
+_WS = re.compile(r"\s+")
+_STR = re.compile(r"'(?:[^']|'')*'")
+_NUM = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*[?$:%\w()]+\s*,)+\s*[?$:%\w()]+\s*\)", re.IGNORECASE)
+_PARAM = re.compile(r"(\$\d+|:\w+|%\(\w+\)s|\?)")
+
+
+def statement_shape(sql: str) -> str:
+    """Collapse literals/params so repeated statements of the same form compare equal."""
+    s = _WS.sub(" ", sql).strip()
+    s = _STR.sub("?", s)
+    s = _PARAM.sub("?", s)
+    s = _NUM.sub("?", s)
+    s = _IN_LIST.sub("IN (?…)", s)
+    return s[:400]
+
+
+# ---- per-request accumulator ------------------------------------------------
+class RequestSQLStats:
+    __slots__ = ("path", "count", "total_ms", "shapes")
+
+    def __init__(self, path: str = "") -> None:
+        self.path = path
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, shape: str, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.shapes[shape] += 1
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Shapes executed at least `threshold` times — the usual N+1 signature."""
+        return {k: v for k, v in self.shapes.items() if v >= threshold}
+
+
+_current: ContextVar[Optional[RequestSQLStats]] = ContextVar("wms_sql_stats", default=None)
+
+
+def begin_request(path: str = "") -> tuple[RequestSQLStats, Any]:
+    stats = RequestSQLStats(path)
+    return stats, _current.set(stats)
+
+
+def end_request(token: Any) -> None:
+    _current.reset(token)
+
+
+def current_request() -> Optional[RequestSQLStats]:
+    return _current.get()
+
+
+# ---- process-wide aggregates ------------------------------------------------
+class _RouteStats:
+    __slots__ = ("requests", "statements", "max_statements", "db_ms", "n_plus_one", "suspects")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.statements = 0
+        self.max_statements = 0
+        self.db_ms = 0.0
+        self.n_plus_one = 0
+        self.suspects: Counter[str] = Counter()
+
+
+_lock = threading.Lock()
+_routes: Dict[str, _RouteStats] = {}
+_slow: Deque[Dict[str, Any]] = deque(maxlen=int(_cfg("SQL_SLOW_LOG_SIZE", 200)))
+
+
+def record_request(route: str, stats: RequestSQLStats) -> Dict[str, int]:
+    """Fold one finished request into the per-route table; returns suspected N+1 shapes."""
+    suspects = stats.repeated(int(_cfg("SQL_NPLUSONE_THRESHOLD", 5)))
+    with _lock:
+        rs = _routes.get(route)
+        if rs is None:
+            rs = _routes[route] = _RouteStats()
+        rs.requests += 1
+        rs.statements += stats.count
+        rs.db_ms += stats.total_ms
+        if stats.count > rs.max_statements:
+            rs.max_statements = stats.count
+        if suspects:
+            rs.n_plus_one += 1
+            rs.suspects.update(suspects)
+    return suspects
+
+
+def top_routes(limit: int = 20, order_by: str = "avg_statements") -> List[Dict[str, Any]]:
+    with _lock:
+        rows = [
+            {
+                "route": route,
+                "requests": rs.requests,
+                "avg_statements": round(rs.statements / rs.requests, 2) if rs.requests else 0.0,
+                "max_statements": rs.max_statements,
+                "avg_db_ms": round(rs.db_ms / rs.requests, 3) if rs.requests else 0.0,
+                "n_plus_one_requests": rs.n_plus_one,
+                "n_plus_one_shapes": [{"shape": k, "executions": v} for k, v in rs.suspects.most_common(3)],
+            }
+            for route, rs in _routes.items()
+        ]
+    key = order_by if rows and order_by in rows[0] else "avg_statements"
+    rows.sort(key=lambda r: r[key], reverse=True)
+    return rows[: max(1, limit)]
+
+
+def slow_queries(limit: int = 50) -> List[Dict[str, Any]]:
+    with _lock:
+        items = list(_slow)
+    return items[-max(1, limit):][::-1]
+
+
+def reset() -> None:
+    with _lock:
+        _routes.clear()
+        _slow.clear()
+
+
+# ---- engine hooks -----------------------------------------------------------
+def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("wms_sql_t0", []).append(time.perf_counter())
+
+
+def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+    stack = conn.info.get("wms_sql_t0")
+    if not stack:
+        return
+    ms = (time.perf_counter() - stack.pop()) * 1000.0
+    shape = statement_shape(statement)
+
+    stats = _current.get()
+    if stats is not None:
+        stats.record(shape, ms)
+
+    if ms >= float(_cfg("SQL_SLOW_MS", 200.0)):
+        with _lock:
+            _slow.append({
+                "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "ms": round(ms, 3),
+                "path": stats.path if stats is not None else None,
+                "shape": shape,
+                "executemany": bool(executemany),
+            })
+
+
+def _on_error(ctx) -> None:
+    # after_cursor_execute never fires for a failed statement; drop its start time
+    conn = getattr(ctx, "connection", None)
+    stack = conn.info.get("wms_sql_t0") if conn is not None else None
+    if stack:
+        stack.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    if not bool(_cfg("SQL_INSTRUMENTATION", True)):
+        return
+    event.listen(engine.sync_engine, "before_cursor_execute", _before)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after)
+    event.listen(engine.sync_engine, "handle_error", _on_error)
+
+
+__all__ = [
+    "statement_shape",
+    "RequestSQLStats",
+    "begin_request",
+    "end_request",
+    "current_request",
+    "record_request",
+    "top_routes",
+    "slow_queries",
+    "reset",
+    "instrument_engine",
+]
@@ -0,0 +1,257 @@
+# path: backend/app/core/timeouts.py
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+try:
+    from app.core.config import settings  # type: ignore
+except Exception:  # pragma: no cover
+    settings = None  # type: ignore
+
+
+def _cfg(name: str, default):
+    return getattr(settings, name, default) if settings is not None else default
+
+
+# ---- route classes ----------------------------------------------------------
+# read   : GET lookups/lists                    (DB_TIMEOUT_READ_MS)
+# report : PDF/PNG/label/WTN rendering routes   (DB_TIMEOUT_REPORT_MS)
+# write  : everything else                      (DB_TIMEOUT_WRITE_MS)
+_REPORT_HINTS = (".pdf", ".png", "/labels", "/wtn/")
+
+
+def route_class(method: str, path: str) -> str:
+    if any(h in path for h in _REPORT_HINTS):
+        return "report"
+    return "read" if method in {"GET", "HEAD"} else "write"
+
+
+def timeout_ms_for(cls: str) -> int:
+    return int(_cfg(f"DB_TIMEOUT_{cls.upper()}_MS", 0) or 0)
+
+
+_timeout: ContextVar[int] = ContextVar("wms_stmt_timeout_ms", default=0)
+
+
+def set_statement_timeout(ms: int) -> Any:
+    return _timeout.set(max(0, int(ms)))
+
+
+def reset_statement_timeout(token: Any) -> None:
+    _timeout.reset(token)
+
+
+def current_statement_timeout() -> int:
+    return _timeout.get()
+
+
+def is_timeout_error(exc: BaseException) -> bool:
+    """Postgres statement_timeout (SQLSTATE 57014) or an interrupted SQLite statement."""
+    orig = getattr(exc, "orig", exc)
+    if getattr(orig, "sqlstate", None) == "57014" or getattr(orig, "pgcode", None) == "57014":
+        return True
+    msg = str(orig).lower()
+    return "statement timeout" in msg or "canceling statement" in msg or msg.strip() == "interrupted"
+
+
+# ---- client disconnect ------------------------------------------------------
+class ClientDisconnected(Exception):
+    """Raised at the next SQL statement once the request's client has gone away."""
+
+
+class RequestDeadline:
+    """
+    Per-request state shared with the engine hooks. A request holding a
+    session is never hard-cancelled (a cancel landing mid-checkout or mid-query
+    can strand the pooled connection); instead its in-flight SQLite statement
+    is interrupted and the next statement raises ClientDisconnected, so the
+    handler unwinds normally and its session closes.
+    """
+
+    __slots__ = ("gone", "sessions", "in_flight")
+
+    def __init__(self) -> None:
+        self.gone = False
+        self.sessions = 0
+        self.in_flight: Any = None  # sqlite3.Connection running a statement
+
+
+_request: ContextVar[Optional[RequestDeadline]] = ContextVar("wms_deadline", default=None)
+
+
+def begin_request() -> tuple[RequestDeadline, Any]:
+    state = RequestDeadline()
+    return state, _request.set(state)
+
+
+def end_request(token: Any) -> None:
+    _request.reset(token)
+
+
+def session_opened() -> None:
+    state = _request.get()
+    if state is not None:
+        state.sessions += 1
+
+
+def session_closed() -> None:
+    state = _request.get()
+    if state is not None:
+        state.sessions = max(0, state.sessions - 1)
+
+
+def client_gone(state: RequestDeadline) -> bool:
+    """Flag the request; True when it holds no session and can simply be cancelled."""
+    state.gone = True
+    raw = state.in_flight
+    if raw is not None:
+        try:
+            raw.interrupt()
+        except Exception:
+            pass
+    return state.sessions == 0
+
+
+def client_gone_now() -> bool:
+    state = _request.get()
+    return bool(state is not None and state.gone)
+
+
+# ---- Postgres: SET LOCAL per transaction -----------------------------------
+@event.listens_for(Session, "after_begin")
+def _pg_set_local(session, transaction, connection) -> None:
+    ms = _timeout.get()
+    if ms and connection.dialect.name.startswith("postgres"):
+        # SET LOCAL is transaction-scoped, so it is safe behind pgbouncer/pooled conns
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(ms)}")
+
+
+# ---- statement hooks (SQLite timeout timer + disconnect checks) -------------
+def _raw_sqlite(conn) -> Any:
+    if conn.dialect.name != "sqlite":
+        return None
+    return getattr(getattr(conn.connection, "driver_connection", None), "_conn", None)  # sqlite3.Connection
+
+
+def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+    state = _request.get()
+    if state is not None and state.gone:
+        raise ClientDisconnected("client disconnected")
+    raw = _raw_sqlite(conn)
+    if raw is None:
+        return
+    if state is not None:
+        state.in_flight = raw
+    ms = _timeout.get()
+    if ms:
+        # sqlite3.Connection.interrupt() is thread-safe; the query runs on aiosqlite's thread
+        loop = asyncio.get_running_loop()
+        conn.info.setdefault("wms_interrupts", []).append(loop.call_later(ms / 1000.0, raw.interrupt))
+
+
+def _clear(conn) -> Optional[RequestDeadline]:
+    state = _request.get()
+    if state is not None:
+        state.in_flight = None
+    pending = conn.info.get("wms_interrupts")
+    if pending:
+        pending.pop().cancel()
+    return state
+
+
+def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+    state = _clear(conn)
+    if state is not None and state.gone:
+        raise ClientDisconnected("client disconnected")
+
+
+def _on_error(ctx) -> None:
+    conn = getattr(ctx, "connection", None)
+    if conn is not None:
+        _clear(conn)
+
+
+def install_statement_timeouts(engine: AsyncEngine) -> None:
+    """Postgres timeouts use the Session hook above; SQLite needs per-statement timers."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after)
+    event.listen(engine.sync_engine, "handle_error", _on_error)
+
+
+# ---- metrics ----------------------------------------------------------------
+class _Metrics:
+    """Counters behind /__debug/timeouts. Pool time saved is an estimate: the
+    route's typical duration minus how long the cancelled request had run."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.cancelled = 0
+        self.cancelled_by_class: Dict[str, int] = {}
+        self.pool_ms_saved = 0.0
+        self.statement_timeouts = 0
+        self.route_ewma_ms: Dict[str, float] = {}
+
+    def observe(self, route: str, ms: float) -> None:
+        with self.lock:
+            prev = self.route_ewma_ms.get(route)
+            self.route_ewma_ms[route] = ms if prev is None else prev * 0.8 + ms * 0.2
+
+    def cancelled_request(self, route: str, cls: str, elapsed_ms: float, used_db: bool) -> None:
+        with self.lock:
+            self.cancelled += 1
+            self.cancelled_by_class[cls] = self.cancelled_by_class.get(cls, 0) + 1
+            typical = self.route_ewma_ms.get(route)
+            if used_db and typical is not None:
+                self.pool_ms_saved += max(0.0, typical - elapsed_ms)
+
+    def timed_out(self) -> None:
+        with self.lock:
+            self.statement_timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "cancelled_on_disconnect": self.cancelled,
+                "cancelled_by_class": dict(self.cancelled_by_class),
+                "pool_ms_saved_est": round(self.pool_ms_saved, 1),
+                "statement_timeouts": self.statement_timeouts,
+                "timeouts_ms": {c: timeout_ms_for(c) for c in ("read", "write", "report")},
+            }
+
+
+metrics = _Metrics()
+
+
+def timeout_metrics() -> Dict[str, Any]:
+    return metrics.snapshot()
+
+
+__all__ = [
+    "route_class",
+    "timeout_ms_for",
+    "set_statement_timeout",
+    "reset_statement_timeout",
+    "current_statement_timeout",
+    "is_timeout_error",
+    "ClientDisconnected",
+    "RequestDeadline",
+    "begin_request",
+    "end_request",
+    "session_opened",
+    "session_closed",
+    "client_gone",
+    "client_gone_now",
+    "install_statement_timeouts",
+    "metrics",
+    "timeout_metrics",
+]
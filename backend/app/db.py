@@ -6,8 +6,13 @@ import ssl
 from pathlib import Path
 from typing import Dict, Optional, AsyncGenerator
 
+from sqlalchemy import event
 from sqlalchemy.engine import URL, make_url
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.pool_metrics import InstrumentedQueuePool, attach_pool_metrics
+from app.core.sql_metrics import instrument_engine
+from app.core.timeouts import install_statement_timeouts
 
 # ---- helpers ----------------------------------------------------------------
 APP_DIR = Path(__file__).resolve().parent
@@ -41,6 +46,22 @@ def _build_url() -> URL:
     except Exception:
         return URL.create(drivername="sqlite+aiosqlite", database=DEFAULT_SQLITE_PATH)
 
+def _build_replica_url() -> Optional[URL]:
+    """DATABASE_REPLICA_URL is optional; no value (or an unparsable one) means reads use the primary."""
+    try:
+        from app.core.config import settings  # type: ignore
+        cand = os.getenv("DATABASE_REPLICA_URL") or getattr(settings, "DATABASE_REPLICA_URL", None)
+    except Exception:
+        cand = os.getenv("DATABASE_REPLICA_URL")
+    s = _normalize_raw(cand)
+    if not s:
+        return None
+    try:
+        return make_url(s)
+    except Exception:
+        print("[db] WARN: DATABASE_REPLICA_URL unparsable; reads stay on primary", flush=True)
+        return None
+
 def _build_connect_args(url: URL) -> Dict[str, object]:
     if url.get_backend_name().startswith("sqlite"):
         return {"timeout": 30}
@@ -56,12 +77,131 @@ def _build_connect_args(url: URL) -> Dict[str, object]:
         return {"ssl": ctx}
     return {}
 
-# ---- engine -----------------------------------------------------------------
+def _is_memory_sqlite(url: URL) -> bool:
+    return url.get_backend_name().startswith("sqlite") and (url.database or ":memory:") in {":memory:", ""}
+
+def _setting(name: str, default):
+    try:
+        from app.core.config import settings  # type: ignore
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+def _engine_kwargs(url: URL, **pool_overrides: object) -> Dict[str, object]:
+    """Pool sizing comes from Settings so Render/Postgres plans can be tuned without code changes."""
+    kw: Dict[str, object] = {
+        "echo": False,
+        "pool_pre_ping": bool(_setting("DB_POOL_PRE_PING", True)),
+        "connect_args": _build_connect_args(url),
+    }
+    if _is_memory_sqlite(url):
+        return kw  # StaticPool: one shared connection, sizing does not apply
+    kw.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=int(_setting("DB_POOL_SIZE", 5)),
+        max_overflow=int(_setting("DB_MAX_OVERFLOW", 5)),
+        pool_recycle=int(_setting("DB_POOL_RECYCLE", 1800)),
+        pool_timeout=float(_setting("DB_POOL_TIMEOUT", 30.0)),
+    )
+    kw.update(pool_overrides)
+    return kw
+
+# ---- SQLite production mode -------------------------------------------------
+# SQLITE_WAL_MODE=1 turns a file-backed SQLite DB into: one writer connection
+# (pool of 1 — every write transaction queues for it FIFO, so app writers never
+# race each other into "database is locked") plus a pool of read-only
+# connections that WAL lets run concurrently with that writer.
+def sqlite_wal_enabled(url: URL) -> bool:
+    return (
+        url.get_backend_name().startswith("sqlite")
+        and not _is_memory_sqlite(url)
+        and bool(_setting("SQLITE_WAL_MODE", False))
+    )
+
+def _sqlite_readonly_url(url: URL) -> URL:
+    path = Path(url.database or DEFAULT_SQLITE_PATH).resolve().as_posix()
+    return URL.create(drivername=url.drivername, database=f"file:{path}", query={"mode": "ro", "uri": "true"})
+
+def _apply_sqlite_pragmas(eng: AsyncEngine, *, readonly: bool) -> None:
+    mmap_bytes = int(_setting("SQLITE_MMAP_BYTES", 256 * 1024 * 1024))
+    cache_kib = int(_setting("SQLITE_CACHE_KIB", 64 * 1024))
+    busy_ms = int(float(_setting("DB_POOL_TIMEOUT", 30.0)) * 1000)
+
+    @event.listens_for(eng.sync_engine, "connect")
+    def _on_connect(dbapi_conn, rec) -> None:
+        cur = dbapi_conn.cursor()
+        try:
+            if readonly:
+                cur.execute("PRAGMA query_only=ON")
+            else:
+                cur.execute("PRAGMA journal_mode=WAL")  # persistent on the file; readers inherit it
+                cur.execute("PRAGMA synchronous=NORMAL")
+            cur.execute(f"PRAGMA busy_timeout={busy_ms}")
+            cur.execute(f"PRAGMA mmap_size={mmap_bytes}")
+            cur.execute(f"PRAGMA cache_size=-{cache_kib}")
+            cur.execute("PRAGMA temp_store=MEMORY")
+        finally:
+            cur.close()
+
+# ---- engine registry --------------------------------------------------------
+# One engine (and so one pool) per role per process. Everything that needs a
+# connection — routers, main.py, scripts, alembic — goes through here.
+_ENGINES: Dict[str, AsyncEngine] = {}
+
+def create_engine_for(url: URL, *, name: str, **pool_overrides: object) -> AsyncEngine:
+    eng = create_async_engine(url, **_engine_kwargs(url, **pool_overrides))
+    attach_pool_metrics(eng, name)
+    instrument_engine(eng)
+    install_statement_timeouts(eng)
+    _ENGINES[name] = eng
+    return eng
+
+def get_engine(name: str = "primary") -> AsyncEngine:
+    try:
+        return _ENGINES[name]
+    except KeyError:
+        raise RuntimeError(f"no engine registered as {name!r}") from None
+
+def engines() -> Dict[str, AsyncEngine]:
+    return dict(_ENGINES)
+
+async def dispose_engines() -> None:
+    for eng in _ENGINES.values():
+        await eng.dispose()
+
 DB_URL: URL = _build_url()
 print(f"[db] Using DB_URL = {repr(DB_URL)}", flush=True)
 
 connect_args = _build_connect_args(DB_URL)
-engine = create_async_engine(DB_URL, echo=False, pool_pre_ping=True, connect_args=connect_args)
+SQLITE_WAL: bool = sqlite_wal_enabled(DB_URL)
+if SQLITE_WAL:
+    engine = create_engine_for(DB_URL, name="primary", pool_size=1, max_overflow=0)
+    _apply_sqlite_pragmas(engine, readonly=False)
+else:
+    engine = create_engine_for(DB_URL, name="primary")
+
+REPLICA_URL: Optional[URL] = _build_replica_url()
+replica_engine: Optional[AsyncEngine] = None
+if REPLICA_URL is not None:
+    print(f"[db] Using REPLICA_URL = {repr(REPLICA_URL)}", flush=True)
+    replica_engine = create_engine_for(REPLICA_URL, name="replica")
+elif SQLITE_WAL:
+    # read-only connections on the same file stand in for a replica
+    REPLICA_URL = _sqlite_readonly_url(DB_URL)
+    print(f"[db] SQLite WAL mode: 1 writer + {int(_setting('SQLITE_READ_POOL_SIZE', 4))} readers", flush=True)
+    replica_engine = create_engine_for(
+        REPLICA_URL, name="replica",
+        pool_size=int(_setting("SQLITE_READ_POOL_SIZE", 4)), max_overflow=0,
+    )
+    _apply_sqlite_pragmas(replica_engine, readonly=True)
+
+# Reads that must see the latest commit (health pings, idempotency lookups).
+# In WAL mode that is the read-only pool on the same file, so they never queue
+# behind a write transaction for the single writer connection; otherwise the
+# primary (a real replica may lag).
+fresh_read_engine: AsyncEngine = replica_engine if SQLITE_WAL else engine
+# A separate replica server trails the primary; WAL readers on the same file do not.
+REPLICA_MAY_LAG: bool = replica_engine is not None and not SQLITE_WAL
 
 # ---- Base shim (so `from app.db import Base` works) --------------------------
 try:
@@ -79,10 +219,16 @@ except Exception:
 
 # ---- Optional: session factory for tests/utilities ---------------------------
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+# Read-only sessions: replica when configured, otherwise the primary pool.
+ReadSessionLocal = async_sessionmaker(replica_engine or engine, expire_on_commit=False, class_=AsyncSession)
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Optional DI helper; tests can import from app.db if needed."""
     async with AsyncSessionLocal() as session:
         yield session
 
-__all__ = ["engine", "DB_URL", "Base", "AsyncSessionLocal", "get_db"]
+__all__ = [
+    "engine", "replica_engine", "DB_URL", "REPLICA_URL", "SQLITE_WAL", "Base",
+    "AsyncSessionLocal", "ReadSessionLocal", "get_db",
+    "create_engine_for", "get_engine", "engines", "dispose_engines",
+]
@@ -4,10 +4,12 @@ import logging
 import os
 from typing import Any, Dict, List
 
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from fastapi.routing import APIRoute
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from urllib.parse import urlparse, parse_qs
 
 from app.core.config import (
@@ -17,8 +19,22 @@ from app.core.config import (
     get_skip_size_presets,
 )
 
-# ✅ Single canonical engine
-from app.core.deps import engine as db_engine
+# ✅ Single canonical engine (shared registry in app.db)
+from app.db import engine as db_engine, engines as db_engines, dispose_engines, AsyncSessionLocal, fresh_read_engine
+from app.core.pool_metrics import get_pool_metrics
+from app.core import sql_metrics
+from app.core import health as health_state
+from app.middleware_sqltiming import SQLTimingMiddleware
+from app.middleware_inflight import InFlightMiddleware
+from app.middleware_deadline import RequestDeadlineMiddleware
+from app.middleware_idempotency import IdempotencyMiddleware
+from app.core import timeouts
+from app.services.skip_cache import skip_cache
+from app.services import skip_summary
+from app.services.label_pool import label_pool
+from app.services import idempotency
+from app.services.skip_versions import skip_versions
+from app.core import lifecycle
 
 # Routers
 from app.api.routes import api_router
@@ -26,8 +42,8 @@ from app.routers.admin import jobs as admin_jobs_router
 from app.routers.driver import schedule_jobs as driver_schedule_router
 from app.routers.admin import debug_settings as debug_settings_router
 
-# Dev bootstrap models (optional)
-from app.models.job import Base as JobsBase
+# Schema readiness (startup create_all/verify; see app.core.schema_registry)
+from app.core import schema_registry
 
 # Optional: no-op fallback if middleware missing
 try:
@@ -67,6 +83,8 @@ WILDCARD = (CORS_ORIGINS_LIST == ["*"]) or ("*" in CORS_ORIGINS_LIST)
 ALLOW_CREDS = bool(getattr(settings, "CORS_ALLOW_CREDENTIALS", False)) and not WILDCARD
 ALLOW_ORIGINS = ["*"] if WILDCARD else CORS_ORIGINS_LIST
 
+# innermost: Idempotency-Key replay for POSTs, only for requests the API-key check let through
+app.add_middleware(IdempotencyMiddleware, engine=db_engine, read_engine=fresh_read_engine)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOW_ORIGINS,
@@ -80,6 +98,27 @@ app.add_middleware(
     allow_prefixes=("/__meta", "/__debug", "/docs", "/redoc", "/openapi.json", "/skips/__smoke"),
     hide_403=False,
 )
+# per-route statement timeouts + cancel GETs whose client disconnected
+app.add_middleware(RequestDeadlineMiddleware)
+# counts SQL for everything below it, including auth middleware
+app.add_middleware(SQLTimingMiddleware)
+# outermost of all: in-flight count for the shutdown drain; 503 while draining
+app.add_middleware(InFlightMiddleware)
+
+@app.exception_handler(timeouts.ClientDisconnected)
+async def _client_gone_handler(request: Request, exc: timeouts.ClientDisconnected):
+    return Response(status_code=499)  # nobody is listening; just unwind quietly
+
+@app.exception_handler(DBAPIError)
+async def _db_timeout_handler(request: Request, exc: DBAPIError):
+    # statement_timeout / SQLite interrupt -> 504; anything else stays a 500
+    if not timeouts.is_timeout_error(exc):
+        raise exc
+    if timeouts.client_gone_now():
+        return Response(status_code=499)  # interrupted because the client left
+    timeouts.metrics.timed_out()
+    log.warning("[deadline] statement timeout on %s %s", request.method, request.url.path)
+    return JSONResponse({"detail": "database statement timed out"}, status_code=504)
 
 # ---- Mount routers once ----
 app.include_router(driver_schedule_router.router)
@@ -101,14 +140,39 @@ except Exception as e:
     print(f"[main] WARN: couldn't mount admin_vehicles: {type(e).__name__}: {e}", flush=True)
 
 # ---- Health / meta ----
+# Probes answer from the background pinger's cache (app.core.health) so they
+# never take a pooled connection; /__health/deep is the explicit live check.
+# Pings go to fresh_read_engine: in SQLite WAL mode the read-only pool, so a
+# long write holding the single writer connection cannot time them out.
+_HEALTH_PING_TIMEOUT = float(getattr(settings, "HEALTH_PING_TIMEOUT", 2.0))
+
 @app.get("/__health")
 async def health():
-    try:
-        async with db_engine.begin() as conn:
-            await conn.execute(text("select 1"))
-        return {"ok": True}
-    except Exception as e:
-        raise HTTPException(500, f"db ping failed: {type(e).__name__}: {e}")
+    st = health_state.db_state() if health_state.pinger_running() else \
+        await health_state.ping(fresh_read_engine, _HEALTH_PING_TIMEOUT)
+    if not st["ok"]:
+        raise HTTPException(503, f"db ping failed: {st['last_error']}")
+    return {"ok": True, "db_latency_ms": st["latency_ms"], "checked_at": st["checked_at"]}
+
+@app.get("/__health/deep")
+async def health_deep():
+    st = await health_state.ping(fresh_read_engine, _HEALTH_PING_TIMEOUT)
+    if not st["ok"]:
+        raise HTTPException(503, f"db ping failed: {st['last_error']}")
+    return {"ok": True, "db_latency_ms": st["latency_ms"]}
+
+@app.get("/__health/live")
+def health_live():
+    """Liveness: the process and event loop answer. A degraded DB does not fail this."""
+    return {"ok": True, "uptime_s": health_state.uptime_s(), "pinger_running": health_state.pinger_running()}
+
+@app.get("/__health/ready")
+def health_ready():
+    """Readiness: startup (prewarm) done, schema checked and the last fresh DB ping succeeded; 503 takes us out of rotation."""
+    db = health_state.db_state()
+    body = {"ready": bool(lifecycle.is_ready() and db["ok"] and not db["stale"] and schema_registry.schema_ready()),
+            "phase": lifecycle.phase(), "schema_ok": schema_registry.schema_ready(), "db": db}
+    return body if body["ready"] else JSONResponse(body, status_code=503)
 
 @app.get("/__meta/build")
 def build_meta():
@@ -130,6 +194,55 @@ def debug_engine():
         return {"error": f"{type(e).__name__}: {e}"}
     return {"dialect": dialect, "url": url}
 
+@app.get("/__debug/pool")
+def debug_pool() -> Dict[str, Any]:
+    """Live pool gauges + checkout wait histogram per registered engine."""
+    out: Dict[str, Any] = {}
+    for name, eng in db_engines().items():
+        metrics = get_pool_metrics(name)
+        pool = eng.sync_engine.pool
+        out[name] = metrics.snapshot(pool) if metrics else {"pool": {"status": pool.status()}}
+    return out
+
+@app.get("/__debug/lifecycle")
+def debug_lifecycle() -> Dict[str, Any]:
+    """Phase, prewarm result, first-request TTFB and last drain summary."""
+    return lifecycle.lifecycle_state()
+
+@app.get("/__debug/timeouts")
+def debug_timeouts() -> Dict[str, Any]:
+    """Statement timeouts per route class, disconnect cancellations and estimated pool time saved."""
+    return timeouts.timeout_metrics()
+
+@app.get("/__debug/cache")
+def debug_cache() -> Dict[str, Any]:
+    """In-process caches: hit/miss/eviction counters."""
+    return {"skip_qr": skip_cache.stats(), "idempotency": idempotency.idempotency_store.stats()}
+
+@app.get("/__debug/concurrency")
+def debug_concurrency() -> Dict[str, Any]:
+    """Skip version compare-and-set: conflicts, retries and actions that ran out of retries (409)."""
+    return skip_versions.stats()
+
+@app.get("/__debug/labels")
+def debug_labels() -> Dict[str, Any]:
+    return label_pool.stats()
+
+@app.get("/__debug/schema")
+def debug_schema() -> Dict[str, Any]:
+    """Result of the startup (or latest background) schema check: tables + indexes per model base."""
+    return schema_registry.schema_state()
+
+@app.get("/__debug/sql", dependencies=[Depends(admin_gate)])
+def debug_sql(limit: int = 20, order_by: str = "avg_statements") -> Dict[str, Any]:
+    """Routes ranked by statements/request (or avg_db_ms, n_plus_one_requests) plus recent slow queries."""
+    return {
+        "routes": sql_metrics.top_routes(limit=limit, order_by=order_by),
+        "slow": sql_metrics.slow_queries(limit=limit),
+        "slow_ms": getattr(settings, "SQL_SLOW_MS", None),
+        "n_plus_one_threshold": getattr(settings, "SQL_NPLUSONE_THRESHOLD", None),
+    }
+
 # ---- Startup (dev-only create_all) ----
 @app.on_event("startup")
 async def _startup() -> None:
@@ -137,36 +250,37 @@ async def _startup() -> None:
     log.info("[startup] DB_URL = %s", DB_URL)
     log.info("[startup] CORS allow_origins=%s allow_credentials=%s", ALLOW_ORIGINS, ALLOW_CREDS)
 
+    # One schema pass for every model base (create_all only in dev); handlers never run DDL.
     env = (os.getenv("ENV") or getattr(settings, "ENV", "dev")).lower()
-    if env == "dev":
+    if env != "dev":
+        log.info("[bootstrap] skip create_all in non-dev (verify only)")
+    state = await schema_registry.ensure_schema(db_engine, create=(env == "dev"))
+    log.info("[schema] ok=%s tables_missing=%d in %.1fms",
+             state.get("ok"), len(state.get("missing_tables", [])), state.get("duration_ms", 0.0))
+    schema_registry.start_reverify(db_engine, float(getattr(settings, "SCHEMA_REVERIFY_SECONDS", 0)))
+    if state.get("ok"):
         try:
-            from app.models.skip import Base as SkipBase
-            from app.models.labels import Base as LabelsBase
-            from app.models.driver import Base as DriverBase
-            try:
-                from app.models.base import Base as CoreBase
-            except Exception:
-                CoreBase = None  # type: ignore
-            try:
-                from app.models.vehicle import Base as VehicleBase
-            except Exception:
-                VehicleBase = None  # type: ignore
-
-            groups = [("skips", SkipBase), ("labels", LabelsBase), ("driver", DriverBase), ("jobs", JobsBase)]
-            if CoreBase is not None: groups.append(("core", CoreBase))
-            if VehicleBase is not None: groups.append(("vehicles", VehicleBase))
-
-            async with db_engine.begin() as conn:
-                for name, base in groups:
-                    try:
-                        await conn.run_sync(base.metadata.create_all)
-                        log.info("[bootstrap] ensured %s", name)
-                    except Exception as e:
-                        log.warning("[bootstrap] create_all(%s) failed: %s", name, e)
+            async with AsyncSessionLocal() as s:
+                if await skip_summary.rebuild_if_empty(s):
+                    log.info("[startup] skip_summary backfilled")
         except Exception as e:
-            log.warning("[bootstrap] engine.begin() failed: %s", e)
-    else:
-        log.info("[bootstrap] skip create_all in non-dev")
+            log.warning("[startup] skip_summary backfill skipped: %s", e)
+
+    # Open pooled connections (TLS + pre-ping) now rather than on the first requests.
+    warm = await lifecycle.prewarm_all(db_engines(), int(getattr(settings, "DB_PREWARM_CONNECTIONS", 0)))
+    for name, res in warm.items():
+        log.info("[startup] prewarm %s: %d conn in %.1fms %s", name, res["opened"], res["ms"], res["errors"] or "")
+    # Spawn the label render workers too (each imports reportlab), not on the first label request.
+    try:
+        await label_pool.warm()
+        log.info("[startup] label pool: %s x%d", label_pool.active_mode, label_pool.workers)
+    except Exception as e:
+        log.warning("[startup] label pool warm-up failed (renders will start it): %s", e)
+
+    # First ping inline so readiness is known before traffic arrives; then background.
+    await health_state.ping(fresh_read_engine, _HEALTH_PING_TIMEOUT)
+    health_state.start_pinger(fresh_read_engine, float(getattr(settings, "HEALTH_PING_SECONDS", 5)), _HEALTH_PING_TIMEOUT)
+    idempotency.start_sweeper(db_engine, float(getattr(settings, "IDEMPOTENCY_SWEEP_SECONDS", 300)))
 
     # enumerate mounted routes (debug)
     try:
@@ -177,6 +291,21 @@ async def _startup() -> None:
     except Exception as exc:
         log.warning("Failed to enumerate routes: %s", exc)
 
+    lifecycle.mark_ready()
+
+@app.on_event("shutdown")
+async def _shutdown() -> None:
+    # 503 new requests, let in-flight ones (and their renders) finish (bounded), then close the pools
+    res = await lifecycle.drain(db_engines(), float(getattr(settings, "DRAIN_TIMEOUT_SECONDS", 20.0)))
+    log.info("[shutdown] drained in %.1fms (timed_out=%s)", res["ms"], res["timed_out"])
+    await health_state.stop_pinger()
+    await schema_registry.stop_reverify()
+    await idempotency.stop_sweeper()
+    label_pool.shutdown()
+    await dispose_engines()
+    lifecycle.mark_stopped()
+    log.info("[shutdown] engines disposed")
+
 # ---- DB helpers (use db_engine) ----
 @app.get("/__debug/db")
 async def debug_db():
@@ -0,0 +1,104 @@
+# path: backend/app/middleware_deadline.py
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict
+
+from app.core import sql_metrics, timeouts
+from app.middleware_sqltiming import _route_key
+
+try:
+    from app.core.config import settings  # type: ignore
+except Exception:  # pragma: no cover
+    settings = None  # type: ignore
+
+log = logging.getLogger("uvicorn")
+
+
+def _cancel_methods() -> frozenset[str]:
+    raw = getattr(settings, "DISCONNECT_CANCEL_METHODS", "GET,HEAD") if settings is not None else "GET,HEAD"
+    return frozenset(m.strip().upper() for m in str(raw).split(",") if m.strip())
+
+
+class RequestDeadlineMiddleware:
+    """
+    Pure ASGI middleware:
+    - picks the statement timeout for the request's route class (read/write/report)
+      and exposes it to the engine hooks in app.core.timeouts;
+    - cancels the handler when the client disconnects, so its session closes and
+      the connection goes back to the pool instead of finishing work nobody reads.
+
+    Only DISCONNECT_CANCEL_METHODS (GET/HEAD by default) are cancelled: a driver
+    app dropping signal mid-POST should not roll back a half-recorded action.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.cancel_methods = _cancel_methods()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "GET")
+        cls = timeouts.route_class(method, scope.get("path", ""))
+        token = timeouts.set_statement_timeout(timeouts.timeout_ms_for(cls))
+        state, req_token = timeouts.begin_request()
+        t0 = time.perf_counter()
+        try:
+            if method in self.cancel_methods:
+                await self._run_cancellable(scope, receive, send, state, cls, t0)
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            timeouts.end_request(req_token)
+            timeouts.reset_statement_timeout(token)
+
+    async def _run_cancellable(self, scope, receive, send, state, cls: str, t0: float) -> None:
+        # One reader on `receive`: the watcher forwards body messages to the app
+        # through a 1-slot queue (keeps backpressure) and keeps listening for
+        # http.disconnect once the body is done.
+        inbox: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=1)
+        responded = False
+
+        async def send_wrapper(message) -> None:
+            nonlocal responded
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                responded = True  # servers report disconnect after this; not a client give-up
+
+        app_task = asyncio.ensure_future(self.app(scope, inbox.get, send_wrapper))
+
+        async def watch() -> None:
+            while True:
+                msg = await receive()
+                if msg["type"] == "http.disconnect":
+                    # Holding a session: interrupt/abort at the next statement (see
+                    # app.core.timeouts.RequestDeadline); otherwise just cancel.
+                    if not responded and timeouts.client_gone(state):
+                        app_task.cancel()
+                    await inbox.put(msg)  # a handler blocked on receive sees it too
+                    return
+                await inbox.put(msg)
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not state.gone:
+                raise
+        finally:
+            watcher.cancel()
+
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        route = _route_key(scope)  # the app has routed the request by now
+        if state.gone:
+            stats = sql_metrics.current_request()
+            timeouts.metrics.cancelled_request(route, cls, elapsed, bool(stats and stats.count))
+            log.info("[deadline] client gone, aborted %s after %.0fms", route, elapsed)
+        else:
+            timeouts.metrics.observe(route, elapsed)
@@ -0,0 +1,192 @@
+# path: backend/app/middleware_idempotency.py
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.idempotency import InFlight, IdempotencyStore, Stored, idempotency_store
+
+try:
+    from app.core.config import settings  # type: ignore
+except Exception:  # pragma: no cover
+    settings = None  # type: ignore
+
+log = logging.getLogger("uvicorn")
+
+HEADER = b"idempotency-key"
+# recomputed on replay, or meaningless the second time
+_DROP = {b"content-length", b"date", b"server"}
+# 4xx that say "try again", not "this request is wrong": a stored one would
+# answer every retry with the same key until the TTL runs out
+_TRANSIENT = {408, 409, 425, 429, 499}
+
+
+def _storable(status: int) -> bool:
+    """2xx, and 4xx the same request would get again (400, 404, 422, ...)."""
+    return 200 <= status < 300 or (400 <= status < 500 and status not in _TRANSIENT)
+
+
+def _cfg(name: str, default):
+    return getattr(settings, name, default) if settings is not None else default
+
+
+class IdempotencyMiddleware:
+    """
+    Pure ASGI middleware: a POST carrying `Idempotency-Key` runs once; a retry
+    with the same key (same caller, method and path) gets the stored status,
+    headers and body back, marked `Idempotent-Replayed: true`, without the
+    handler running or a write to the DB.
+
+    - the same key with a different body is a 422 (checked only when the
+      handler read its whole body); a retry while the first request is
+      still running is a 409 (the client retries later)
+    - 5xx, "retry" 4xx (409 conflict, 429, 499...), 3xx, exceptions,
+      streamed/file responses and bodies over
+      IDEMPOTENCY_MAX_BODY_BYTES are not stored: the lease is released and a
+      retry executes again
+    - if the store is unavailable the request runs as if it had no key
+
+    Sits inside the API-key check, so only authenticated requests are stored.
+    """
+
+    def __init__(self, app, engine=None, store: Optional[IdempotencyStore] = None, read_engine=None) -> None:
+        self.app = app
+        self.engine = engine
+        self.read_engine = read_engine  # lookups; None = `engine`
+        self.store = store or idempotency_store
+        self.enabled = bool(_cfg("IDEMPOTENCY_ENABLED", True))
+        self.max_body = int(_cfg("IDEMPOTENCY_MAX_BODY_BYTES", 256 * 1024))
+
+    def _engine(self):
+        if self.engine is None:
+            from app.db import engine  # resolved late: app.db builds engines at import
+
+            self.engine = engine
+        return self.engine
+
+    @staticmethod
+    def _scope_of(scope, key: bytes) -> str:
+        h = hashlib.sha256()
+        headers = dict(scope.get("headers") or [])
+        for part in (
+            scope.get("method", "").encode(), scope.get("path", "").encode(), key,
+            headers.get(b"x-api-key", b""), headers.get(b"x-admin-key", b""), headers.get(b"authorization", b""),
+        ):
+            h.update(part + b"\0")
+        return h.hexdigest()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if not self.enabled or scope["type"] != "http" or scope.get("method") != "POST":
+            await self.app(scope, receive, send)
+            return
+        key = next((v for k, v in scope.get("headers") or [] if k == HEADER), None)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key.strip() or len(key) > 255:
+            await _json(send, 400, {"detail": "Idempotency-Key must be 1-255 characters"})
+            return
+
+        sid = self._scope_of(scope, key.strip())
+        engine = self._engine()
+        try:
+            claim = await self.store.claim(engine, sid, self.read_engine)
+        except Exception as e:
+            self.store.errors += 1
+            log.warning("[idempotency] store unavailable, running without it: %s", e)
+            await self.app(scope, receive, send)
+            return
+
+        if isinstance(claim, InFlight):
+            await _json(send, 409, {"detail": "a request with this Idempotency-Key is still in progress"},
+                        [(b"retry-after", b"1")])
+            return
+        if isinstance(claim, Stored):
+            if claim.fingerprint and claim.fingerprint != await _drain_digest(receive):
+                await _json(send, 422, {"detail": "Idempotency-Key was already used with a different request body"})
+                return
+            await _replay(send, claim)
+            return
+
+        await self._run_and_store(scope, receive, send, engine, sid)
+
+    async def _run_and_store(self, scope, receive, send, engine, sid: str) -> None:
+        digest = hashlib.sha256()
+        status = 0
+        headers: List[Tuple[str, str]] = []
+        chunks: List[bytes] = []
+        size = 0
+        storable = True
+        whole_body = False  # the handler read the body to its last chunk
+
+        async def receive_wrapper():
+            nonlocal whole_body
+            msg = await receive()
+            if msg["type"] == "http.request":
+                digest.update(msg.get("body", b""))
+                whole_body = not msg.get("more_body", False)
+            return msg
+
+        async def send_wrapper(message) -> None:
+            nonlocal status, size, storable
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers.extend(
+                    (k.decode("latin-1"), v.decode("latin-1")) for k, v in message.get("headers", []) if k.lower() not in _DROP
+                )
+            elif message["type"] == "http.response.body":
+                if storable:
+                    size += len(message.get("body", b""))
+                    if size > self.max_body:
+                        storable = False
+                        chunks.clear()
+                    else:
+                        chunks.append(message.get("body", b""))
+            else:  # http.response.pathsend / zerocopysend: a file, not stored
+                storable = False
+            await send(message)
+
+        stored = False
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+            if storable and _storable(status):
+                # a digest of part of the body would reject a retry of the same request
+                fingerprint = digest.hexdigest() if whole_body else None
+                await self.store.complete(engine, sid, Stored(status, headers, b"".join(chunks), fingerprint))
+                stored = True
+        finally:
+            if not stored:
+                try:
+                    await self.store.release(engine, sid)
+                except Exception as e:  # the lease expires on its own
+                    self.store.errors += 1
+                    log.warning("[idempotency] release failed: %s", e)
+
+
+async def _drain_digest(receive) -> str:
+    h = hashlib.sha256()
+    while True:
+        msg = await receive()
+        if msg["type"] != "http.request":
+            break
+        h.update(msg.get("body", b""))
+        if not msg.get("more_body", False):
+            break
+    return h.hexdigest()
+
+
+async def _replay(send, entry: Stored) -> None:
+    raw = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in entry.headers]
+    raw += [(b"content-length", str(len(entry.body)).encode()), (b"idempotent-replayed", b"true")]
+    await send({"type": "http.response.start", "status": entry.status, "headers": raw})
+    await send({"type": "http.response.body", "body": entry.body})
+
+
+async def _json(send, status: int, payload: Dict[str, Any], extra: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+    body = json.dumps(payload).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())] + (extra or [])
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
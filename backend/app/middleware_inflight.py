@@ -0,0 +1,50 @@
+# path: backend/app/middleware_inflight.py
+
+from __future__ import annotations
+
+from app.core import lifecycle
+
+# Probes keep answering while draining so the LB can see us leave rotation.
+_ALWAYS_ALLOW = ("/__health",)
+
+
+class InFlightMiddleware:
+    """
+    Pure ASGI middleware: counts in-flight HTTP requests for the shutdown
+    drain, refuses new ones with 503 once draining starts, and records the
+    first request's time-to-first-byte (see app.core.lifecycle).
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "")
+        if lifecycle.is_draining() and not path.startswith(_ALWAYS_ALLOW):
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"connection", b"close"),
+                    (b"retry-after", b"1"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": b'{"detail":"shutting down"}'})
+            return
+
+        t0 = lifecycle.request_started()
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                lifecycle.first_byte(t0, path)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            lifecycle.request_finished()
@@ -0,0 +1,63 @@
+# path: backend/app/middleware_sqltiming.py
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict
+
+from app.core import sql_metrics
+
+log = logging.getLogger("uvicorn")
+
+
+def _route_key(scope: Dict[str, Any]) -> str:
+    """
+    METHOD + matched route template, e.g. 'GET /skips/{skip_id}/labels.pdf', so
+    ids don't explode the table. Only meaningful once the app has routed the
+    request: unmatched requests (404s, scanners) share one key.
+    """
+    method = scope.get("method", "?")
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return f"{method} (unmatched)"
+    # routers included with a prefix are matched lazily by newer FastAPI, and
+    # scope["route"] is the un-prefixed original; the mounted template is here
+    ctx = (scope.get("fastapi") or {}).get("effective_route_context")
+    return f"{method} {getattr(ctx, 'path', None) or path}"
+
+
+class SQLTimingMiddleware:
+    """
+    Pure ASGI middleware: collects per-request SQL counts/time (via engine
+    hooks in app.core.sql_metrics), emits a Server-Timing header and folds the
+    request into the per-route table behind /__debug/sql.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = sql_metrics.begin_request(scope.get("path", ""))
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                value = f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'
+                headers.append((b"server-timing", value.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sql_metrics.end_request(token)
+            route = _route_key(scope)
+            suspects = sql_metrics.record_request(route, stats)
+            if suspects:
+                worst = max(suspects.items(), key=lambda kv: kv[1])
+                log.warning("[sql] likely N+1 on %s: %dx %s", route, worst[1], worst[0][:160])
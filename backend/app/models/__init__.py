@@ -2,13 +2,15 @@
 from .base import Base  # noqa: F401
 from . import skip as _skip_models   # noqa: F401
 from . import labels as _label_models  # noqa: F401
+from . import skip_summary as _summary_models  # noqa: F401
+from . import idempotency as _idempotency_models  # noqa: F401
 try:
     from . import models as _core_models  # noqa: F401
 except Exception:
     _core_models = None  # type: ignore
 
 from .skip import Skip, SkipStatus  # noqa: F401
-from .labels import SkipAsset, SkipAssetKind  # noqa: F401
+from .labels import AssetBlob, LabelIntent, SkipAsset, SkipAssetKind  # noqa: F401
 
 SkipPlacement = None  # type: ignore
 try:
@@ -21,6 +23,6 @@ except Exception:
     except Exception:
         pass
 
-__all__ = ["Base", "Skip", "SkipStatus", "SkipAsset", "SkipAssetKind"]
+__all__ = ["Base", "Skip", "SkipStatus", "AssetBlob", "LabelIntent", "SkipAsset", "SkipAssetKind"]
 if SkipPlacement is not None:
     __all__.append("SkipPlacement")
@@ -6,7 +6,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import String, Enum as SAEnum, DateTime, Float, ForeignKey, Boolean
+from sqlalchemy import String, Enum as SAEnum, DateTime, Float, ForeignKey, Boolean, Index, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 # IMPORTANT: models only. No FastAPI, no engine here.
@@ -16,6 +16,13 @@ from app.models.base import Base
 # --- Placement audit (where a skip sits on site) -----------------------------
 class SkipPlacement(Base):
     __tablename__ = "skip_placements"
+    __table_args__ = (
+        # open placements only: the fallback close for skips without a pointer, and verify/repair
+        Index(
+            "ix_skip_placements_open", "skip_id", "placed_at",
+            postgresql_where=text("removed_at IS NULL"), sqlite_where=text("removed_at IS NULL"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     skip_id: Mapped[str] = mapped_column(ForeignKey("skips.id", ondelete="CASCADE"), index=True)
@@ -120,6 +127,22 @@ class DriverProfile(Base):
     active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
+# --- Offline sync ledger (POST /driver/sync) ----------------------------------
+class DriverSyncAction(Base):
+    """
+    One row per applied sync action, written in the same transaction as the
+    action itself: a replayed idempotency key gets `result` back instead of
+    a second movement.
+    """
+    __tablename__ = "driver_sync_actions"
+
+    key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    action: Mapped[str] = mapped_column(String(32), nullable=False)
+    skip_id: Mapped[Optional[str]] = mapped_column(String(36))
+    result: Mapped[Optional[str]] = mapped_column(Text)  # JSON of the action's response
+    client_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    applied_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
 DBPlacement = SkipPlacement
 
 __all__ = [
@@ -133,5 +156,6 @@ __all__ = [
     "Transfer",
     "WasteTransferNote",
     "DriverProfile",
+    "DriverSyncAction",
     "Base",
 ]
@@ -0,0 +1,33 @@
+# path: backend/app/models/idempotency.py
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import Index, Integer, LargeBinary, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Stored response for an Idempotency-Key (app.middleware_idempotency).
+    `scope` hashes the key with method, path and caller credentials. While
+    the first request runs, `status` is NULL and `expires_at` is its lease;
+    once stored, `expires_at` is the replay TTL. Expired rows are swept by
+    app.services.idempotency.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
+
+    scope: Mapped[str] = mapped_column(String(64), primary_key=True)
+    fingerprint: Mapped[str | None] = mapped_column(String(64), default=None)  # sha256 of the request body
+    status: Mapped[int | None] = mapped_column(Integer, default=None)
+    headers: Mapped[str | None] = mapped_column(Text, default=None)  # JSON [[name, value], ...]
+    body: Mapped[bytes | None] = mapped_column(LargeBinary, default=None, deferred=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(nullable=False)
+
+
+__all__ = ["IdempotencyKey"]
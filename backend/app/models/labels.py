@@ -1,8 +1,9 @@
 # path: backend/app/models/labels.py
 from __future__ import annotations
 
+from datetime import datetime
 from typing import TYPE_CHECKING
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import Index, Integer, String, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 # CRUCIAL: use the shared Base so SQLAlchemy sees Skip <-> SkipAsset in the same registry
@@ -17,9 +18,33 @@ class SkipAssetKind:
     labels_pdf = "labels_pdf"
 
 
+class AssetBlob(Base):
+    """
+    Content-addressed asset bytes, shared by every SkipAsset with the same
+    SHA-256 (the three label PNGs of a skip are one blob). `refcount` counts
+    referencing skip_assets rows; app.services.asset_blobs keeps it and GCs
+    blobs that drop to zero.
+    """
+
+    __tablename__ = "asset_blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    content_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    refcount: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # key in app.services.asset_store; NULL = bytes held in the `bytes` column
+    path: Mapped[str | None] = mapped_column(String(255), default=None)
+    # deferred: entity loads never pull the bytes; read them with an explicit select
+    data: Mapped[bytes | None] = mapped_column("bytes", nullable=True, default=None, deferred=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
+
+
 class SkipAsset(Base):
     __tablename__ = "skip_assets"
-
+    __table_args__ = (
+        # every label lookup: (skip, kind[, idx]); kind values are SkipAssetKind only
+        Index("ix_skip_assets_skip_kind", "skip_id", "kind", "idx"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     # IMPORTANT: FK so SQLAlchemy can join Skip <-> SkipAsset
@@ -29,12 +54,30 @@ class SkipAsset(Base):
     content_type: Mapped[str] = mapped_column(String(64), nullable=False)
 
 
-    # store bytes; attribute named 'data' but column remains 'bytes'
-    data: Mapped[bytes] = mapped_column("bytes", nullable=False)
+    # content hash -> asset_blobs; new rows always use it
+    blob_sha256: Mapped[str | None] = mapped_column(
+        String(64), ForeignKey("asset_blobs.sha256"), index=True, default=None
+    )
+    # legacy inline bytes (rows written before asset_blobs; alembic 0013 moves them)
+    data: Mapped[bytes | None] = mapped_column("bytes", nullable=True, default=None, deferred=True)
 
 
     # relationships
     skip: Mapped["Skip"] = relationship("Skip", back_populates="assets")
 
 
-__all__ = ["SkipAsset", "SkipAssetKind", "Base"]
+class LabelIntent(Base):
+    """
+    Labels owed to a skip created under LABEL_RENDER_MODE=lazy. The first GET
+    renders them and deletes this row in the transaction that stores the
+    assets, so only one writer ever gets to insert them.
+    """
+
+    __tablename__ = "label_intents"
+
+    skip_id: Mapped[str] = mapped_column(ForeignKey("skips.id", ondelete="CASCADE"), primary_key=True)
+    org_name: Mapped[str] = mapped_column(String(80), nullable=False, default="OWNER")
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
+
+
+__all__ = ["AssetBlob", "LabelIntent", "SkipAsset", "SkipAssetKind", "Base"]
@@ -6,7 +6,7 @@ from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String
+from sqlalchemy import Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base  # ← use the shared Base
@@ -22,8 +22,23 @@ class SkipStatus(str, Enum):
     PROCESSING = "processing"
 
 
+_LIVE = text("deleted_at IS NULL")
+
+
+def _live_index(name: str, *cols: str) -> Index:
+    # keyset inventory listing: (filter, created_at, id) over non-deleted rows
+    return Index(name, *cols, "created_at", "id", postgresql_where=_LIVE, sqlite_where=_LIVE)
+
+
 class Skip(Base):
     __tablename__ = "skips"
+    __table_args__ = (
+        _live_index("ix_skips_live_created"),
+        _live_index("ix_skips_live_status", "status"),
+        _live_index("ix_skips_live_zone", "zone_id"),
+        _live_index("ix_skips_live_owner", "owner_org_id"),
+        _live_index("ix_skips_live_commodity", "assigned_commodity_id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     qr_code: Mapped[str] = mapped_column(String(64), unique=True, index=True, nullable=False)
@@ -32,6 +47,12 @@ class Skip(Base):
     zone_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
 
     status: Mapped[str] = mapped_column(String(32), default=SkipStatus.IN_STOCK.value, nullable=False)
+    # compare-and-set counter for driver state changes (app.services.skip_versions)
+    version: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"), nullable=False)
+    # the open skip_placements row, kept by the driver flow so the active placement
+    # is a primary-key lookup; no FK (placements reference skips), so
+    # app.services.placements verifies/repairs it against the history
+    current_placement_id: Mapped[str | None] = mapped_column(String(36), nullable=True, default=None)
 
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
@@ -0,0 +1,29 @@
+# path: backend/app/models/skip_summary.py
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class SkipSummary(Base):
+    """
+    Live (non-deleted) skip counts per (owner_org_id, zone_id, status).
+    Maintained in the same transaction as the skip change by
+    app.services.skip_summary; NULL owner/zone are stored as "" so the key
+    can be a primary key.
+    """
+
+    __tablename__ = "skip_summary"
+
+    owner_org_id: Mapped[str] = mapped_column(String(36), primary_key=True, default="")
+    zone_id: Mapped[str] = mapped_column(String(36), primary_key=True, default="")
+    status: Mapped[str] = mapped_column(String(32), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
+
+
+__all__ = ["SkipSummary"]
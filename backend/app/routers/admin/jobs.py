@@ -9,9 +9,8 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, admin_gate
-from app.db import engine as db_engine
-from app.models.job import Base as JobsBase, Job
+from app.core.deps import get_db, get_read_db, admin_gate
+from app.models.job import Job
 from app.schemas.job import JobCreate, JobOut, JobPatch
 
 log = logging.getLogger("uvicorn")
@@ -22,14 +21,11 @@ router = APIRouter(
     dependencies=[Depends(admin_gate)],
 )
 
-async def _ensure_jobs_table() -> None:
-    async with db_engine.begin() as conn:
-        await conn.run_sync(JobsBase.metadata.create_all)
+# jobs table: alembic 0021_jobs_table (create_all in dev); verified at startup (app.core.schema_registry)
 
 @router.post("/jobs", response_model=JobOut, status_code=status.HTTP_201_CREATED)
 async def create_job_endpoint(payload: JobCreate, db: AsyncSession = Depends(get_db)) -> JobOut:
     try:
-        await _ensure_jobs_table()
         job = Job(**payload.model_dump(exclude_unset=True))
         db.add(job)
         await db.commit()
@@ -42,10 +38,9 @@ async def create_job_endpoint(payload: JobCreate, db: AsyncSession = Depends(get
 @router.get("/jobs", response_model=List[JobOut])
 async def list_jobs_endpoint(
     status: Optional[str] = Query(None, description="Filter by status"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> List[JobOut]:
     try:
-        await _ensure_jobs_table()
         stmt = select(Job)
         if status:
             stmt = stmt.where(Job.status == status)
@@ -58,7 +53,6 @@ async def list_jobs_endpoint(
 @router.patch("/jobs/{job_id}", response_model=JobOut)
 async def patch_job_endpoint(job_id: str, payload: JobPatch, db: AsyncSession = Depends(get_db)) -> JobOut:
     try:
-        await _ensure_jobs_table()
         changes = payload.model_dump(exclude_unset=True)
         result = await db.execute(
             update(Job).where(Job.id == job_id).values(**changes).returning(Job)
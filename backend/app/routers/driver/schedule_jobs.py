@@ -5,27 +5,23 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...core.deps import get_db, driver_gate, engine as deps_engine  # <-- import engine here
+from ...core.deps import get_db, get_read_db, driver_gate
 from ...schemas.job import JobOut
 from ...services.jobs_service import jobs_for_driver, mark_done
-from ...models.job import Job, Base as JobsBase
+from ...models.job import Job
 
 log = logging.getLogger("uvicorn")
 
 router = APIRouter(prefix="/driver", tags=["driver:schedule"], dependencies=[Depends(driver_gate)])
 
-async def _ensure_jobs_table() -> None:
-    # same pattern as admin router
-    async with deps_engine.begin() as conn:
-        await conn.run_sync(JobsBase.metadata.create_all)
+# jobs table: alembic 0021_jobs_table (create_all in dev); verified at startup (app.core.schema_registry)
 
 @router.get("/schedule", response_model=List[JobOut])
 async def driver_schedule(
     driver_id: Optional[str] = Query(None, description="Preferred param"),
     driver:    Optional[str] = Query(None, description="Legacy alias"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> List[JobOut]:
-    await _ensure_jobs_table()  # <-- no db arg needed now
     did = (driver_id or driver or "").strip()
     if not did:
         raise HTTPException(
@@ -41,7 +37,6 @@ async def driver_schedule(
 
 @router.patch("/schedule/{task_id}/done", response_model=JobOut)
 async def driver_mark_done(task_id: str, db: AsyncSession = Depends(get_db)) -> JobOut:
-    await _ensure_jobs_table()
     try:
         job = await mark_done(db, task_id)
         if not job:
@@ -2,8 +2,8 @@
 from __future__ import annotations
 
 import uuid
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, field_validator
 
 
 class SkipCreate(BaseModel):
@@ -13,6 +13,35 @@ class SkipCreate(BaseModel):
     zone_id: Optional[uuid.UUID] = None
 
 
+class SkipImportRow(BaseModel):
+    """One CSV/NDJSON row of POST /skips/import."""
+    qr_code: str = Field(..., min_length=1, max_length=64)
+    owner_org_id: uuid.UUID
+    assigned_commodity_id: Optional[uuid.UUID] = None
+    zone_id: Optional[uuid.UUID] = None
+    status: Optional[str] = None
+
+    @field_validator("status")
+    @classmethod
+    def _known_status(cls, v: Optional[str]) -> Optional[str]:
+        from app.models.skip import SkipStatus
+        if v is not None and v not in {s.value for s in SkipStatus}:
+            raise ValueError(f"unknown status {v!r}")
+        return v
+
+
+class LabelSheetIn(BaseModel):
+    """POST /skips/labels/sheet: explicit ids, or a filter over live skips."""
+    skip_ids: Optional[List[str]] = Field(None, min_length=1)
+    owner_org_id: Optional[uuid.UUID] = None
+    zone_id: Optional[uuid.UUID] = None
+    status: Optional[str] = None
+    cols: int = Field(3, ge=1, le=6)
+    rows: int = Field(8, ge=1, le=14)
+    page: Literal["A4", "LETTER"] = "A4"
+    org_name: str = Field("OWNER", max_length=40)
+
+
 class SkipOut(BaseModel):
     id: uuid.UUID
     qr_code: str
@@ -0,0 +1,275 @@
+# path: backend/app/services/asset_blobs.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.labels import AssetBlob, SkipAsset
+from app.services.asset_store import asset_store, sweep_orphans
+
+
+class BlobRef(NamedTuple):
+    sha256: str
+    size: int
+    content_type: str
+    path: Optional[Path]    # set when the store can serve a file directly
+    data: Optional[bytes]   # set for blobs whose bytes are still in the DB
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+async def put_many(db: AsyncSession, items: Sequence[Tuple[bytes, str]]) -> List[str]:
+    """
+    Store (bytes, content_type) items, one reference each; returns their hashes
+    in order. Bytes already stored are not sent again, only their refcount moves
+    (unless the store lost the object, which is then rewritten).
+    Runs in the caller's transaction; new bytes go to the asset store first (an
+    object left behind by a rollback is removed by the orphan sweep).
+    """
+    shas = [digest(data) for data, _ in items]
+    if not shas:
+        return shas
+    refs = Counter(shas)
+    first: Dict[str, Tuple[bytes, str]] = {}
+    for sha, item in zip(shas, items):
+        first.setdefault(sha, item)
+
+    known = dict(
+        (await db.execute(select(AssetBlob.sha256, AssetBlob.path).where(AssetBlob.sha256.in_(list(refs))))).all()
+    )
+    present = set(known)
+    if present:
+        await _add_refs(db, {sha: refs[sha] for sha in present})
+        keyed = [(sha, key) for sha, key in known.items() if key]
+        if keyed and asset_store is not None:
+            # the bytes are at hand: put back objects the store has lost
+            store = asset_store
+            await asyncio.to_thread(
+                lambda: [store.put(sha, first[sha][0]) for sha, key in keyed if not store.exists(key)]
+            )
+
+    fresh = [sha for sha in refs if sha not in present]
+    if fresh:
+        keys: Dict[str, Optional[str]] = {sha: None for sha in fresh}
+        if asset_store is not None:
+            store = asset_store
+            keys = await asyncio.to_thread(lambda: {sha: store.put(sha, first[sha][0]) for sha in fresh})
+        now = datetime.utcnow()
+        rows = [
+            {"sha256": sha, "size": len(first[sha][0]), "content_type": first[sha][1],
+             "refcount": refs[sha], "path": keys[sha],
+             "bytes": None if keys[sha] else first[sha][0], "created_at": now}
+            for sha in fresh
+        ]
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(AssetBlob.__table__)
+            # a concurrent writer stored the same bytes first: just take the references
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[AssetBlob.__table__.c.sha256],
+                set_={"refcount": AssetBlob.__table__.c.refcount + stmt.excluded.refcount},
+            )
+        else:  # pragma: no cover
+            stmt = AssetBlob.__table__.insert()
+        await db.execute(stmt, rows)
+    return shas
+
+
+async def _add_refs(db: AsyncSession, deltas: Dict[str, int]) -> None:
+    tbl = AssetBlob.__table__
+    stmt = (
+        update(tbl)
+        .where(tbl.c.sha256 == bindparam("b_sha"))
+        .values(refcount=tbl.c.refcount + bindparam("b_n"))
+    )
+    await db.execute(stmt, [{"b_sha": sha, "b_n": n} for sha, n in sorted(deltas.items()) if n])
+
+
+async def release(db: AsyncSession, shas: Iterable[Optional[str]]) -> None:
+    """Drop one reference per hash given (None entries are legacy inline rows)."""
+    refs = Counter(s for s in shas if s)
+    if refs:
+        await _add_refs(db, {sha: -n for sha, n in refs.items()})
+
+
+async def locate(db: AsyncSession, sha: str) -> Optional[BlobRef]:
+    """Where a blob's bytes are; reads the bytes column only for DB-held blobs."""
+    row = (
+        await db.execute(
+            select(AssetBlob.size, AssetBlob.content_type, AssetBlob.path).where(AssetBlob.sha256 == sha)
+        )
+    ).first()
+    if row is None:
+        return None
+    size, ct, key = row
+    if key:
+        if asset_store is None:
+            raise RuntimeError("blob is in the asset store but ASSET_STORE_BACKEND=db")
+        path = asset_store.local_path(key)
+        data = None if path is not None else await asyncio.to_thread(asset_store.get, key)
+        if path is None and data is None:
+            return None
+        return BlobRef(sha, size, ct, path, data)
+    data = (await db.execute(select(AssetBlob.data).where(AssetBlob.sha256 == sha))).scalar_one_or_none()
+    return BlobRef(sha, size, ct, None, data)
+
+
+async def locate_many(db: AsyncSession, shas: Iterable[Optional[str]]) -> Dict[str, BlobRef]:
+    """
+    locate() for many hashes, a chunk of queries rather than one per blob.
+    Blobs the store cannot hand out as a local file are left out.
+    """
+    want = sorted(set(s for s in shas if s))
+    out: Dict[str, BlobRef] = {}
+    for i in range(0, len(want), 500):
+        rows = (
+            await db.execute(
+                select(AssetBlob.sha256, AssetBlob.size, AssetBlob.content_type, AssetBlob.path)
+                .where(AssetBlob.sha256.in_(want[i:i + 500]))
+            )
+        ).all()
+        in_db = [r.sha256 for r in rows if not r.path]
+        data: Dict[str, bytes] = {}
+        if in_db:
+            data = dict((await db.execute(select(AssetBlob.sha256, AssetBlob.data).where(AssetBlob.sha256.in_(in_db)))).all())
+        keyed = [(r.sha256, r.path) for r in rows if r.path]
+        paths: Dict[str, Optional[Path]] = {}
+        if keyed and asset_store is not None:
+            store = asset_store
+            paths = await asyncio.to_thread(lambda: {sha: store.local_path(key) for sha, key in keyed})
+        for sha, size, ct, key in rows:
+            if not key:
+                out[sha] = BlobRef(sha, size, ct, None, data.get(sha))
+            elif paths.get(sha) is not None:
+                out[sha] = BlobRef(sha, size, ct, paths[sha], None)
+    return out
+
+
+async def load(db: AsyncSession, sha: str) -> Optional[bytes]:
+    ref = await locate(db, sha)
+    if ref is None:
+        return None
+    if ref.data is not None:
+        return ref.data
+    return await asyncio.to_thread(ref.path.read_bytes) if ref.path else None
+
+
+async def collect(db: AsyncSession, shas: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    GC: delete blobs nobody references. With `shas`, only those candidates
+    (cheap, after a hard delete); without, a full pass that first recomputes
+    every refcount from skip_assets (repairs drift). Caller commits, then
+    passes the returned `keys` to remove_objects().
+    """
+    tbl = AssetBlob.__table__
+    cond = tbl.c.refcount <= 0
+    if shas is None:
+        live = (
+            select(func.count())
+            .select_from(SkipAsset)
+            .where(SkipAsset.blob_sha256 == tbl.c.sha256)
+            .scalar_subquery()
+        )
+        await db.execute(update(tbl).values(refcount=live))
+    else:
+        cand = sorted(set(s for s in shas if s))
+        if not cand:
+            return {"deleted": 0, "bytes_freed": 0, "keys": []}
+        cond = cond & tbl.c.sha256.in_(cand)
+    doomed = (await db.execute(select(tbl.c.sha256, tbl.c.size, tbl.c.path).where(cond))).all()
+    if doomed:
+        await db.execute(delete(tbl).where(tbl.c.sha256.in_([d.sha256 for d in doomed])))
+    return {
+        "deleted": len(doomed),
+        "bytes_freed": sum(int(d.size) for d in doomed),
+        "keys": [d.path for d in doomed if d.path],
+    }
+
+
+async def remove_objects(db: AsyncSession, keys: Sequence[str]) -> int:
+    """
+    After the GC commit: delete store objects for the freed blobs, skipping any
+    a concurrent writer has re-registered since.
+    """
+    if asset_store is None or not keys:
+        return 0
+    back = set(
+        (await db.execute(select(AssetBlob.path).where(AssetBlob.path.in_(list(keys))))).scalars().all()
+    )
+    gone = [k for k in keys if k not in back]
+    store = asset_store
+    await asyncio.to_thread(lambda: [store.delete(k) for k in gone])
+    return len(gone)
+
+
+async def sweep(db: AsyncSession, min_age_s: float) -> int:
+    """Remove store objects no blob row references (left by rollbacks / crashes)."""
+    if asset_store is None:
+        return 0
+    known = (await db.execute(select(AssetBlob.path).where(AssetBlob.path.isnot(None)))).scalars().all()
+    return await asyncio.to_thread(sweep_orphans, asset_store, known, min_age_s)
+
+
+async def stats(db: AsyncSession) -> Dict[str, Any]:
+    blobs, stored = (
+        await db.execute(select(func.count(), func.coalesce(func.sum(AssetBlob.size), 0)))
+    ).one()
+    refs, logical = (
+        await db.execute(
+            select(func.count(), func.coalesce(func.sum(AssetBlob.size), 0))
+            .select_from(SkipAsset)
+            .join(AssetBlob, AssetBlob.sha256 == SkipAsset.blob_sha256)
+        )
+    ).one()
+    in_db, in_db_bytes = (
+        await db.execute(
+            select(func.count(), func.coalesce(func.sum(AssetBlob.size), 0)).where(AssetBlob.path.is_(None))
+        )
+    ).one()
+    legacy, legacy_bytes = (
+        await db.execute(
+            select(func.count(), func.coalesce(func.sum(func.length(SkipAsset.data)), 0))
+            .where(SkipAsset.blob_sha256.is_(None))
+        )
+    ).one()
+    return {
+        "blobs": int(blobs),
+        "blob_bytes": int(stored),
+        "asset_refs": int(refs),
+        "logical_bytes": int(logical),
+        "bytes_saved": int(logical) - int(stored),
+        "dedupe_ratio": round(int(logical) / int(stored), 2) if stored else None,
+        "store": asset_store.name if asset_store is not None else "db",
+        "db_held_blobs": int(in_db),
+        "db_held_bytes": int(in_db_bytes),
+        "legacy_inline_rows": int(legacy),
+        "legacy_inline_bytes": int(legacy_bytes),
+    }
+
+
+__all__ = [
+    "BlobRef",
+    "digest",
+    "put_many",
+    "release",
+    "locate",
+    "locate_many",
+    "load",
+    "collect",
+    "remove_objects",
+    "sweep",
+    "stats",
+]
@@ -0,0 +1,156 @@
+# path: backend/app/services/asset_store.py
+from __future__ import annotations
+
+import abc
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+try:
+    from app.core.config import settings  # type: ignore
+except Exception:  # pragma: no cover
+    settings = None  # type: ignore
+
+DEFAULT_DIR = Path(__file__).resolve().parents[2] / "var" / "assets"
+
+
+def _cfg(name: str, default):
+    return getattr(settings, name, default) if settings is not None else default
+
+
+class AssetStore(abc.ABC):
+    """
+    Where asset_blobs bytes live, addressed by SHA-256. The DB row keeps the
+    hash, size and the store-relative `key` this returns.
+
+    Backends are synchronous (file / object-store clients); callers run them
+    via asyncio.to_thread.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    def put(self, sha: str, data: bytes) -> str:
+        """Store `data` under its hash (idempotent); returns the key."""
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """The object's bytes, or None if the store no longer has it."""
+
+    @abc.abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether the object is still there (a row can outlive it, e.g. on a wiped disk)."""
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """A filesystem path the response can be served from, if the backend has one."""
+        return None
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the object; a missing one is not an error."""
+
+    @abc.abstractmethod
+    def keys(self) -> Iterator[tuple[str, float]]:
+        """(key, mtime) of every stored object; used by the orphan sweep."""
+
+
+class LocalDirStore(AssetStore):
+    """
+    Directory stand-in for object storage: <root>/ab/cd/<sha>, written atomically.
+    The directory must outlive deploys (a mounted disk): on an ephemeral
+    filesystem the rows survive a redeploy and the objects do not.
+    """
+
+    name = "local"
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    @staticmethod
+    def key_for(sha: str) -> str:
+        return f"{sha[:2]}/{sha[2:4]}/{sha}"
+
+    def _path(self, key: str) -> Path:
+        p = (self.root / key).resolve()
+        if self.root.resolve() not in p.parents:
+            raise ValueError(f"asset key escapes store root: {key!r}")
+        return p
+
+    def put(self, sha: str, data: bytes) -> str:
+        key = self.key_for(sha)
+        path = self._path(key)
+        if path.exists() and path.stat().st_size == len(data):
+            return key  # same hash, same bytes
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)  # readers never see a partial file
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return key
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def local_path(self, key: str) -> Optional[Path]:
+        p = self._path(key)
+        return p if p.is_file() else None
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def keys(self) -> Iterator[tuple[str, float]]:
+        if not self.root.is_dir():
+            return
+        for p in self.root.glob("*/*/*"):
+            if p.is_file() and not p.name.startswith(".tmp-"):
+                yield p.relative_to(self.root).as_posix(), p.stat().st_mtime
+
+
+def _build() -> Optional[AssetStore]:
+    backend = str(_cfg("ASSET_STORE_BACKEND", "local")).lower()
+    if backend == "db":  # keep bytes in asset_blobs.bytes (pre-filesystem behaviour)
+        return None
+    root = _cfg("ASSET_STORE_DIR", "") or DEFAULT_DIR
+    return LocalDirStore(Path(root))
+
+
+# None = bytes stay in the database
+asset_store: Optional[AssetStore] = _build()
+
+
+def sweep_orphans(store: AssetStore, known: Iterable[str], min_age_s: float) -> int:
+    """
+    Delete stored objects no asset_blobs row points at. Only objects older than
+    `min_age_s` go, so a blob written by a still-open transaction survives.
+    """
+    live = set(known)
+    cutoff = time.time() - min_age_s
+    removed = 0
+    for key, mtime in list(store.keys()):
+        if key not in live and mtime < cutoff:
+            store.delete(key)
+            removed += 1
+    return removed
+
+
+__all__ = ["AssetStore", "LocalDirStore", "asset_store", "sweep_orphans"]
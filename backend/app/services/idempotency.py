@@ -0,0 +1,261 @@
+# path: backend/app/services/idempotency.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.models.idempotency import IdempotencyKey
+
+try:
+    from app.core.config import settings  # type: ignore
+except Exception:  # pragma: no cover
+    settings = None  # type: ignore
+
+log = logging.getLogger("uvicorn")
+
+
+def _cfg(name: str, default):
+    return getattr(settings, name, default) if settings is not None else default
+
+
+class Stored(NamedTuple):
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    fingerprint: Optional[str]
+
+
+class InFlight(NamedTuple):
+    """Another request holds the key's lease."""
+
+
+Claim = Union[None, Stored, InFlight]  # None = ours: run the handler
+
+
+class IdempotencyStore:
+    """
+    Responses keyed by Idempotency-Key scope: an in-process LRU in front of
+    the idempotency_keys table.
+
+    claim() is read-first: a replay is served from the LRU, or from one
+    SELECT, and never writes. Only a key seen for the first time inserts its
+    lease row (ON CONFLICT DO NOTHING, so of two racing workers one runs the
+    handler and the other answers 409). complete() stores the response; a
+    failed run release()s the lease so a retry executes again.
+    """
+
+    def __init__(self, maxsize: int, ttl_s: float, lease_s: float) -> None:
+        self.maxsize = max(0, int(maxsize))
+        self.ttl_s = float(ttl_s)
+        self.lease_s = float(lease_s)
+        self._lru: "OrderedDict[str, Tuple[float, Stored]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.lru_hits = self.db_hits = self.claims = self.takeovers = self.conflicts = 0
+        self.stored = self.released = self.swept = self.errors = 0
+
+    # ---- LRU ---------------------------------------------------------------
+    def _lru_get(self, scope: str) -> Optional[Stored]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._lru.get(scope)
+            if item is None:
+                return None
+            if item[0] <= now:
+                del self._lru[scope]
+                return None
+            self._lru.move_to_end(scope)
+            return item[1]
+
+    def _lru_put(self, scope: str, entry: Stored, ttl_s: float) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._lru[scope] = (time.monotonic() + ttl_s, entry)
+            self._lru.move_to_end(scope)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    # ---- table -------------------------------------------------------------
+    @staticmethod
+    def _stored(row: Any) -> Stored:
+        return Stored(int(row.status), [tuple(h) for h in json.loads(row.headers or "[]")], row.body or b"", row.fingerprint)
+
+    async def claim(self, engine: AsyncEngine, scope: str, read_engine: Optional[AsyncEngine] = None) -> Claim:
+        """`read_engine` serves the lookup (it must not lag `engine`); only a claim writes."""
+        entry = self._lru_get(scope)
+        if entry is not None:
+            self.lru_hits += 1
+            return entry
+
+        tbl = IdempotencyKey.__table__
+        cols = (tbl.c.status, tbl.c.headers, tbl.c.body, tbl.c.fingerprint, tbl.c.expires_at)
+        now = datetime.utcnow()
+        reader = read_engine or engine
+        async with reader.connect() as conn:
+            row = (await conn.execute(select(*cols).where(tbl.c.scope == scope))).first()
+            if row is not None and row.expires_at > now:
+                if row.status is None:
+                    self.conflicts += 1
+                    return InFlight()
+                self.db_hits += 1
+                entry = self._stored(row)
+                self._lru_put(scope, entry, (row.expires_at - now).total_seconds())
+                return entry
+            if reader is engine:
+                return await self._take(conn, scope, row, now)
+        async with engine.connect() as conn:
+            return await self._take(conn, scope, row, now)
+
+    async def _take(self, conn: Any, scope: str, row: Any, now: datetime) -> Claim:
+        """Insert the lease for a new key, or take over an expired one, and commit."""
+        tbl = IdempotencyKey.__table__
+        lease = now + timedelta(seconds=self.lease_s)
+        if row is None:
+            dialect = conn.dialect.name
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(tbl).values(scope=scope, created_at=now, expires_at=lease).on_conflict_do_nothing(
+                index_elements=[tbl.c.scope]
+            )
+        else:
+            # an expired response or a dead lease: take it over, if nobody beat us to it
+            self.takeovers += 1
+            stmt = (
+                update(tbl)
+                .where(tbl.c.scope == scope, tbl.c.expires_at == row.expires_at)
+                .values(status=None, headers=None, body=None, fingerprint=None, created_at=now, expires_at=lease)
+            )
+        won = (await conn.execute(stmt)).rowcount == 1
+        await conn.commit()
+        if won:
+            self.claims += 1
+            return None
+        self.conflicts += 1
+        return InFlight()
+
+    async def complete(self, engine: AsyncEngine, scope: str, entry: Stored) -> None:
+        tbl = IdempotencyKey.__table__
+        async with engine.begin() as conn:
+            await conn.execute(
+                update(tbl)
+                .where(tbl.c.scope == scope, tbl.c.status.is_(None))
+                .values(
+                    status=entry.status, headers=json.dumps(entry.headers), body=entry.body,
+                    fingerprint=entry.fingerprint, expires_at=datetime.utcnow() + timedelta(seconds=self.ttl_s),
+                )
+            )
+        self._lru_put(scope, entry, self.ttl_s)
+        self.stored += 1
+
+    async def release(self, engine: AsyncEngine, scope: str) -> None:
+        tbl = IdempotencyKey.__table__
+        async with engine.begin() as conn:
+            await conn.execute(delete(tbl).where(tbl.c.scope == scope, tbl.c.status.is_(None)))
+        self.released += 1
+
+    async def sweep(self, engine: AsyncEngine, batch: int = 1000) -> int:
+        """Delete expired responses and dead leases, `batch` rows per transaction."""
+        tbl = IdempotencyKey.__table__
+        total = 0
+        while True:
+            async with engine.begin() as conn:
+                doomed = select(tbl.c.scope).where(tbl.c.expires_at <= datetime.utcnow()).limit(batch)
+                n = (await conn.execute(delete(tbl).where(tbl.c.scope.in_(doomed)))).rowcount or 0
+            total += n
+            if n < batch:
+                break
+        now = time.monotonic()
+        with self._lock:
+            for scope in [s for s, (exp, _) in self._lru.items() if exp <= now]:
+                del self._lru[scope]
+        self.swept += total
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._lru)
+        return {
+            "lru_size": size,
+            "lru_maxsize": self.maxsize,
+            "ttl_s": self.ttl_s,
+            "lease_s": self.lease_s,
+            "lru_hits": self.lru_hits,
+            "db_hits": self.db_hits,
+            "claims": self.claims,
+            "takeovers": self.takeovers,
+            "conflicts": self.conflicts,
+            "stored": self.stored,
+            "released": self.released,
+            "swept": self.swept,
+            "errors": self.errors,
+        }
+
+
+idempotency_store = IdempotencyStore(
+    maxsize=int(_cfg("IDEMPOTENCY_CACHE_SIZE", 2000)),
+    ttl_s=float(_cfg("IDEMPOTENCY_TTL_SECONDS", 24 * 3600)),
+    lease_s=float(_cfg("IDEMPOTENCY_LEASE_SECONDS", 60.0)),
+)
+
+# ---- background sweep ---------------------------------------------------------
+_sweeper_task: Optional[asyncio.Task] = None
+_sweeper_stop: Optional[asyncio.Event] = None
+
+
+async def _sweeper_loop(engine: AsyncEngine, interval: float, stop: asyncio.Event) -> None:
+    while True:
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+            return
+        except asyncio.TimeoutError:
+            pass
+        try:
+            n = await idempotency_store.sweep(engine)
+            if n:
+                log.info("[idempotency] swept %d expired keys", n)
+        except Exception as e:  # never let the loop die
+            log.warning("[idempotency] sweep failed: %s", e)
+
+
+def start_sweeper(engine: AsyncEngine, interval: float) -> None:
+    """Delete expired keys every `interval` seconds in the background; 0 disables."""
+    global _sweeper_task, _sweeper_stop
+    if interval <= 0 or _sweeper_task is not None:
+        return
+    _sweeper_stop = asyncio.Event()
+    _sweeper_task = asyncio.get_running_loop().create_task(_sweeper_loop(engine, float(interval), _sweeper_stop))
+
+
+async def stop_sweeper(grace: float = 5.0) -> None:
+    global _sweeper_task, _sweeper_stop
+    task, _sweeper_task = _sweeper_task, None
+    stop, _sweeper_stop = _sweeper_stop, None
+    if task is None:
+        return
+    if stop is not None:
+        stop.set()
+    try:
+        await asyncio.wait_for(task, timeout=grace)
+    except (asyncio.TimeoutError, asyncio.CancelledError, Exception):
+        pass
+
+
+__all__ = [
+    "Stored",
+    "InFlight",
+    "IdempotencyStore",
+    "idempotency_store",
+    "start_sweeper",
+    "stop_sweeper",
+]
@@ -0,0 +1,177 @@
+# path: backend/app/services/label_pool.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from app.services.qr_labels import render_label_assets
+
+try:
+    from app.core.config import settings  # type: ignore
+except Exception:  # pragma: no cover
+    settings = None  # type: ignore
+
+log = logging.getLogger("uvicorn")
+
+
+def _cfg(name: str, default):
+    return getattr(settings, name, default) if settings is not None else default
+
+
+class LabelRenderTimeout(Exception):
+    """A render did not finish within LABEL_RENDER_TIMEOUT_SECONDS."""
+
+
+def _noop() -> int:
+    return 0
+
+
+class LabelPool:
+    """
+    Bounded executor for the CPU-bound label renderers (qrcode + PIL + reportlab).
+
+    mode "process" runs them on a spawn-context process pool so a render never
+    holds this worker's GIL; "thread" (or a pool that cannot start / breaks)
+    falls back to a thread pool. At most `max_queue` renders are submitted at
+    once; callers beyond that wait on the loop, which is the queue depth
+    reported in stats().
+    """
+
+    def __init__(self, mode: str, workers: int, max_queue: int, timeout_s: float) -> None:
+        self.mode = mode if mode in ("process", "thread") else "process"
+        self.workers = max(1, int(workers))
+        self.max_queue = max(1, int(max_queue))
+        self.timeout_s = float(timeout_s)
+        self.active_mode: Optional[str] = None
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.waiting = self.running = self.max_depth = 0
+        self.completed = self.errors = self.timeouts = self.fallbacks = 0
+        self.total_ms = self.max_ms = 0.0
+
+    # ---- executor ----------------------------------------------------------
+    def _start(self, mode: str) -> Executor:
+        if mode == "process":
+            try:
+                ex: Executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                self.active_mode = "process"
+                return ex
+            except Exception as e:  # e.g. no /dev/shm or sem_open in the container
+                log.warning("[labels] process pool unavailable (%s); using threads", e)
+                self.fallbacks += 1
+        self.active_mode = "thread"
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="labels")
+
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._start(self.mode)
+            return self._executor
+
+    def _fall_back(self, broken: Executor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                log.warning("[labels] process pool broke; falling back to threads")
+                self.fallbacks += 1
+                self._executor = self._start("thread")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots, self._slots_loop = asyncio.Semaphore(self.max_queue), loop
+        return self._slots
+
+    async def warm(self) -> None:
+        """Start the workers now (spawned children import reportlab once, up front)."""
+        ex = self.executor()
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(ex, _noop) for _ in range(self.workers)))
+        except BrokenProcessPool:
+            self._fall_back(ex)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            ex, self._executor = self._executor, None
+        if ex is not None:
+            ex.shutdown(wait=False, cancel_futures=True)
+
+    # ---- calls -------------------------------------------------------------
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """fn(*args) on the pool; `timeout` overrides LABEL_RENDER_TIMEOUT_SECONDS (long jobs like sheets)."""
+        limit = (self.timeout_s if timeout is None else timeout) or None
+        slots = self._semaphore()
+        self.waiting += 1
+        self.max_depth = max(self.max_depth, self.waiting + self.running)
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        t0 = time.perf_counter()
+        try:
+            ex = self.executor()
+            loop = asyncio.get_running_loop()
+            try:
+                out = await asyncio.wait_for(loop.run_in_executor(ex, fn, *args), limit)
+            except BrokenProcessPool:
+                self._fall_back(ex)
+                out = await asyncio.wait_for(loop.run_in_executor(self.executor(), fn, *args), limit)
+        except asyncio.TimeoutError:
+            # the worker keeps going until it finishes; only the caller stops waiting
+            self.timeouts += 1
+            raise LabelRenderTimeout(f"label render exceeded {limit or 0:.1f}s")
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.running -= 1
+            slots.release()
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.completed += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        return out
+
+    async def render(self, qr_text: str, qr_code: str, org_name: str) -> tuple[bytes, bytes]:
+        """(label PNG, 3-up PDF), rendered off the event loop."""
+        return await self.run(render_label_assets, qr_text, qr_code, org_name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "active_mode": self.active_mode,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "timeout_s": self.timeout_s,
+            "queue_depth": self.waiting,
+            "running": self.running,
+            "max_depth": self.max_depth,
+            "completed": self.completed,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "fallbacks": self.fallbacks,
+            "avg_ms": round(self.total_ms / self.completed, 2) if self.completed else None,
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+label_pool = LabelPool(
+    mode=str(_cfg("LABEL_POOL_MODE", "process")).lower(),
+    workers=int(_cfg("LABEL_POOL_WORKERS", 2)),
+    max_queue=int(_cfg("LABEL_POOL_MAX_QUEUE", 64)),
+    timeout_s=float(_cfg("LABEL_RENDER_TIMEOUT_SECONDS", 20.0)),
+)
+
+__all__ = ["LabelPool", "LabelRenderTimeout", "label_pool"]
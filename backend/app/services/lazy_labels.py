@@ -0,0 +1,98 @@
+# path: backend/app/services/lazy_labels.py
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+try:
+    from app.core.config import settings  # type: ignore
+except Exception:  # pragma: no cover
+    settings = None  # type: ignore
+
+
+def _cfg(name: str, default):
+    return getattr(settings, name, default) if settings is not None else default
+
+
+class LazyLabels:
+    """
+    Single-flight for on-demand label renders (LABEL_RENDER_MODE=lazy).
+
+    The first request for a skip's labels starts the render; requests for the
+    same skip arriving while it runs await that one instead of rendering again.
+    This only coalesces within the process: across workers the label_intents
+    claim in app.api.skips decides who stores the rows, and a losing render is
+    counted in `lost_claims`.
+    """
+
+    def __init__(self, mode: str) -> None:
+        self.mode = mode if mode in ("eager", "lazy") else "eager"
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.deferred = self.renders = self.coalesced = 0
+        self.lost_claims = self.errors = self.relabels = 0
+        self.total_ms = self.max_ms = 0.0
+
+    @property
+    def lazy(self) -> bool:
+        return self.mode == "lazy"
+
+    async def _timed(self, fn: Callable[[], Awaitable[bool]]) -> bool:
+        t0 = time.perf_counter()
+        try:
+            stored = await fn()
+        except Exception:
+            self.errors += 1
+            raise
+        if stored:
+            ms = (time.perf_counter() - t0) * 1000.0
+            self.renders += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+        return stored
+
+    def _done(self, key: str, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every waiter went away
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[bool]]) -> bool:
+        """
+        Await fn() for `key`, sharing a call already in flight. fn returns True
+        when it stored labels. Shielded and run outside the caller's context:
+        a caller that disconnects neither cancels nor fails the render the
+        others are waiting on.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # a clean context: the task must not inherit the first caller's
+            # request deadline, or that client disconnecting fails every waiter
+            task = contextvars.Context().run(asyncio.get_running_loop().create_task, self._timed(fn))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def claim_lost(self) -> None:
+        self.lost_claims += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "deferred": self.deferred,
+            "inflight": len(self._inflight),
+            "renders": self.renders,
+            "coalesced": self.coalesced,
+            "lost_claims": self.lost_claims,
+            "errors": self.errors,
+            "relabels": self.relabels,
+            "avg_ms": round(self.total_ms / self.renders, 2) if self.renders else None,
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+lazy_labels = LazyLabels(mode=str(_cfg("LABEL_RENDER_MODE", "eager")).lower())
+
+__all__ = ["LazyLabels", "lazy_labels"]
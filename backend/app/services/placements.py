@@ -0,0 +1,93 @@
+# path: backend/app/services/placements.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.driver import SkipPlacement
+from app.models.skip import Skip
+
+
+def _latest_open(skip_id: Any):
+    """Correlated: id of the skip's newest open placement (served by ix_skip_placements_open)."""
+    p = aliased(SkipPlacement)
+    return (
+        select(p.id)
+        .where(p.skip_id == skip_id, p.removed_at.is_(None))
+        .order_by(p.placed_at.desc(), p.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+async def verify(db: AsyncSession, repair: bool = False, sample: int = 20) -> Dict[str, Any]:
+    """
+    Check skips.current_placement_id against skip_placements: a skip should
+    have at most one open placement, and the pointer should name it (NULL when
+    none is open). With `repair`, in the caller's transaction (caller commits):
+
+    - extra open placements are closed at the time the next placement in that
+      skip's history began (now, if none did);
+    - pointers are set to the newest open placement, and the skip's version is
+      bumped so a driver action that read the old pointer retries.
+
+    Returns counts by kind of drift plus up to `sample` affected skip ids.
+    """
+    p = SkipPlacement
+    dup_skips = (
+        select(p.skip_id).where(p.removed_at.is_(None)).group_by(p.skip_id).having(func.count() > 1)
+    )
+    duplicates = (await db.execute(select(func.count()).select_from(dup_skips.subquery()))).scalar_one()
+
+    expected = _latest_open(Skip.id)
+    drift = Skip.current_placement_id.is_distinct_from(expected)
+    kind = case(
+        (Skip.current_placement_id.is_(None), "missing"),  # an open placement, no pointer
+        (expected.is_(None), "dangling"),                  # pointer, but nothing is open
+        else_="wrong",                                     # points at a closed or older placement
+    )
+    by_kind = dict((await db.execute(select(kind, func.count()).where(drift).group_by(kind))).all())
+    ids = (await db.execute(select(Skip.id).where(drift).order_by(Skip.id).limit(max(0, sample)))).scalars().all()
+
+    out: Dict[str, Any] = {
+        "skips_with_duplicate_open": int(duplicates),
+        "pointer_missing": int(by_kind.get("missing", 0)),
+        "pointer_dangling": int(by_kind.get("dangling", 0)),
+        "pointer_wrong": int(by_kind.get("wrong", 0)),
+        "sample_skip_ids": list(ids),
+        "repaired": False,
+    }
+    if not repair:
+        return out
+
+    now = datetime.utcnow()
+    if duplicates:
+        nxt = aliased(SkipPlacement)
+        next_began = (
+            select(func.min(nxt.placed_at))
+            .where(nxt.skip_id == p.skip_id, nxt.placed_at > p.placed_at)
+            .scalar_subquery()
+        )
+        closed = await db.execute(
+            update(p)
+            .where(p.removed_at.is_(None), p.skip_id.in_(dup_skips), p.id != _latest_open(p.skip_id))
+            .values(removed_at=func.coalesce(next_began, now))
+            .execution_options(synchronize_session=False)
+        )
+        out["placements_closed"] = closed.rowcount or 0
+    fixed = await db.execute(
+        update(Skip)
+        .where(drift)
+        .values(current_placement_id=expected, version=Skip.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    out["pointers_fixed"] = fixed.rowcount or 0
+    out["repaired"] = True
+    return out
+
+
+__all__ = ["verify"]
@@ -1,13 +1,17 @@
 # path: backend/app/services/qr_labels.py
 from __future__ import annotations
 
+import hashlib
+import struct
+import zlib
 from io import BytesIO
 from dataclasses import dataclass
-from typing import Optional
+from typing import BinaryIO, Dict, List, Optional, Sequence, Union
 
 import qrcode
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
+from reportlab.lib.pagesizes import A4, LETTER
 from reportlab.lib.units import mm
 from reportlab.lib.utils import ImageReader
 
@@ -95,3 +99,176 @@ def make_three_up_pdf(meta: LabelMeta, qr_png: bytes) -> bytes:
     c.showPage()
     c.save()
     return buf.getvalue()
+
+
+# -----------------------------------------------------------------------------
+# N-up label sheets
+# -----------------------------------------------------------------------------
+PAGE_SIZES = {"A4": A4, "LETTER": LETTER}
+
+# (qr_text, qr_code, org_name, qr) -- qr: cached QR PNG as a file path or bytes, None = render it
+SheetLabel = tuple[str, str, str, Union[str, bytes, None]]
+
+
+class _PdfFile:
+    """
+    Just enough PDF to append objects to a file as they are made. reportlab's
+    canvas keeps every page until save(); a sheet of thousands of labels is
+    written here page by page instead, holding only the object offsets.
+    """
+
+    def __init__(self, f: BinaryIO) -> None:
+        self.f = f
+        self.offsets: List[int] = [0]  # index = object number
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def reserve(self) -> int:
+        self.offsets.append(0)
+        return len(self.offsets) - 1
+
+    def put(self, body: bytes, stream: Optional[bytes] = None, num: Optional[int] = None) -> int:
+        num = self.reserve() if num is None else num
+        self.offsets[num] = self.f.tell()
+        self.f.write(b"%d 0 obj\n" % num)
+        if stream is None:
+            self.f.write(body)
+        else:
+            self.f.write(body[:-2] + b" /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        self.f.write(b"\nendobj\n")
+        return num
+
+    def close(self, root: int) -> None:
+        xref, n = self.f.tell(), len(self.offsets)
+        self.f.write(b"xref\n0 %d\n0000000000 65535 f \n" % n)
+        for off in self.offsets[1:]:
+            self.f.write(b"%010d 00000 n \n" % off)
+        self.f.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (n, root, xref))
+
+
+def _png_image(png: bytes) -> tuple[bytes, bytes]:
+    """
+    PNG -> image XObject. Grey/RGB non-interlaced PNGs (what make_qr_png writes)
+    go in undecoded: the IDAT stream is zlib data PDF reads with the PNG
+    predictor. Anything else is decoded to 8-bit grey first.
+    """
+    w = h = bits = color = interlace = -1
+    idat: List[bytes] = []
+    pos = 8
+    while png[:8] == b"\x89PNG\r\n\x1a\n" and pos < len(png):
+        (length,) = struct.unpack(">I", png[pos:pos + 4])
+        ctype, data = png[pos + 4:pos + 8], png[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if ctype == b"IHDR":
+            w, h, bits, color, _, _, interlace = struct.unpack(">IIBBBBB", data)
+        elif ctype == b"IDAT":
+            idat.append(data)
+        elif ctype == b"IEND":
+            break
+    if color in (0, 2) and interlace == 0 and idat:
+        colors, space = (1, b"/DeviceGray") if color == 0 else (3, b"/DeviceRGB")
+        parms = b"<< /Predictor 15 /Colors %d /BitsPerComponent %d /Columns %d >>" % (colors, bits, w)
+        data = b"".join(idat)
+    else:
+        from PIL import Image
+
+        img = Image.open(BytesIO(png)).convert("L")
+        (w, h), bits, space, parms = img.size, 8, b"/DeviceGray", b"null"
+        data = zlib.compress(img.tobytes())
+    return b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s /BitsPerComponent %d " \
+           b"/Filter /FlateDecode /DecodeParms %s >>" % (w, h, space, bits, parms), data
+
+
+def _pdf_text(s: str) -> bytes:
+    b = s.encode("cp1252", "replace")
+    return b"(" + b.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _fit(text: str, font: str, size: float, width: float, min_size: float = 5.0) -> tuple[str, float]:
+    """Shrink to fit `width` (down to min_size), then truncate."""
+    while size > min_size and stringWidth(text, font, size) > width:
+        size -= 0.5
+    while text and stringWidth(text, font, size) > width:
+        text = text[:-1]
+    return text, size
+
+
+def render_label_sheet(path: str, labels: Sequence[SheetLabel], cols: int = 3, rows: int = 8, page: str = "A4") -> int:
+    """
+    N-up label sheet: `cols` x `rows` labels per page, written to `path` one
+    page at a time; returns the page count. Each label shows QR + org + code
+    like the 3-up sheet. Cached QR PNGs are read as their page is drawn and
+    embedded undecoded; a repeated QR is stored once. Module-level so it can
+    run on the label pool.
+    """
+    page_w, page_h = PAGE_SIZES[page]
+    margin = 8 * mm
+    cell_w, cell_h = (page_w - 2 * margin) / cols, (page_h - 2 * margin) / rows
+    pad = min(cell_w, cell_h) * 0.08
+    qr_size = min(cell_h - 2 * pad, cell_w * 0.45)
+    text_w = cell_w - qr_size - 3 * pad
+    code_pt = min(14.0, cell_h / mm * 0.4)
+    per_page = cols * rows
+
+    images: Dict[bytes, int] = {}
+    kids: List[int] = []
+    with open(path, "wb") as f:
+        pdf = _PdfFile(f)
+        catalog, pages_obj = pdf.reserve(), pdf.reserve()
+        fonts = b"<< /F1 %d 0 R /F2 %d 0 R >>" % tuple(
+            pdf.put(b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % name)
+            for name in (b"Helvetica", b"Helvetica-Bold")
+        )
+        for start in range(0, len(labels), per_page):
+            ops: List[bytes] = []
+            xobjects: Dict[int, None] = {}
+            for slot, (qr_text, qr_code, org_name, qr) in enumerate(labels[start:start + per_page]):
+                x = margin + (slot % cols) * cell_w
+                y = page_h - margin - (slot // cols + 1) * cell_h
+
+                # frame (cut guide)
+                ops.append(b"q 0.3 w 0.7 G %.2f %.2f %.2f %.2f re S Q"
+                           % (x + pad / 2, y + pad / 2, cell_w - pad, cell_h - pad))
+
+                # qr
+                png = qr if isinstance(qr, bytes) else (open(qr, "rb").read() if qr else make_qr_png(qr_text))
+                key = hashlib.sha256(png).digest()
+                if key not in images:
+                    head, data = _png_image(png)
+                    images[key] = pdf.put(head, data)
+                xobjects[images[key]] = None
+                ops.append(b"q %.2f 0 0 %.2f %.2f %.2f cm /Im%d Do Q"
+                           % (qr_size, qr_size, x + pad, y + (cell_h - qr_size) / 2, images[key]))
+
+                # text block
+                tx = x + 2 * pad + qr_size
+                ty = y + cell_h - pad - code_pt * 0.8
+                for font, ref, text, size, line_y, grey in (
+                    ("Helvetica-Bold", 2, org_name, code_pt * 0.7, ty, 0),
+                    ("Helvetica-Bold", 2, qr_code, code_pt, ty - code_pt * 1.2, 0),
+                    ("Helvetica", 1, qr_text, 6.0, y + pad * 1.5, 0.3),
+                ):
+                    text, size = _fit(text, font, size, text_w, min_size=4.0 if ref == 1 else 5.0)
+                    ops.append(b"%.1f g BT /F%d %.1f Tf %.2f %.2f Td %s Tj ET"
+                               % (grey, ref, size, tx, line_y, _pdf_text(text)))
+
+            content = pdf.put(b"<< /Filter /FlateDecode >>", zlib.compress(b"\n".join(ops)))
+            xo = b" ".join(b"/Im%d %d 0 R" % (n, n) for n in xobjects)
+            kids.append(pdf.put(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] /Contents %d 0 R "
+                b"/Resources << /Font %s /XObject << %s >> >> >>" % (pages_obj, page_w, page_h, content, fonts, xo)
+            ))
+
+        pdf.put(b"<< /Type /Pages /Count %d /Kids [%s] >>"
+                % (len(kids), b" ".join(b"%d 0 R" % k for k in kids)), num=pages_obj)
+        pdf.put(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_obj, num=catalog)
+        pdf.close(catalog)
+    return len(kids)
+
+
+def render_label_assets(qr_text: str, qr_code: str, org_name: str) -> tuple[bytes, bytes]:
+    """
+    (label PNG, 3-up PDF) for one skip. Module-level and picklable so it can
+    run on an executor; CPU-bound, never call it on the event loop.
+    """
+    png = make_qr_png(qr_text)
+    return png, make_three_up_pdf(LabelMeta(qr_text=qr_text, qr_code=qr_code, org_name=org_name), png)
@@ -0,0 +1,114 @@
+# path: backend/app/services/skip_cache.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+try:
+    from app.core.config import settings  # type: ignore
+except Exception:  # pragma: no cover
+    settings = None  # type: ignore
+
+
+def _cfg(name: str, default):
+    return getattr(settings, name, default) if settings is not None else default
+
+
+class SkipRef(NamedTuple):
+    id: str
+    status: Optional[str]
+    zone_id: Optional[str]
+
+
+class SkipCache:
+    """
+    Bounded LRU + TTL map of qr_code -> (id, status, zone_id) for /driver/scan.
+
+    Per process: with several workers a write on one is seen by the others
+    within the TTL. Driver writes update it after commit (write-through);
+    skip create / soft delete invalidate. Reads from a replica that may lag do
+    not fill it. Writes never trust it — they still load the row they modify.
+    """
+
+    def __init__(self, maxsize: int, ttl_s: float) -> None:
+        self.maxsize = max(0, int(maxsize))
+        self.ttl_s = float(ttl_s)
+        self._data: "OrderedDict[str, Tuple[float, SkipRef]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.expired = self.evictions = self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl_s > 0
+
+    def get(self, qr: str) -> Optional[SkipRef]:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(qr)
+            if item is None:
+                self.misses += 1
+                return None
+            expires, ref = item
+            if expires <= now:
+                del self._data[qr]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(qr)
+            self.hits += 1
+            return ref
+
+    def put(self, qr: str, ref: SkipRef) -> None:
+        if not self.enabled or not qr:
+            return
+        with self._lock:
+            self._data[qr] = (time.monotonic() + self.ttl_s, ref)
+            self._data.move_to_end(qr)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def remember(self, skip: Any) -> None:
+        """Write-through from an ORM Skip after its change is committed."""
+        qr = getattr(skip, "qr_code", None)
+        if qr:
+            self.put(qr, SkipRef(str(skip.id), getattr(skip, "status", None), getattr(skip, "zone_id", None)))
+
+    def invalidate(self, qr: Optional[str]) -> None:
+        if not qr:
+            return
+        with self._lock:
+            if self._data.pop(qr, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+skip_cache = SkipCache(
+    maxsize=int(_cfg("SKIP_CACHE_SIZE", 5000)),
+    ttl_s=float(_cfg("SKIP_CACHE_TTL_SECONDS", 30.0)),
+)
+
+__all__ = ["SkipRef", "SkipCache", "skip_cache"]
@@ -0,0 +1,130 @@
+# path: backend/app/services/skip_summary.py
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import String, cast, delete, func, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.skip import Skip
+from app.models.skip_summary import SkipSummary
+
+# (owner_org_id, zone_id, status); None for a deleted / not-yet-existing skip
+Key = Tuple[str, str, str]
+
+GROUP_FIELDS = ("owner_org_id", "zone_id", "status")
+
+
+def key(owner_org_id: Any, zone_id: Any, status: Any) -> Key:
+    return (str(owner_org_id) if owner_org_id else "", str(zone_id) if zone_id else "", str(status or ""))
+
+
+def key_of(skip: Any) -> Optional[Key]:
+    """The summary bucket a skip counts in right now (None once soft-deleted)."""
+    if getattr(skip, "deleted_at", None) is not None:
+        return None
+    return key(getattr(skip, "owner_org_id", None), getattr(skip, "zone_id", None), getattr(skip, "status", None))
+
+
+def _upsert(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:  # pragma: no cover - other backends rely on rebuild()
+        return None
+    return insert
+
+
+async def bump(db: AsyncSession, deltas: Dict[Key, int]) -> None:
+    """Apply count deltas with one multi-row upsert, inside the caller's transaction."""
+    deltas = {k: d for k, d in deltas.items() if k is not None and d}
+    if not deltas:
+        return
+    insert = _upsert(db.get_bind().dialect.name)
+    if insert is None:
+        return
+    now = datetime.utcnow()
+    stmt = insert(SkipSummary).values([
+        {"owner_org_id": owner, "zone_id": zone, "status": st, "count": d, "updated_at": now}
+        for (owner, zone, st), d in sorted(deltas.items())  # fixed row order: no upsert deadlocks
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SkipSummary.owner_org_id, SkipSummary.zone_id, SkipSummary.status],
+        set_={"count": SkipSummary.count + stmt.excluded.count, "updated_at": stmt.excluded.updated_at},
+    )
+    await db.execute(stmt)
+
+
+async def moved(db: AsyncSession, before: Optional[Key], after: Optional[Key]) -> None:
+    """A skip went from bucket `before` to `after` (either may be None)."""
+    if before == after:
+        return
+    deltas: Counter = Counter()
+    if before is not None:
+        deltas[before] -= 1
+    if after is not None:
+        deltas[after] += 1
+    await bump(db, deltas)
+
+
+async def added(db: AsyncSession, skip: Any) -> None:
+    await moved(db, None, key_of(skip))
+
+
+async def rebuild(db: AsyncSession) -> int:
+    """
+    Repair: recompute every bucket from `skips` in one INSERT ... SELECT.
+    Caller commits. On Postgres the table is locked so concurrent driver
+    upserts wait instead of landing between the delete and the insert.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text("LOCK TABLE skip_summary IN EXCLUSIVE MODE"))
+    await db.execute(delete(SkipSummary))
+    # cast: the 0005 migration made these UUID columns on Postgres
+    owner = func.coalesce(cast(Skip.owner_org_id, String(36)), literal(""))
+    zone = func.coalesce(cast(Skip.zone_id, String(36)), literal(""))
+    src = (
+        select(owner, zone, Skip.status, func.count(), literal(datetime.utcnow()))
+        .where(Skip.deleted_at.is_(None))
+        .group_by(owner, zone, Skip.status)
+    )
+    await db.execute(
+        SkipSummary.__table__.insert().from_select(
+            ["owner_org_id", "zone_id", "status", "count", "updated_at"], src
+        )
+    )
+    return int((await db.execute(select(func.count()).select_from(SkipSummary))).scalar_one())
+
+
+async def rebuild_if_empty(db: AsyncSession) -> bool:
+    """First boot after the table appears (dev create_all): backfill once."""
+    if (await db.execute(select(SkipSummary.status).limit(1))).first() is not None:
+        return False
+    if (await db.execute(select(Skip.id).where(Skip.deleted_at.is_(None)).limit(1))).first() is None:
+        return False
+    await rebuild(db)
+    await db.commit()
+    return True
+
+
+async def totals(db: AsyncSession, by: Sequence[str] = ()) -> Dict[str, Any]:
+    """Totals grouped by any subset of GROUP_FIELDS; reads O(groups) rows."""
+    cols = [getattr(SkipSummary, f) for f in by]
+    stmt = select(*cols, func.sum(SkipSummary.count)).where(SkipSummary.count != 0)
+    if cols:
+        stmt = stmt.group_by(*cols).order_by(*cols)
+    rows = (await db.execute(stmt)).all()
+    groups: List[Dict[str, Any]] = []
+    total = 0
+    for row in rows:
+        n = int(row[-1] or 0)
+        total += n
+        if cols:
+            groups.append({**{f: (row[i] or None) for i, f in enumerate(by)}, "count": n})
+    return {"total": total, "by": list(by), "groups": groups}
+
+
+__all__ = ["Key", "GROUP_FIELDS", "key", "key_of", "bump", "moved", "added", "rebuild", "rebuild_if_empty", "totals"]
@@ -0,0 +1,98 @@
+# path: backend/app/services/skip_versions.py
+from __future__ import annotations
+
+import random
+import threading
+from collections import Counter
+from typing import Any, Dict
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.skip import Skip
+
+try:
+    from app.core.config import settings  # type: ignore
+except Exception:  # pragma: no cover
+    settings = None  # type: ignore
+
+
+def _cfg(name: str, default):
+    return getattr(settings, name, default) if settings is not None else default
+
+
+class VersionConflict(Exception):
+    """The skip changed since it was read; roll back, re-read and try again."""
+
+
+class SkipVersions:
+    """
+    Optimistic concurrency for skip state changes.
+
+    Every driver action starts its writes with bump(): a compare-and-set
+    `UPDATE skips SET version = v + 1 WHERE id = :id AND version = v`, v being
+    the version this transaction read. If another action committed in between,
+    no row matches and VersionConflict is raised; the caller rolls back and
+    re-runs the action against fresh state, at most `max_attempts` times.
+    The action's new skip state (zone_id, status) rides on the same UPDATE.
+    """
+
+    def __init__(self, max_attempts: int, backoff_ms: float) -> None:
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_ms = max(0.0, float(backoff_ms))
+        self._lock = threading.Lock()
+        self.bumps = 0
+        self.conflicts: Counter = Counter()
+        self.retries: Counter = Counter()
+        self.exhausted: Counter = Counter()
+
+    async def bump(self, db: AsyncSession, skip: Skip, **values: Any) -> int:
+        v = skip.version or 0
+        res = await db.execute(
+            update(Skip.__table__)
+            .where(Skip.__table__.c.id == skip.id, Skip.__table__.c.version == v)
+            .values(version=v + 1, **values)
+        )
+        if res.rowcount != 1:
+            raise VersionConflict(f"skip {skip.id} is no longer at version {v}")
+        for name, value in {**values, "version": v + 1}.items():
+            set_committed_value(skip, name, value)  # no second UPDATE from the ORM flush
+        with self._lock:
+            self.bumps += 1
+        return v + 1
+
+    def retry(self, action: str, attempt: int) -> bool:
+        """Record a conflict on `attempt`; True if the caller should try again."""
+        again = attempt < self.max_attempts
+        with self._lock:
+            self.conflicts[action] += 1
+            (self.retries if again else self.exhausted)[action] += 1
+        return again
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before `attempt` + 1: full jitter, doubling per attempt."""
+        return random.uniform(0, self.backoff_ms * (2 ** (attempt - 1))) / 1000.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_attempts": self.max_attempts,
+                "backoff_ms": self.backoff_ms,
+                "bumps": self.bumps,
+                "conflicts": sum(self.conflicts.values()),
+                "retries": sum(self.retries.values()),
+                "exhausted": sum(self.exhausted.values()),
+                "by_action": {
+                    a: {"conflicts": self.conflicts[a], "retries": self.retries[a], "exhausted": self.exhausted[a]}
+                    for a in sorted(self.conflicts)
+                },
+            }
+
+
+skip_versions = SkipVersions(
+    max_attempts=int(_cfg("DRIVER_CAS_MAX_ATTEMPTS", 5)),
+    backoff_ms=float(_cfg("DRIVER_CAS_BACKOFF_MS", 10.0)),
+)
+
+__all__ = ["VersionConflict", "SkipVersions", "skip_versions"]
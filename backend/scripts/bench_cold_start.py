@@ -0,0 +1,121 @@
+# path: backend/scripts/bench_cold_start.py
+"""
+Time-to-first-byte right after startup, with and without pool prewarm
+(DB_PREWARM_CONNECTIONS). Each mode runs in a fresh subprocess: seed a skip,
+dispose the pool so it is cold, run the startup prewarm, then fire a burst of
+concurrent /driver/scan requests as a deploy's first traffic would.
+
+    python scripts/bench_cold_start.py --burst 5
+    DATABASE_URL=postgresql+asyncpg://... python scripts/bench_cold_start.py
+
+On SQLite connecting is nearly free, so the gap is small; against Render
+Postgres the unwarmed burst pays one TLS handshake + pre-ping per connection.
+"""
+from __future__ import annotations
+
+from pathlib import Path; import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path: sys.path.insert(0, str(ROOT))
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import time
+from typing import Any, Dict, List
+
+
+async def _run_one(burst: int) -> Dict[str, Any]:
+    from fastapi import FastAPI
+    from httpx import AsyncClient, ASGITransport
+    from sqlalchemy import select
+
+    from app.core.config import settings
+    from app.core import lifecycle
+    from app.db import engine, engines, dispose_engines, AsyncSessionLocal
+    from app.middleware_inflight import InFlightMiddleware
+    from app.models.base import Base
+    from app.models.skip import Skip
+    import app.models.driver  # noqa: F401  (register tables)
+    import app.models.labels  # noqa: F401
+    from app.api.driver import router as driver_router
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as s:
+        if (await s.execute(select(Skip.id).where(Skip.qr_code == "BENCH-COLD"))).first() is None:
+            s.add(Skip(qr_code="BENCH-COLD"))
+            await s.commit()
+    await dispose_engines()  # cold pool, as after a deploy
+
+    app = FastAPI()
+    app.include_router(driver_router, prefix="/driver")
+    app.add_middleware(InFlightMiddleware)
+
+    t0 = time.perf_counter()
+    warm = await lifecycle.prewarm_all(engines(), int(settings.DB_PREWARM_CONNECTIONS))
+    lifecycle.mark_ready()
+    startup_ms = (time.perf_counter() - t0) * 1000.0
+
+    ttfb: List[float] = []
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=60) as ac:
+        async def one() -> None:
+            t = time.perf_counter()
+            r = await ac.get("/driver/scan?qr=BENCH-COLD")
+            r.raise_for_status()
+            ttfb.append((time.perf_counter() - t) * 1000.0)
+        await asyncio.gather(*(one() for _ in range(burst)))
+
+    await dispose_engines()
+    ttfb.sort()
+    return {
+        "mode": f"prewarm={settings.DB_PREWARM_CONNECTIONS}",
+        "startup_ms": round(startup_ms, 2),
+        "prewarmed": sum(r["opened"] for r in warm.values()),
+        "first_ttfb_ms": (lifecycle.lifecycle_state()["first_request"] or {}).get("ttfb_ms"),
+        "burst_p50_ms": round(ttfb[len(ttfb) // 2], 2),
+        "burst_max_ms": round(ttfb[-1], 2),
+    }
+
+
+def _child(args: argparse.Namespace) -> None:
+    out = asyncio.run(_run_one(args.burst))
+    print("BENCH_RESULT " + json.dumps(out), flush=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--burst", type=int, default=5, help="concurrent first requests")
+    ap.add_argument("--prewarm", type=int, default=5, help="DB_PREWARM_CONNECTIONS for the warm run")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        _child(args)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = os.environ.get("DATABASE_URL") or f"sqlite+aiosqlite:///{tmp}/bench.db"
+        for prewarm in ("0", str(args.prewarm)):
+            env = {**os.environ, "DATABASE_URL": db_url, "DB_PREWARM_CONNECTIONS": prewarm, "SQL_INSTRUMENTATION": "0"}
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", "--burst", str(args.burst)],
+                env=env, capture_output=True, text=True, cwd=str(ROOT),
+            )
+            line = next((l for l in proc.stdout.splitlines() if l.startswith("BENCH_RESULT ")), None)
+            if line is None:
+                print(proc.stdout[-2000:], proc.stderr[-2000:], sep="\n")
+                raise SystemExit(f"bench child failed (DB_PREWARM_CONNECTIONS={prewarm})")
+            results.append(json.loads(line.split(" ", 1)[1]))
+
+    print(f"{'mode':<14}{'startup ms':>12}{'warmed':>8}{'1st ttfb':>10}{'p50 ms':>10}{'max ms':>10}")
+    for r in results:
+        print(f"{r['mode']:<14}{r['startup_ms']:>12}{r['prewarmed']:>8}{r['first_ttfb_ms']:>10}"
+              f"{r['burst_p50_ms']:>10}{r['burst_max_ms']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# path: backend/scripts/bench_driver_lifecycle.py
+"""
+Throughput of the driver lifecycle endpoints on a file-backed SQLite DB,
+default engine vs SQLITE_WAL_MODE (WAL + single writer + read-only pool).
+
+Each worker drives its own skip through scan -> deliver-empty ->
+relocate-empty -> collect-full -> return-empty, in-process via httpx's
+ASGITransport, so the numbers measure the app + DB, not the network.
+
+    python scripts/bench_driver_lifecycle.py --workers 32 --rounds 5
+
+Each mode runs in a fresh subprocess because the engine is built at import.
+"""
+from __future__ import annotations
+
+from pathlib import Path; import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path: sys.path.insert(0, str(ROOT))
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import time
+from typing import Any, Dict, List
+
+
+async def _run_one(workers: int, rounds: int) -> Dict[str, Any]:
+    from fastapi import FastAPI
+    from httpx import AsyncClient, ASGITransport
+
+    from app.db import engine, dispose_engines, SQLITE_WAL
+    from app.models.base import Base
+    from app.models.skip import Skip
+    import app.models.driver  # noqa: F401  (register tables)
+    import app.models.labels  # noqa: F401
+    from app.api.driver import router as driver_router
+    from app.db import AsyncSessionLocal
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as s:
+        s.add_all([Skip(qr_code=f"BENCH-{i:04d}") for i in range(workers)])
+        await s.commit()
+
+    app = FastAPI()
+    app.include_router(driver_router, prefix="/driver")
+
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    async def call(ac: AsyncClient, method: str, url: str, **kw) -> None:
+        t0 = time.perf_counter()
+        try:
+            r = await ac.request(method, url, **kw)
+            if r.status_code >= 400:
+                key = f"{r.status_code}"
+                errors[key] = errors.get(key, 0) + 1
+        except Exception as e:
+            key = type(e).__name__ + (": database is locked" if "locked" in str(e) else "")
+            errors[key] = errors.get(key, 0) + 1
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    async def worker(i: int, ac: AsyncClient) -> None:
+        qr = f"BENCH-{i:04d}"
+        for _ in range(rounds):
+            await call(ac, "GET", f"/driver/scan?qr={qr}")
+            await call(ac, "POST", "/driver/deliver-empty", json={"skip_qr": qr, "to_zone_id": "ZONE_A"})
+            await call(ac, "POST", "/driver/relocate-empty", json={"skip_qr": qr, "to_zone_id": "ZONE_B"})
+            await call(ac, "POST", "/driver/collect-full", json={"skip_qr": qr, "gross_kg": 2500, "tare_kg": 1500})
+            await call(ac, "POST", "/driver/return-empty", json={"skip_qr": qr, "to_zone_id": "ZONE_C"})
+
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=120) as ac:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(i, ac) for i in range(workers)))
+        elapsed = time.perf_counter() - t0
+
+    await dispose_engines()
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "mode": "wal+single-writer" if SQLITE_WAL else "default",
+        "requests": n,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(n / elapsed, 1) if elapsed else 0.0,
+        "lifecycles_per_s": round(workers * rounds / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(latencies[n // 2], 2) if n else None,
+        "p95_ms": round(latencies[int(n * 0.95) - 1], 2) if n else None,
+    }
+
+
+def _child(args: argparse.Namespace) -> None:
+    out = asyncio.run(_run_one(args.workers, args.rounds))
+    print("BENCH_RESULT " + json.dumps(out), flush=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=32, help="concurrent drivers (one skip each)")
+    ap.add_argument("--rounds", type=int, default=5, help="lifecycles per driver")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        _child(args)
+        return
+
+    results = []
+    for wal in ("0", "1"):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite+aiosqlite:///{tmp}/bench.db",
+                "SQLITE_WAL_MODE": wal,
+                "SQL_INSTRUMENTATION": "0",
+            }
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", "--workers", str(args.workers), "--rounds", str(args.rounds)],
+                env=env, capture_output=True, text=True, cwd=str(ROOT),
+            )
+            line = next((l for l in proc.stdout.splitlines() if l.startswith("BENCH_RESULT ")), None)
+            if line is None:
+                print(proc.stdout[-2000:], proc.stderr[-2000:], sep="\n")
+                raise SystemExit(f"bench child failed (SQLITE_WAL_MODE={wal})")
+            results.append(json.loads(line.split(" ", 1)[1]))
+
+    print(f"{'mode':<20}{'req/s':>10}{'cycles/s':>10}{'p50 ms':>10}{'p95 ms':>10}  errors")
+    for r in results:
+        print(f"{r['mode']:<20}{r['req_per_s']:>10}{r['lifecycles_per_s']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}  {r['errors'] or '-'}")
+
+
+if __name__ == "__main__":
+    main()
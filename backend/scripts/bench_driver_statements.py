@@ -0,0 +1,144 @@
+# path: backend/scripts/bench_driver_statements.py
+"""
+Statements per request and latency for each driver action endpoint.
+
+Every worker takes its own skips through deliver-empty -> relocate-empty ->
+collect-full -> return-empty, in-process via httpx's ASGITransport with the
+app's SQLTimingMiddleware mounted; per endpoint it reports the SQL statements
+per request (from app.core.sql_metrics, COMMIT not counted), DB ms and p50 /
+p95 latency.
+
+    python scripts/bench_driver_statements.py --workers 8 --rounds 25
+    python scripts/bench_driver_statements.py --database-url postgresql+asyncpg://user:pw@localhost/wms_bench
+
+Without --database-url it runs on a temporary SQLite file. A Postgres URL
+must point at a scratch database: the tables are created there. Each target
+runs in a fresh subprocess because the engine is built at import.
+"""
+from __future__ import annotations
+
+from pathlib import Path; import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path: sys.path.insert(0, str(ROOT))
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List
+
+_STEPS = ("deliver-empty", "relocate-empty", "collect-full", "return-empty")
+
+
+async def _run_one(workers: int, rounds: int) -> Dict[str, Any]:
+    from fastapi import FastAPI
+    from httpx import AsyncClient, ASGITransport
+
+    from app.db import engine, dispose_engines
+    from app.models.base import Base
+    from app.models.skip import Skip
+    import app.models.driver  # noqa: F401  (register tables)
+    import app.models.labels  # noqa: F401
+    import app.models.skip_summary  # noqa: F401
+    from app.api.driver import router as driver_router
+    from app.core import sql_metrics
+    from app.db import AsyncSessionLocal
+    from app.middleware_sqltiming import SQLTimingMiddleware
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    run = uuid.uuid4().hex[:6]
+    async with AsyncSessionLocal() as s:
+        s.add_all([Skip(qr_code=f"STMT-{run}-{i:04d}") for i in range(workers)])
+        await s.commit()
+
+    app = FastAPI()
+    app.include_router(driver_router, prefix="/driver")
+    app.add_middleware(SQLTimingMiddleware)
+
+    latencies: Dict[str, List[float]] = {step: [] for step in _STEPS}
+    errors: Dict[str, int] = {}
+
+    async def worker(i: int, ac: AsyncClient) -> None:
+        qr = f"STMT-{run}-{i:04d}"
+        bodies = {
+            "deliver-empty": {"skip_qr": qr, "to_zone_id": "ZONE_A", "driver_name": "Bench"},
+            "relocate-empty": {"skip_qr": qr, "to_zone_id": "ZONE_B", "driver_name": "Bench"},
+            "collect-full": {"skip_qr": qr, "gross_kg": 2500, "tare_kg": 1500, "driver_name": "Bench"},
+            "return-empty": {"skip_qr": qr, "to_zone_id": "ZONE_C", "driver_name": "Bench"},
+        }
+        for _ in range(rounds):
+            for step in _STEPS:
+                t0 = time.perf_counter()
+                r = await ac.post(f"/driver/{step}", json=bodies[step])
+                latencies[step].append((time.perf_counter() - t0) * 1000.0)
+                if r.status_code >= 400:
+                    key = f"{step} {r.status_code}"
+                    errors[key] = errors.get(key, 0) + 1
+
+    sql_metrics.reset()
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=120) as ac:
+        await asyncio.gather(*(worker(i, ac) for i in range(workers)))
+
+    routes = {r["route"]: r for r in sql_metrics.top_routes(limit=100)}
+    await dispose_engines()
+    out: Dict[str, Any] = {"dialect": engine.dialect.name, "errors": errors, "endpoints": {}}
+    for step in _STEPS:
+        lat = sorted(latencies[step])
+        n = len(lat)
+        rs = routes.get(f"POST /driver/{step}", {})
+        out["endpoints"][step] = {
+            "requests": n,
+            "statements": rs.get("avg_statements"),
+            "db_ms": rs.get("avg_db_ms"),
+            "p50_ms": round(lat[n // 2], 2) if n else None,
+            "p95_ms": round(lat[max(0, int(n * 0.95) - 1)], 2) if n else None,
+        }
+    return out
+
+
+def _child(args: argparse.Namespace) -> None:
+    out = asyncio.run(_run_one(args.workers, args.rounds))
+    print("BENCH_RESULT " + json.dumps(out), flush=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=8, help="concurrent drivers (one skip each)")
+    ap.add_argument("--rounds", type=int, default=25, help="lifecycles per driver")
+    ap.add_argument("--database-url", action="append", default=[], help="also run against this DB (repeatable)")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        _child(args)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for url in [f"sqlite+aiosqlite:///{tmp}/bench.db", *args.database_url]:
+            env = {**os.environ, "DATABASE_URL": url, "SQL_INSTRUMENTATION": "1", "SQL_SLOW_MS": "100000"}
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", "--workers", str(args.workers), "--rounds", str(args.rounds)],
+                env=env, capture_output=True, text=True, cwd=str(ROOT),
+            )
+            line = next((l for l in proc.stdout.splitlines() if l.startswith("BENCH_RESULT ")), None)
+            if line is None:
+                print(proc.stdout[-2000:], proc.stderr[-2000:], sep="\n")
+                raise SystemExit(f"bench child failed ({url.split('://')[0]})")
+            results.append(json.loads(line.split(" ", 1)[1]))
+
+    print(f"{'db':<12}{'endpoint':<16}{'stmts/req':>10}{'db ms':>9}{'p50 ms':>9}{'p95 ms':>9}")
+    for r in results:
+        for step, e in r["endpoints"].items():
+            print(f"{r['dialect']:<12}{step:<16}{e['statements']!s:>10}{e['db_ms']!s:>9}{e['p50_ms']!s:>9}{e['p95_ms']!s:>9}")
+        if r["errors"]:
+            print(f"{r['dialect']:<12}errors: {r['errors']}")
+
+
+if __name__ == "__main__":
+    main()
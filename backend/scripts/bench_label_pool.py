@@ -0,0 +1,147 @@
+# path: backend/scripts/bench_label_pool.py
+"""
+/driver/scan latency while label sheets render concurrently, for three ways
+of running the renderer:
+
+  inline   - render_label_assets called on the event loop (the old behaviour)
+  thread   - LABEL_POOL_MODE=thread
+  process  - LABEL_POOL_MODE=process (spawned workers, warmed before timing)
+
+    python scripts/bench_label_pool.py --labels 60 --workers 2
+
+Each mode runs in a fresh subprocess because the pool is configured at import.
+"""
+from __future__ import annotations
+
+from pathlib import Path; import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path: sys.path.insert(0, str(ROOT))
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import time
+from typing import Any, Dict, List
+
+
+async def _run_one(mode: str, labels: int, interval: float) -> Dict[str, Any]:
+    from fastapi import FastAPI
+    from httpx import AsyncClient, ASGITransport
+
+    from app.db import engine, dispose_engines, AsyncSessionLocal
+    from app.models.base import Base
+    from app.models.skip import Skip
+    import app.models.driver  # noqa: F401  (register tables)
+    import app.models.labels  # noqa: F401
+    from app.api.driver import router as driver_router
+    from app.services.label_pool import label_pool
+    from app.services.qr_labels import render_label_assets
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as s:
+        s.add(Skip(qr_code="BENCH-LBL"))
+        await s.commit()
+
+    app = FastAPI()
+    app.include_router(driver_router, prefix="/driver")
+    if mode != "inline":
+        await label_pool.warm()
+
+    async def render(i: int) -> None:
+        args = (f"https://bench/driver/qr/LBL-{i}", f"LBL-{i}", "BENCH ORG")
+        if mode == "inline":
+            await asyncio.sleep(0)  # each render is its own request in real traffic
+            render_label_assets(*args)
+        else:
+            await label_pool.render(*args)
+
+    latencies: List[float] = []
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=120) as ac:
+        done = asyncio.Event()
+
+        async def scanner() -> None:
+            # scan for as long as labels are rendering: the window a driver would feel
+            while not done.is_set():
+                t = time.perf_counter()
+                r = await ac.get("/driver/scan?qr=BENCH-LBL")
+                r.raise_for_status()
+                latencies.append((time.perf_counter() - t) * 1000.0)
+                await asyncio.sleep(interval)
+
+        async def renders() -> None:
+            try:
+                await asyncio.gather(*(render(i) for i in range(labels)))
+            finally:
+                done.set()
+
+        t0 = time.perf_counter()
+        await asyncio.gather(scanner(), renders())
+        elapsed = time.perf_counter() - t0
+
+    stats = label_pool.stats()
+    label_pool.shutdown()
+    await dispose_engines()
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "mode": mode if mode == "inline" else f"{mode}->{stats['active_mode']}",
+        "elapsed_s": round(elapsed, 2),
+        "scans": n,
+        "scan_p50_ms": round(latencies[n // 2], 2),
+        "scan_p99_ms": round(latencies[max(0, int(n * 0.99) - 1)], 2),
+        "scan_max_ms": round(latencies[-1], 2),
+        "max_depth": stats["max_depth"],
+    }
+
+
+def _child(args: argparse.Namespace) -> None:
+    out = asyncio.run(_run_one(args.mode, args.labels, args.interval_ms / 1000.0))
+    print("BENCH_RESULT " + json.dumps(out), flush=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--labels", type=int, default=60, help="label sheets rendered concurrently")
+    ap.add_argument("--interval-ms", type=float, default=2.0, help="pause between timed scans")
+    ap.add_argument("--workers", type=int, default=2, help="LABEL_POOL_WORKERS")
+    ap.add_argument("--mode", default="inline", help=argparse.SUPPRESS)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        _child(args)
+        return
+
+    results = []
+    for mode in ("inline", "thread", "process"):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite+aiosqlite:///{tmp}/bench.db",
+                "LABEL_POOL_MODE": "thread" if mode == "inline" else mode,
+                "LABEL_POOL_WORKERS": str(args.workers),
+                "SQL_INSTRUMENTATION": "0",
+            }
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", "--mode", mode,
+                 "--labels", str(args.labels), "--interval-ms", str(args.interval_ms)],
+                env=env, capture_output=True, text=True, cwd=str(ROOT),
+            )
+            line = next((l for l in proc.stdout.splitlines() if l.startswith("BENCH_RESULT ")), None)
+            if line is None:
+                print(proc.stdout[-2000:], proc.stderr[-2000:], sep="\n")
+                raise SystemExit(f"bench child failed (mode={mode})")
+            results.append(json.loads(line.split(" ", 1)[1]))
+
+    print(f"{'mode':<18}{'elapsed s':>10}{'scans':>7}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'depth':>8}")
+    for r in results:
+        print(f"{r['mode']:<18}{r['elapsed_s']:>10}{r['scans']:>7}{r['scan_p50_ms']:>10}{r['scan_p99_ms']:>10}"
+              f"{r['scan_max_ms']:>10}{r['max_depth']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# path: backend/scripts/bench_skip_conflicts.py
+"""
+Concurrent driver actions on ONE skip: checks the version compare-and-set
+loses no updates, and reports how many conflicts / retries it took.
+
+After a deliver-empty, N relocate-empty calls (each to its own zone) are
+fired at the same skip at once, in-process via httpx's ASGITransport. Then:
+
+- every 201 left exactly one movement and one version bump
+- exactly one placement is open, in the zone the skip says it is in, and
+  skips.current_placement_id points at it (when the placement model
+  resolves; otherwise the driver tracks zone_id only)
+- nothing failed with a 5xx; a 409 means DRIVER_CAS_MAX_ATTEMPTS ran out
+
+    python scripts/bench_skip_conflicts.py --actions 50
+
+Each mode (default engine, SQLITE_WAL_MODE) runs in a fresh subprocess
+because the engine is built at import.
+"""
+from __future__ import annotations
+
+from pathlib import Path; import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path: sys.path.insert(0, str(ROOT))
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import time
+from typing import Any, Dict, List
+
+
+async def _run_one(actions: int) -> Dict[str, Any]:
+    from fastapi import FastAPI
+    from httpx import AsyncClient, ASGITransport
+    from sqlalchemy import func, select
+
+    from app.db import engine, dispose_engines, SQLITE_WAL, AsyncSessionLocal
+    from app.models.base import Base
+    from app.models.skip import Skip
+    from app.models.driver import Movement, SkipPlacement
+    import app.models.labels  # noqa: F401  (register tables)
+    from app.api.driver import router as driver_router, _get_placement_model
+    from app.services.skip_versions import skip_versions
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as s:
+        skip = Skip(qr_code="CAS-0001")
+        s.add(skip)
+        await s.commit()
+        skip_id = skip.id
+
+    app = FastAPI()
+    app.include_router(driver_router, prefix="/driver")
+
+    codes: Dict[str, int] = {}
+    latencies: List[float] = []
+
+    async def call(ac: AsyncClient, url: str, body: Dict[str, Any]) -> None:
+        t0 = time.perf_counter()
+        try:
+            r = await ac.post(url, json=body)
+            key = str(r.status_code)
+        except Exception as e:
+            key = type(e).__name__
+        codes[key] = codes.get(key, 0) + 1
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=120) as ac:
+        await ac.post("/driver/deliver-empty", json={"skip_qr": "CAS-0001", "to_zone_id": "ZONE-START"})
+        t0 = time.perf_counter()
+        await asyncio.gather(*(
+            call(ac, "/driver/relocate-empty", {"skip_qr": "CAS-0001", "to_zone_id": f"ZONE-{i:03d}"})
+            for i in range(actions)
+        ))
+        elapsed = time.perf_counter() - t0
+
+    async with AsyncSessionLocal() as s:
+        skip = await s.get(Skip, skip_id)
+        moves = (await s.execute(
+            select(func.count()).select_from(Movement).where(Movement.skip_id == skip_id)
+        )).scalar_one()
+        tracked = _get_placement_model() is not None
+        open_rows = (await s.execute(
+            select(SkipPlacement.id, SkipPlacement.zone_id)
+            .where(SkipPlacement.skip_id == skip_id, SkipPlacement.removed_at.is_(None))
+        )).all() if tracked else [(None, skip.zone_id)]
+    await dispose_engines()
+
+    ok = codes.get("201", 0)
+    checks = {
+        "movements_match": moves == ok + 1,  # + the initial deliver-empty
+        "versions_match": skip.version == ok + 1,
+        "one_open_placement": len(open_rows) == 1,
+        "placement_matches_skip": [z for _, z in open_rows] == [skip.zone_id],
+        "pointer_matches": not tracked or [i for i, _ in open_rows] == [skip.current_placement_id],
+        "no_5xx": not any(k.startswith("5") or not k.isdigit() for k in codes),
+    }
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "mode": "wal+single-writer" if SQLITE_WAL else "default",
+        "actions": actions,
+        "codes": codes,
+        "elapsed_s": round(elapsed, 3),
+        "p50_ms": round(latencies[n // 2], 2) if n else None,
+        "p95_ms": round(latencies[int(n * 0.95) - 1], 2) if n else None,
+        "cas": skip_versions.stats(),
+        "checks": checks,
+        "ok": all(checks.values()),
+    }
+
+
+def _child(args: argparse.Namespace) -> None:
+    out = asyncio.run(_run_one(args.actions))
+    print("BENCH_RESULT " + json.dumps(out), flush=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--actions", type=int, default=50, help="simultaneous actions on the one skip")
+    ap.add_argument("--attempts", type=int, default=None, help="DRIVER_CAS_MAX_ATTEMPTS for the run")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        _child(args)
+        return
+
+    results = []
+    for wal in ("0", "1"):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite+aiosqlite:///{tmp}/bench.db",
+                "SQLITE_WAL_MODE": wal,
+                "SQL_INSTRUMENTATION": "0",
+            }
+            if args.attempts is not None:
+                env["DRIVER_CAS_MAX_ATTEMPTS"] = str(args.attempts)
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", "--actions", str(args.actions)],
+                env=env, capture_output=True, text=True, cwd=str(ROOT),
+            )
+            line = next((l for l in proc.stdout.splitlines() if l.startswith("BENCH_RESULT ")), None)
+            if line is None:
+                print(proc.stdout[-2000:], proc.stderr[-2000:], sep="\n")
+                raise SystemExit(f"bench child failed (SQLITE_WAL_MODE={wal})")
+            results.append(json.loads(line.split(" ", 1)[1]))
+
+    print(f"{'mode':<20}{'elapsed s':>10}{'p50 ms':>10}{'p95 ms':>10}{'conflicts':>11}{'retries':>9}{'409s':>6}  codes / lost updates")
+    for r in results:
+        cas = r["cas"]
+        failed = [k for k, v in r["checks"].items() if not v]
+        print(f"{r['mode']:<20}{r['elapsed_s']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{cas['conflicts']:>11}"
+              f"{cas['retries']:>9}{cas['exhausted']:>6}  {r['codes']} / {'none' if r['ok'] else failed}")
+    if not all(r["ok"] for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
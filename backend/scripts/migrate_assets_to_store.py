@@ -0,0 +1,125 @@
+# path: backend/scripts/migrate_assets_to_store.py
+"""
+Move asset blob bytes out of the database into the asset store
+(ASSET_STORE_DIR), or back with --to-db. Works in chunks, one commit each,
+so it can run against a live DB and be resumed after an interruption.
+
+    python scripts/migrate_assets_to_store.py              # DB -> files
+    python scripts/migrate_assets_to_store.py --dry-run
+    python scripts/migrate_assets_to_store.py --to-db      # files -> DB (before downgrading 0014)
+
+Blobs are written (and fsync'd) before their row is updated, so a crash
+leaves at most an orphan file for the GC sweep, never a row without bytes.
+"""
+from __future__ import annotations
+
+from pathlib import Path; import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path: sys.path.insert(0, str(ROOT))
+
+import argparse
+import asyncio
+import hashlib
+import time
+
+from sqlalchemy import select, update
+
+
+async def _to_store(chunk: int, dry_run: bool, verify: bool) -> None:
+    from app.db import AsyncSessionLocal, dispose_engines
+    from app.models.labels import AssetBlob
+    from app.services.asset_store import asset_store
+
+    if asset_store is None:
+        raise SystemExit("ASSET_STORE_BACKEND=db: nothing to move to")
+    moved = nbytes = 0
+    t0 = time.perf_counter()
+    async with AsyncSessionLocal() as s:
+        last = ""
+        while True:
+            rows = (
+                await s.execute(
+                    select(AssetBlob.sha256, AssetBlob.data)
+                    .where(AssetBlob.path.is_(None), AssetBlob.data.isnot(None), AssetBlob.sha256 > last)
+                    .order_by(AssetBlob.sha256)
+                    .limit(chunk)
+                )
+            ).all()
+            if not rows:
+                break
+            last = rows[-1].sha256
+            if dry_run:
+                moved += len(rows)
+                nbytes += sum(len(r.data) for r in rows)
+                continue
+            for sha, data in rows:
+                if verify and hashlib.sha256(data).hexdigest() != sha:
+                    print(f"skip {sha}: bytes do not match their hash", flush=True)
+                    continue
+                key = await asyncio.to_thread(asset_store.put, sha, bytes(data))
+                await s.execute(
+                    update(AssetBlob).where(AssetBlob.sha256 == sha, AssetBlob.path.is_(None))
+                    .values(path=key, data=None)
+                )
+                moved += 1
+                nbytes += len(data)
+            await s.commit()
+            print(f"... {moved} blobs, {nbytes / 1e6:.1f} MB", flush=True)
+    await dispose_engines()
+    verb = "would move" if dry_run else "moved"
+    print(f"{verb} {moved} blobs ({nbytes / 1e6:.1f} MB) to {asset_store.name} in {time.perf_counter() - t0:.1f}s")
+
+
+async def _to_db(chunk: int, dry_run: bool) -> None:
+    from app.db import AsyncSessionLocal, dispose_engines
+    from app.models.labels import AssetBlob
+    from app.services.asset_store import asset_store
+
+    if asset_store is None:
+        raise SystemExit("set ASSET_STORE_BACKEND/ASSET_STORE_DIR to the store to read from")
+    moved = missing = 0
+    async with AsyncSessionLocal() as s:
+        last = ""
+        while True:
+            rows = (
+                await s.execute(
+                    select(AssetBlob.sha256, AssetBlob.path)
+                    .where(AssetBlob.path.isnot(None), AssetBlob.sha256 > last)
+                    .order_by(AssetBlob.sha256)
+                    .limit(chunk)
+                )
+            ).all()
+            if not rows:
+                break
+            last = rows[-1].sha256
+            for sha, key in rows:
+                data = await asyncio.to_thread(asset_store.get, key)
+                if data is None:
+                    missing += 1
+                    print(f"missing object for {sha} ({key})", flush=True)
+                    continue
+                moved += 1
+                if not dry_run:
+                    await s.execute(update(AssetBlob).where(AssetBlob.sha256 == sha).values(data=data, path=None))
+            if not dry_run:
+                await s.commit()
+    await dispose_engines()
+    # objects stay on disk; POST /skips/_assets/gc sweeps them once they are unreferenced
+    print(f"{'would restore' if dry_run else 'restored'} {moved} blobs into the DB; {missing} missing")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--chunk", type=int, default=200, help="blobs per commit")
+    ap.add_argument("--to-db", action="store_true", help="move bytes from the store back into asset_blobs")
+    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--no-verify", action="store_true", help="skip re-hashing bytes before writing them out")
+    args = ap.parse_args()
+    if args.to_db:
+        asyncio.run(_to_db(args.chunk, args.dry_run))
+    else:
+        asyncio.run(_to_store(args.chunk, args.dry_run, not args.no_verify))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import uuid
+from types import SimpleNamespace
 from typing import AsyncGenerator
 
 import pytest
@@ -12,7 +13,7 @@ from sqlalchemy.ext.asyncio import (
 
 from app.main import app as fastapi_app
 from app.db import Base
-from app.api.deps import get_db
+from app.api.deps import get_db, get_read_db
 
 # Ensure models are registered on metadata
 import importlib
@@ -54,6 +55,7 @@ async def client(engine_fixture) -> AsyncGenerator[AsyncClient, None]:
             yield s
 
     fastapi_app.dependency_overrides[get_db] = override_get_session
+    fastapi_app.dependency_overrides[get_read_db] = override_get_session
 
     # httpx>=0.24 removed AsyncClient(app=...). Use ASGITransport instead.
     transport = ASGITransport(app=fastapi_app)
@@ -62,6 +64,38 @@ async def client(engine_fixture) -> AsyncGenerator[AsyncClient, None]:
 
     fastapi_app.dependency_overrides.clear()
 
+@pytest_asyncio.fixture
+async def labels(client, engine_fixture, tmp_path, monkeypatch):
+    """
+    `client` with label bytes in a temp asset store, the primary session
+    (AsyncSessionLocal) on the test engine and a stub renderer that records
+    the qr_codes it was asked for. Eager mode unless a test switches it.
+    """
+    from app.api import skips as skips_api
+    from app.services import asset_blobs
+    from app.services.asset_store import LocalDirStore
+    from app.services.lazy_labels import LazyLabels
+
+    ns = SimpleNamespace(
+        client=client,
+        factory=async_sessionmaker(engine_fixture, expire_on_commit=False, class_=AsyncSession),
+        store=LocalDirStore(tmp_path / "assets"),
+        renders=[],
+        png=lambda qr: b"\x89PNG " + qr.encode(),
+        pdf=lambda qr: b"%PDF-1.4 " + qr.encode(),
+        key={"X-API-Key": skips_api._admin_key_expected()},
+    )
+
+    async def render(qr_text: str, qr_code: str, org_name: str):
+        ns.renders.append(qr_code)
+        return ns.png(qr_code), ns.pdf(qr_code)
+
+    monkeypatch.setattr(asset_blobs, "asset_store", ns.store)
+    monkeypatch.setattr(skips_api, "AsyncSessionLocal", ns.factory)
+    monkeypatch.setattr(skips_api.label_pool, "render", render)
+    monkeypatch.setattr(skips_api, "lazy_labels", LazyLabels("eager"))
+    yield ns
+
 @pytest.fixture
 def seeded():
     from app.models import models as m
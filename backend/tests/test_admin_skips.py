@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api import skips_demo
+from app.api.deps import get_db, get_read_db
+from app.models.skip import Skip
+
+pytestmark = pytest.mark.asyncio
+
+H_A = {"X-Admin-Key": skips_demo.settings.ADMIN_API_KEY}
+
+
+@pytest_asyncio.fixture
+async def admin(engine_fixture):
+    """/admin/skips on its own app (routes.py only mounts it with EXPOSE_ADMIN_ROUTES)."""
+    factory = async_sessionmaker(engine_fixture, expire_on_commit=False, class_=AsyncSession)
+
+    async def override():
+        async with factory() as s:
+            yield s
+
+    app = FastAPI()
+    app.include_router(skips_demo.router)
+    app.dependency_overrides[get_db] = override
+    app.dependency_overrides[get_read_db] = override
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac, factory
+
+
+async def _seed(factory, n: int, **values) -> list[str]:
+    t0 = datetime(2026, 1, 1)
+    async with factory() as s:
+        skips = [Skip(qr_code=f"ADM-{i:03d}", created_at=t0 + timedelta(minutes=i), **values) for i in range(n)]
+        s.add_all(skips)
+        await s.commit()
+        return [k.id for k in skips]
+
+
+async def test_list_keeps_bare_list_shape(admin):
+    ac, factory = admin
+    await _seed(factory, 5)
+
+    r = await ac.get("/admin/skips?limit=2", headers=H_A)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert isinstance(body, list) and [s["qr_code"] for s in body] == ["ADM-004", "ADM-003"]
+    assert r.headers["X-Next-Cursor"]
+
+    # explicit paging: follow next_cursor to the end
+    seen, cursor = [], None
+    while True:
+        q = f"&cursor={cursor}" if cursor else "&page=true"
+        r = await ac.get(f"/admin/skips?limit=2{q}", headers=H_A)
+        assert r.status_code == 200, r.text
+        seen += [s["qr_code"] for s in r.json()["items"]]
+        cursor = r.json()["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"ADM-{i:03d}" for i in range(4, -1, -1)]
+
+    assert (await ac.get("/admin/skips")).status_code == 401
+
+
+async def test_smoke_counts_all_rows_and_live_skips(client, session):
+    from app.services import skip_summary
+
+    t0 = datetime(2026, 1, 1)
+    skips = [Skip(qr_code=f"SMK-{i}", created_at=t0) for i in range(3)]
+    skips[0].deleted_at = t0
+    session.add_all(skips)
+    await session.commit()
+    await skip_summary.rebuild(session)
+    await session.commit()
+
+    r = await client.get("/skips/__smoke")
+    assert r.status_code == 200, r.text
+    assert r.json()["skips"] == 3
+    assert r.json()["live_skips"] == 2
+
+
+async def test_hard_delete_refuses_skips_with_history(admin):
+    from sqlalchemy import func
+    from app.models.driver import Movement, MovementType
+
+    ac, factory = admin
+    kept, gone = await _seed(factory, 2)
+    async with factory() as s:
+        s.add(Movement(skip_id=kept, type=MovementType.DELIVERY_EMPTY, to_zone_id="Z1"))
+        await s.commit()
+
+    r = await ac.delete(f"/admin/skips/{kept}?hard=true", headers=H_A)
+    assert r.status_code == 409, r.text
+    assert "movements" in r.json()["detail"]
+    r = await ac.delete(f"/admin/skips/{gone}?hard=true", headers=H_A)
+    assert r.status_code == 200 and r.json()["hard"] is True, r.text
+
+    async with factory() as s:
+        assert await s.get(Skip, kept) is not None
+        assert await s.get(Skip, gone) is None
+        assert (await s.execute(select(func.count()).select_from(Movement))).scalar_one() == 1
+
+
+async def test_placement_pointer_verify_and_repair(admin):
+    from app.models.driver import SkipPlacement
+
+    ac, factory = admin
+    a, b, c, d = await _seed(factory, 4)
+    t0 = datetime(2026, 2, 1)
+
+    def P(pid: str, sid: str, h: int, closed: bool = False) -> SkipPlacement:
+        return SkipPlacement(
+            id=pid, skip_id=sid, zone_id="Z", placed_at=t0 + timedelta(hours=h),
+            removed_at=t0 + timedelta(hours=h + 1) if closed else None,
+        )
+
+    async with factory() as s:
+        s.add_all([
+            P("a1", a, 0), P("a2", a, 2),        # two open, no pointer
+            P("b1", b, 0, closed=True),          # pointer to a closed one
+            P("c1", c, 0), P("c2", c, 3),        # pointer to the older of two open
+            P("d1", d, 0, closed=True), P("d2", d, 2),
+        ])
+        await s.flush()
+        for sid, ptr in ((b, "b1"), (c, "c1"), (d, "d2")):
+            (await s.get(Skip, sid)).current_placement_id = ptr
+        await s.commit()
+
+    r = await ac.get("/admin/skips/placements/verify", headers=H_A)
+    assert r.status_code == 200, r.text
+    v = r.json()
+    assert (v["skips_with_duplicate_open"], v["pointer_missing"], v["pointer_dangling"], v["pointer_wrong"]) == (2, 1, 1, 1)
+    assert v["sample_skip_ids"] == sorted([a, b, c]) and v["repaired"] is False
+
+    r = await ac.post("/admin/skips/placements/repair", headers=H_A)
+    assert r.status_code == 200, r.text
+    assert (r.json()["placements_closed"], r.json()["pointers_fixed"]) == (2, 3)
+
+    v = (await ac.get("/admin/skips/placements/verify", headers=H_A)).json()
+    assert (v["skips_with_duplicate_open"], v["pointer_missing"], v["pointer_dangling"], v["pointer_wrong"]) == (0, 0, 0, 0)
+    async with factory() as s:
+        got = {k.id: (k.current_placement_id, k.version) for k in (await s.execute(select(Skip))).scalars()}
+        assert got == {a: ("a2", 1), b: (None, 1), c: ("c2", 1), d: ("d2", 0)}
+        # an extra open placement ends where the next one began
+        assert (await s.get(SkipPlacement, "a1")).removed_at == t0 + timedelta(hours=2)
+
+    assert (await ac.post("/admin/skips/placements/repair")).status_code == 401
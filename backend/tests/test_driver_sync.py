@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+from sqlalchemy import select
+
+from app.api import driver as driver_api
+from app.models.driver import DriverSyncAction, Movement, SkipPlacement
+from app.models.skip import Skip
+from app.models.skip_summary import SkipSummary
+from app.services import skip_summary
+from app.services.skip_cache import SkipRef, skip_cache
+
+pytestmark = pytest.mark.asyncio
+
+H_D = {"X-API-Key": os.environ.get("DRIVER_API_KEY", "driverapi")}
+
+
+def _a(key: str, type_: str, qr: str, **payload) -> dict:
+    return {"key": key, "type": type_, "payload": {"skip_qr": qr, **payload}}
+
+
+async def _seed(session, *qrs: str) -> None:
+    session.add_all([Skip(qr_code=qr) for qr in qrs])
+    await session.commit()
+
+
+async def test_sync_applies_in_request_order_per_skip(client, session):
+    await _seed(session, "SY-A", "SY-B")
+    actions = [
+        _a("a1", "deliver-empty", "SY-A", to_zone_id="Z1"),
+        _a("b1", "deliver-empty", "SY-B", to_zone_id="Z2"),
+        _a("a2", "relocate-empty", "SY-A", to_zone_id="Z3"),
+        _a("a3", "collect-full", "SY-A", gross_kg=900, tare_kg=400),
+    ]
+    r = await client.post("/driver/sync", json={"actions": actions}, headers=H_D)
+    assert r.status_code == 200, r.text
+    out = r.json()
+    assert [x["key"] for x in out["results"]] == ["a1", "b1", "a2", "a3"]
+    assert out["applied"] == 4 and out["failed"] == out["skipped"] == 0
+    assert out["results"][2]["result"]["from_zone_id"] == "Z1"
+    assert out["results"][3]["result"]["weight_net_kg"] == 500.0
+
+    session.expire_all()
+    a = (await session.execute(select(Skip).where(Skip.qr_code == "SY-A"))).scalar_one()
+    b = (await session.execute(select(Skip).where(Skip.qr_code == "SY-B"))).scalar_one()
+    assert (a.status, a.zone_id) == ("in_transit", None)
+    assert (b.status, b.zone_id) == ("deployed", "Z2")
+    moves = (await session.execute(select(Movement.to_zone_id).where(Movement.skip_id == a.id).order_by(Movement.when))).scalars().all()
+    assert moves == ["Z1", "Z3", None]
+
+
+async def test_sync_replay_reports_duplicates(client, session):
+    await _seed(session, "SY-D")
+    actions = [
+        _a("d1", "deliver-empty", "SY-D", to_zone_id="Z1"),
+        _a("d1", "deliver-empty", "SY-D", to_zone_id="Z9"),  # same key twice in one batch
+    ]
+    first = (await client.post("/driver/sync", json={"actions": actions}, headers=H_D)).json()
+    assert [x["status"] for x in first["results"]] == ["applied", "duplicate"]
+
+    again = (await client.post("/driver/sync", json={"actions": actions[:1]}, headers=H_D)).json()
+    assert again["results"][0]["status"] == "duplicate"
+    assert again["results"][0]["result"] == first["results"][0]["result"]
+    rows = (await session.execute(select(DriverSyncAction.key))).scalars().all()
+    assert rows == ["d1"]
+    assert len((await session.execute(select(Movement))).scalars().all()) == 1
+
+
+async def test_sync_failed_action_holds_back_the_rest_of_its_skip(client, session):
+    await _seed(session, "SY-F", "SY-G", "SY-H")
+    actions = [
+        _a("f1", "deliver-empty", "SY-F", to_zone_id="Z1"),
+        _a("f2", "relocate-empty", "SY-F"),                    # no zone: 400
+        _a("f3", "relocate-empty", "SY-F", to_zone_id="Z2"),
+        _a("g1", "collect-full", "SY-G"),                      # never deployed: 400, nothing applied
+        _a("g2", "deliver-empty", "SY-G", to_zone_id="Z1"),
+        _a("h1", "deliver-empty", "SY-H", to_zone_id="Z5"),    # other skips carry on
+        _a("x1", "deliver-empty", "SY-NOPE", to_zone_id="Z1"),
+    ]
+    r = await client.post("/driver/sync", json={"actions": actions}, headers=H_D)
+    assert r.status_code == 200, r.text
+    got = [(x["key"], x["status"], x["code"]) for x in r.json()["results"]]
+    assert got == [
+        ("f1", "applied", 201), ("f2", "failed", 400), ("f3", "skipped", 424),
+        ("g1", "failed", 400), ("g2", "skipped", 424),
+        ("h1", "applied", 201), ("x1", "failed", 404),
+    ]
+    assert r.json()["results"][2]["detail"] == "after failed action f2"
+
+    session.expire_all()
+    zones = dict((await session.execute(select(Skip.qr_code, Skip.zone_id))).all())
+    assert zones == {"SY-F": "Z1", "SY-G": None, "SY-H": "Z5"}
+    keys = sorted((await session.execute(select(DriverSyncAction.key))).scalars().all())
+    assert keys == ["f1", "h1"]
+
+    # the held-back actions go through once resent after a fix
+    r = await client.post("/driver/sync", json={"actions": [actions[2], actions[4]]}, headers=H_D)
+    assert [x["status"] for x in r.json()["results"]] == ["applied", "applied"]
+
+
+async def test_sync_rolls_back_a_skip_whose_placement_write_fails(client, session, monkeypatch):
+    await _seed(session, "SY-P", "SY-Q")
+    real = driver_api._open_placement
+
+    def _open(db, *, skip, zone_id, **kw):
+        if zone_id == "Z2":
+            raise RuntimeError("disk full")
+        return real(db, skip=skip, zone_id=zone_id, **kw)
+
+    monkeypatch.setattr(driver_api, "_get_placement_model", lambda: SkipPlacement)
+    monkeypatch.setattr(driver_api, "_open_placement", _open)
+    actions = [
+        _a("p1", "deliver-empty", "SY-P", to_zone_id="Z1"),
+        _a("p2", "relocate-empty", "SY-P", to_zone_id="Z2"),
+        _a("q1", "deliver-empty", "SY-Q", to_zone_id="Z3"),
+    ]
+    r = await client.post("/driver/sync", json={"actions": actions}, headers=H_D)
+    assert r.status_code == 200, r.text
+    got = [(x["key"], x["status"], x["code"]) for x in r.json()["results"]]
+    assert got == [("p1", "failed", 500), ("p2", "failed", 500), ("q1", "applied", 201)]
+
+    # nothing of SY-P's transaction survives: no claim pointing at a missing placement
+    session.expire_all()
+    p = (await session.execute(select(Skip).where(Skip.qr_code == "SY-P"))).scalar_one()
+    assert (p.zone_id, p.current_placement_id, p.version) == (None, None, 0)
+    placed = (await session.execute(select(SkipPlacement.zone_id))).scalars().all()
+    assert placed == ["Z3"]
+    assert (await session.execute(select(DriverSyncAction.key))).scalars().all() == ["q1"]
+
+
+async def test_sync_rolls_back_a_move_whose_summary_update_fails(client, session, monkeypatch):
+    await _seed(session, "SY-S")
+    real = skip_summary.moved
+
+    async def _moved(db, before, after):
+        raise RuntimeError("lock timeout")
+
+    monkeypatch.setattr(skip_summary, "moved", _moved)
+    actions = [_a("s1", "deliver-empty", "SY-S", to_zone_id="Z1")]
+    r = await client.post("/driver/sync", json={"actions": actions}, headers=H_D)
+    assert [(x["status"], x["code"]) for x in r.json()["results"]] == [("failed", 500)]
+    session.expire_all()
+    s = (await session.execute(select(Skip).where(Skip.qr_code == "SY-S"))).scalar_one()
+    assert (s.status, s.zone_id, s.version) == ("in_stock", None, 0)
+
+    # the counters only ever move together with the skip
+    monkeypatch.setattr(skip_summary, "moved", real)
+    r = await client.post("/driver/sync", json={"actions": actions}, headers=H_D)
+    assert r.json()["results"][0]["status"] == "applied"
+    zones = dict((await session.execute(
+        select(SkipSummary.zone_id, SkipSummary.count).where(SkipSummary.status == "deployed")
+    )).all())
+    assert zones == {"Z1": 1}
+
+
+async def test_scan_batch_keeps_order_and_reads_the_cache_first(client, session, monkeypatch):
+    await _seed(session, "SC-A", "SC-B")
+    skip_cache.clear()
+    skip_cache.put("SC-A", SkipRef("cached-id", "deployed", "Z9"))  # must not be re-read
+
+    body = {"codes": ["SC-B", " SC-A ", "SC-NOPE", "SC-B", ""]}
+    r = await client.post("/driver/scan/batch", json=body, headers=H_D)
+    assert r.status_code == 200, r.text
+    out = r.json()
+    assert [(x["qr_code"], x["status"]) for x in out["items"]] == [("SC-B", "in_stock"), ("SC-A", "deployed")]
+    assert out["items"][1]["id"] == "cached-id"
+    assert out["not_found"] == ["SC-NOPE"]
+    assert skip_cache.get("SC-B") is not None  # filled from the primary read
+
+    assert (await client.post("/driver/scan/batch", json={"codes": [" "]}, headers=H_D)).status_code == 400
+    monkeypatch.setattr(driver_api.settings, "DRIVER_SCAN_BATCH_MAX", 2)
+    r = await client.post("/driver/scan/batch", json={"codes": ["1", "2", "3"]}, headers=H_D)
+    assert r.status_code == 413
+    skip_cache.clear()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import app.main as main
+from app.core import health
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(autouse=True)
+def fresh_health(monkeypatch):
+    monkeypatch.setattr(health, "_STATE", {**health._STATE, "ok": False, "consecutive_failures": 0})
+    monkeypatch.setattr(health, "_checked_mono", None)
+    monkeypatch.setattr(health, "_pinger_task", None)
+    monkeypatch.setattr(health, "_pinger_stop", None)
+    monkeypatch.setattr(health, "_interval", 0.0)
+
+
+@pytest_asyncio.fixture
+async def broken(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'x.db'}")
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+async def _wait_for(cond, timeout: float = 2.0) -> None:
+    t0 = time.monotonic()
+    while not cond():
+        assert time.monotonic() - t0 < timeout
+        await asyncio.sleep(0.01)
+
+
+async def test_probes_answer_from_the_pinger_cache(engine_fixture, broken, client, monkeypatch):
+    health.start_pinger(engine_fixture, 0.05)
+    assert health.pinger_running()
+    await _wait_for(lambda: health._checked_mono is not None)
+
+    # the live engine is down, but /__health only reads the cached ping
+    monkeypatch.setattr(main, "fresh_read_engine", broken)
+    r = await client.get("/__health")
+    assert r.status_code == 200 and r.json()["ok"] is True
+    assert (await client.get("/__health/deep")).status_code == 503
+    assert (await client.get("/__health/live")).json()["pinger_running"] is True
+
+    await health.stop_pinger()
+    assert not health.pinger_running()
+
+
+async def test_failed_pings_count_and_go_stale(broken, monkeypatch):
+    for n in (1, 2):
+        st = await health.ping(broken)
+        assert (st["ok"], st["consecutive_failures"]) == (False, n)
+    assert st["last_error"].startswith("OperationalError")
+
+    assert health.db_state()["stale"] is False  # no pinger: never stale once checked
+    monkeypatch.setattr(health, "_interval", 1.0)
+    monkeypatch.setattr(health, "_checked_mono", time.monotonic() - 10)
+    assert health.db_state()["stale"] is True
+
+
+async def test_stop_lets_an_in_flight_ping_finish(engine_fixture, monkeypatch):
+    pinging, finished = asyncio.Event(), []
+
+    async def slow_ping(engine, timeout):
+        pinging.set()
+        await asyncio.sleep(0.2)
+        finished.append(True)
+        return {"ok": True}
+
+    monkeypatch.setattr(health, "ping", slow_ping)
+    health.start_pinger(engine_fixture, 0.01)
+    await asyncio.wait_for(pinging.wait(), 2)
+    await health.stop_pinger(grace=2)
+    assert finished == [True]  # not cancelled mid-checkout
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, HTTPException, Request
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db import Base
+from app.middleware_idempotency import IdempotencyMiddleware
+from app.services.idempotency import IdempotencyStore, InFlight, Stored
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def wal_engines(tmp_path):
+    """SQLite WAL layout: one writer connection plus a read-only pool on the same file."""
+    path = (tmp_path / "idem.db").as_posix()
+    writer = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=1, max_overflow=0, pool_timeout=0.5)
+    reader = create_async_engine(f"sqlite+aiosqlite:///file:{path}?mode=ro&uri=true")
+    async with writer.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield writer, reader
+    finally:
+        await writer.dispose()
+        await reader.dispose()
+
+
+async def test_replay_lookup_does_not_need_the_writer(wal_engines):
+    writer, reader = wal_engines
+    store = IdempotencyStore(maxsize=0, ttl_s=60, lease_s=60)  # no LRU: every claim reads the table
+
+    assert await store.claim(writer, "k1", reader) is None
+    await store.complete(writer, "k1", Stored(201, [("content-type", "application/json")], b"{}", "fp"))
+
+    # a long write transaction holds the only writer connection
+    async with writer.connect() as held:
+        await held.begin()
+        entry = await asyncio.wait_for(store.claim(writer, "k1", reader), timeout=2)
+        assert isinstance(entry, Stored) and entry.status == 201
+        await held.rollback()
+
+    assert await store.claim(writer, "k2", reader) is None
+    assert isinstance(await store.claim(writer, "k2", reader), InFlight)
+    assert store.stats()["db_hits"] == 1
+
+
+async def test_middleware_replays_and_checks_the_body(wal_engines):
+    writer, reader = wal_engines
+    calls = {"orders": 0, "ping": 0, "boom": 0}
+    app = FastAPI()
+
+    @app.post("/orders", status_code=201)
+    async def orders(request: Request):
+        calls["orders"] += 1
+        return {"n": calls["orders"], "body": await request.json()}
+
+    @app.post("/ping")
+    async def ping():  # never reads its body
+        calls["ping"] += 1
+        return {"n": calls["ping"]}
+
+    @app.post("/boom")
+    async def boom():
+        calls["boom"] += 1
+        raise RuntimeError("down")
+
+    store = IdempotencyStore(maxsize=0, ttl_s=60, lease_s=60)
+    app.add_middleware(IdempotencyMiddleware, engine=writer, store=store, read_engine=reader)
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        k = {"Idempotency-Key": "o-1"}
+        first = await ac.post("/orders", json={"qty": 1}, headers=k)
+        again = await ac.post("/orders", json={"qty": 1}, headers=k)
+        assert first.status_code == again.status_code == 201
+        assert again.json() == first.json() == {"n": 1, "body": {"qty": 1}}
+        assert again.headers["idempotent-replayed"] == "true"
+        assert (await ac.post("/orders", json={"qty": 2}, headers=k)).status_code == 422
+        assert (await ac.post("/orders", json={"qty": 2}, headers={"Idempotency-Key": "o-2"})).json()["n"] == 2
+
+        # the body was never read, so there is nothing to compare a retry with
+        k = {"Idempotency-Key": "p-1"}
+        assert (await ac.post("/ping", content=b"a", headers=k)).json() == {"n": 1}
+        r = await ac.post("/ping", content=b"b", headers=k)
+        assert r.json() == {"n": 1} and r.headers["idempotent-replayed"] == "true"
+
+        # a 5xx is not stored: the retry runs again
+        k = {"Idempotency-Key": "b-1"}
+        assert (await ac.post("/boom", headers=k)).status_code == 500
+        assert (await ac.post("/boom", headers=k)).status_code == 500
+    assert calls == {"orders": 2, "ping": 1, "boom": 2}
+
+
+async def test_middleware_does_not_store_a_retry_later_conflict(wal_engines):
+    writer, reader = wal_engines
+    calls = {"n": 0}
+    app = FastAPI()
+
+    @app.post("/relocate", status_code=201)
+    async def relocate():
+        calls["n"] += 1
+        if calls["n"] == 1:  # what _retry_on_conflict answers once its attempts are used up
+            raise HTTPException(409, "skip was changed by a concurrent action; retry")
+        if calls["n"] == 2:
+            raise HTTPException(404, "skip not found")
+        return {"n": calls["n"]}
+
+    store = IdempotencyStore(maxsize=0, ttl_s=60, lease_s=60)
+    app.add_middleware(IdempotencyMiddleware, engine=writer, store=store, read_engine=reader)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        k = {"Idempotency-Key": "r-1"}
+        assert (await ac.post("/relocate", headers=k)).status_code == 409
+        r = await ac.post("/relocate", headers=k)  # the handler runs again
+        assert r.status_code == 404 and "idempotent-replayed" not in r.headers
+        r = await ac.post("/relocate", headers=k)  # a 404 is an answer: stored
+        assert r.status_code == 404 and r.headers["idempotent-replayed"] == "true"
+    assert calls["n"] == 2
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import pytest
+
+import app.main as main
+from app.services.label_pool import LabelPool
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_warm_starts_the_workers_up_front():
+    pool = LabelPool("thread", workers=2, max_queue=4, timeout_s=5)
+    await pool.warm()
+    assert pool.active_mode == "thread"
+    assert pool._executor is not None
+    assert await pool.run(sum, [1, 2]) == 3
+    pool.shutdown()
+    assert pool._executor is None
+
+
+async def test_startup_warms_the_pool_and_shutdown_drains_before_stopping_it(monkeypatch):
+    calls: list[str] = []
+    pool = LabelPool("thread", workers=1, max_queue=4, timeout_s=5)
+
+    class Recorder:
+        async def warm(self):
+            calls.append("warm")
+            await pool.warm()
+
+        def shutdown(self):
+            calls.append("pool.shutdown")
+            pool.shutdown()
+
+        def __getattr__(self, name):
+            return getattr(pool, name)
+
+    async def none(*a, **kw):
+        return None
+
+    async def drain(*a, **kw):
+        calls.append("drain")
+        return {"ms": 0.0, "timed_out": False}
+
+    monkeypatch.setattr(main, "label_pool", Recorder())
+    monkeypatch.setattr(main.schema_registry, "ensure_schema", lambda *a, **kw: _async({"ok": False}))
+    monkeypatch.setattr(main.schema_registry, "start_reverify", lambda *a: None)
+    monkeypatch.setattr(main.lifecycle, "prewarm_all", lambda *a: _async({}))
+    monkeypatch.setattr(main.health_state, "ping", none)
+    monkeypatch.setattr(main.health_state, "start_pinger", lambda *a: None)
+    monkeypatch.setattr(main.idempotency, "start_sweeper", lambda *a: None)
+    monkeypatch.setattr(main.lifecycle, "mark_ready", lambda: calls.append("ready"))
+    monkeypatch.setattr(main.lifecycle, "drain", drain)
+    monkeypatch.setattr(main.lifecycle, "mark_stopped", lambda: calls.append("stopped"))
+    monkeypatch.setattr(main, "dispose_engines", none)
+
+    await main._startup()
+    assert calls == ["warm", "ready"]
+    assert pool._executor is not None
+    await main._shutdown()
+    assert calls[2:] == ["drain", "pool.shutdown", "stopped"]
+    assert pool._executor is None
+
+
+async def _async(value):
+    return value
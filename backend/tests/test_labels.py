@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select, text
+
+from app.api import skips as skips_api
+from app.core import timeouts
+from app.models.labels import AssetBlob, LabelIntent, SkipAsset
+from app.models.skip import Skip
+from app.services import asset_blobs
+from app.services.lazy_labels import LazyLabels
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _skip_with_labels(labels, qr: str = "LBL-1") -> str:
+    async with labels.factory() as s:
+        skip = Skip(qr_code=qr)
+        s.add(skip)
+        await s.flush()
+        await skips_api._store_label_assets(s, [(str(skip.id), labels.png(qr), labels.pdf(qr))])
+        await s.commit()
+        return str(skip.id)
+
+
+async def test_lost_object_is_re_rendered(labels):
+    ac = labels.client
+    sid = await _skip_with_labels(labels)
+    for key, _ in list(labels.store.keys()):
+        labels.store.delete(key)  # a redeploy onto an empty disk
+
+    r = await ac.get(f"/skips/{sid}/labels.pdf", headers=labels.key)
+    assert r.status_code == 200, r.text
+    assert r.content == labels.pdf("LBL-1")
+    assert labels.renders == ["LBL-1"]
+    assert skips_api.lazy_labels.relabels == 1
+
+    # the same bytes hash to the same blob: the object is back, refcounts unchanged
+    r = await ac.get(f"/skips/{sid}/labels/2.png", headers=labels.key)
+    assert r.status_code == 200 and r.content == labels.png("LBL-1")
+    assert labels.renders == ["LBL-1"]
+    async with labels.factory() as s:
+        refs = dict((await s.execute(select(AssetBlob.content_type, AssetBlob.refcount))).all())
+        assert refs == {"image/png": 3, "application/pdf": 1}
+        assert (await s.execute(select(func.count()).select_from(SkipAsset))).scalar_one() == 4
+        assert (await s.execute(select(func.count()).select_from(LabelIntent))).scalar_one() == 0
+
+
+async def test_lazy_labels_render_once_on_first_request(labels, monkeypatch):
+    ac = labels.client
+    monkeypatch.setattr(skips_api, "lazy_labels", LazyLabels("lazy"))
+    async with labels.factory() as s:
+        skip = Skip(qr_code="LZY-1")
+        s.add(skip)
+        await s.flush()
+        sid = str(skip.id)
+        await skips_api._defer_label_assets(s, [(sid, "ACME")])
+        await s.commit()
+
+    first = await asyncio.gather(*(ac.get(f"/skips/{sid}/labels.pdf", headers=labels.key) for _ in range(3)))
+    assert [r.status_code for r in first] == [200] * 3
+    assert all(r.content == labels.pdf("LZY-1") for r in first)
+    r = await ac.get(f"/skips/{sid}/labels/1.png", headers=labels.key)
+    assert r.status_code == 200 and r.content == labels.png("LZY-1")
+
+    assert labels.renders == ["LZY-1"]
+    stats = skips_api.lazy_labels.stats()
+    assert stats["renders"] == 1 and stats["coalesced"] == 2
+    async with labels.factory() as s:
+        assert await s.get(LabelIntent, sid) is None
+
+    r = await ac.get("/skips/00000000-0000-0000-0000-000000000000/labels.pdf", headers=labels.key)
+    assert r.status_code == 404
+
+
+@pytest.mark.parametrize("in_store", [True, False], ids=["file", "db"])
+async def test_label_etag_304_and_range(labels, monkeypatch, in_store):
+    if not in_store:
+        monkeypatch.setattr(asset_blobs, "asset_store", None)  # ASSET_STORE_BACKEND=db
+    ac = labels.client
+    sid = await _skip_with_labels(labels)
+    pdf = labels.pdf("LBL-1")
+    url = f"/skips/{sid}/labels.pdf"
+
+    r = await ac.get(url, headers=labels.key)
+    assert r.status_code == 200 and r.content == pdf
+    etag = r.headers["etag"]
+    assert etag == f'"{asset_blobs.digest(pdf)}"'
+    assert "immutable" in r.headers["cache-control"]
+
+    for inm in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        r = await ac.get(url, headers={**labels.key, "If-None-Match": inm})
+        assert r.status_code == 304 and r.content == b"" and r.headers["etag"] == etag
+    r = await ac.get(url, headers={**labels.key, "If-None-Match": '"other"'})
+    assert r.status_code == 200
+
+    r = await ac.get(url, headers={**labels.key, "Range": "bytes=2-5"})
+    assert r.status_code == 206 and r.content == pdf[2:6]
+    assert r.headers["content-range"] == f"bytes 2-5/{len(pdf)}"
+    r = await ac.get(url, headers={**labels.key, "Range": "bytes=-3"})
+    assert r.status_code == 206 and r.content == pdf[-3:]
+    # a stale validator gets the whole (current) representation
+    r = await ac.get(url, headers={**labels.key, "Range": "bytes=2-5", "If-Range": '"stale"'})
+    assert r.status_code == 200 and r.content == pdf
+    r = await ac.get(url, headers={**labels.key, "Range": f"bytes={len(pdf) + 10}-"})
+    assert r.status_code == 416
+
+
+async def test_label_sheet(labels, monkeypatch):
+    from app.services.qr_labels import make_qr_png
+
+    monkeypatch.setattr(labels, "png", lambda qr: make_qr_png(qr))  # the sheet embeds the cached PNG
+    ac = labels.client
+    cached = await _skip_with_labels(labels, "SHT-1")
+    async with labels.factory() as s:
+        bare = Skip(qr_code="SHT-2")
+        s.add(bare)
+        await s.commit()
+        bare = str(bare.id)
+
+    body = {"skip_ids": [bare, cached, bare, "no-such-skip"], "cols": 1, "rows": 1}
+    r = await ac.post("/skips/labels/sheet", json=body, headers=labels.key)
+    assert r.status_code == 200, r.text
+    assert r.content.startswith(b"%PDF") and r.headers["content-type"] == "application/pdf"
+    assert (r.headers["x-label-count"], r.headers["x-page-count"]) == ("2", "2")
+
+    r = await ac.post("/skips/labels/sheet", json={"status": "in_stock"}, headers=labels.key)
+    assert r.status_code == 200 and r.headers["x-label-count"] == "2"
+    r = await ac.post("/skips/labels/sheet", json={"cols": 2}, headers=labels.key)
+    assert r.status_code == 422
+    monkeypatch.setattr(skips_api.settings, "LABEL_SHEET_MAX_LABELS", 1)
+    r = await ac.post("/skips/labels/sheet", json={"status": "in_stock"}, headers=labels.key)
+    assert r.status_code == 413
+    assert labels.renders == []
+
+
+async def test_shared_render_survives_the_first_requester_leaving(engine_fixture):
+    timeouts.install_statement_timeouts(engine_fixture)
+    lazy = LazyLabels("lazy")
+    started, release = asyncio.Event(), asyncio.Event()
+    first_state: list = []
+
+    async def render() -> bool:
+        started.set()
+        await release.wait()
+        async with engine_fixture.connect() as conn:  # SQL after the first client left
+            await conn.execute(text("SELECT 1"))
+        return True
+
+    async def first_request() -> bool:
+        state, token = timeouts.begin_request()
+        first_state.append(state)
+        try:
+            return await lazy.run("sk-1", render)
+        finally:
+            timeouts.end_request(token)
+
+    first = asyncio.ensure_future(first_request())
+    await started.wait()
+    second = asyncio.ensure_future(lazy.run("sk-1", render))
+    await asyncio.sleep(0)
+
+    # what RequestDeadlineMiddleware does when the first GET's client disconnects
+    timeouts.client_gone(first_state[0])
+    first.cancel()
+    release.set()
+    assert await asyncio.wait_for(second, 2) is True
+    assert lazy.stats()["renders"] == 1 and lazy.stats()["errors"] == 0
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core import lifecycle
+from app.middleware_inflight import InFlightMiddleware
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(autouse=True)
+def fresh_lifecycle(monkeypatch):
+    # module-level process state: give each test its own "starting" process
+    monkeypatch.setattr(lifecycle, "_STATE", {
+        "phase": "starting", "prewarm": {}, "ready_after_s": None, "first_request": None, "drain": None,
+    })
+    monkeypatch.setattr(lifecycle, "_ready_mono", None)
+    monkeypatch.setattr(lifecycle, "_in_flight", 0)
+    monkeypatch.setattr(lifecycle, "_idle", None)
+
+
+@pytest_asyncio.fixture
+async def pooled(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'p.db'}", poolclass=AsyncAdaptedQueuePool, pool_size=3, max_overflow=2,
+    )
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+def slow_app():
+    """InFlightMiddleware around an app whose /slow waits for `gate`."""
+    gate = asyncio.Event()
+
+    async def app(scope, receive, send):
+        if scope["path"] == "/slow":
+            await gate.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    client = AsyncClient(transport=ASGITransport(app=InFlightMiddleware(app)), base_url="http://t")
+    return client, gate
+
+
+async def test_prewarm_opens_connections_up_to_the_pool_size(pooled):
+    out = await lifecycle.prewarm_all({"primary": pooled}, connections=10)
+    res = out["primary"]
+    assert (res["requested"], res["opened"], res["errors"]) == (10, 3, [])
+    pool = pooled.sync_engine.pool
+    assert (pool.checkedin(), pool.checkedout()) == (3, 0)  # held together, then all returned
+    assert lifecycle.lifecycle_state()["prewarm"] == out
+
+    assert (await lifecycle.prewarm(pooled, 0))["opened"] == 0
+
+
+async def test_first_request_ttfb_is_recorded_once(slow_app):
+    ac, gate = slow_app
+    lifecycle.mark_ready()
+    gate.set()
+    assert (await ac.get("/first")).status_code == 200
+    assert (await ac.get("/slow")).status_code == 200
+    first = lifecycle.lifecycle_state()["first_request"]
+    assert first["path"] == "/first"
+    assert first["ttfb_ms"] >= 0 and first["since_ready_s"] >= 0
+    assert lifecycle.in_flight() == 0
+
+
+async def test_drain_waits_for_in_flight_requests_and_refuses_new_ones(slow_app, pooled):
+    ac, gate = slow_app
+    lifecycle.mark_ready()
+    slow = asyncio.ensure_future(ac.get("/slow"))
+    while lifecycle.in_flight() == 0:
+        await asyncio.sleep(0)
+
+    drain = asyncio.ensure_future(lifecycle.drain({"primary": pooled}, deadline_s=5))
+    await asyncio.sleep(0.05)
+    assert lifecycle.phase() == "draining" and not drain.done()
+    r = await ac.get("/other")
+    assert r.status_code == 503 and r.headers["retry-after"] == "1"
+    assert (await ac.get("/__health/ready")).status_code == 200  # probes still answered
+
+    gate.set()
+    assert (await slow).status_code == 200
+    res = await asyncio.wait_for(drain, 2)
+    assert (res["timed_out"], res["abandoned_requests"], res["checked_out"]) == (False, 0, 0)
+
+
+async def test_drain_gives_up_at_the_deadline(slow_app, pooled):
+    ac, gate = slow_app
+    slow = asyncio.ensure_future(ac.get("/slow"))
+    while lifecycle.in_flight() == 0:
+        await asyncio.sleep(0)
+
+    res = await lifecycle.drain({"primary": pooled}, deadline_s=0.1)
+    assert (res["timed_out"], res["abandoned_requests"]) == (True, 1)
+    gate.set()
+    await slow
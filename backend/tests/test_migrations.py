@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import health as health_state
+from app.core import lifecycle, schema_registry
+
+pytestmark = pytest.mark.asyncio
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+def _alembic(url: str, *args: str) -> None:
+    # a subprocess: app.db reads DATABASE_URL at import, and this process has it imported
+    env = {**os.environ, "DATABASE_URL": url}
+    out = subprocess.run([sys.executable, "-m", "alembic", *args], cwd=BACKEND, env=env,
+                         capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr[-2000:]
+
+
+@pytest_asyncio.fixture
+async def migrated(tmp_path):
+    """A SQLite file built by `alembic upgrade head` only (no create_all)."""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'm.db'}"
+    _alembic(url, "upgrade", "head")
+    engine = create_async_engine(url)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+async def test_migrated_database_is_ready(migrated, client, monkeypatch):
+    monkeypatch.setattr(schema_registry, "_STATE", dict(schema_registry._STATE))
+    monkeypatch.setattr(health_state, "_STATE", dict(health_state._STATE))
+    monkeypatch.setattr(health_state, "_checked_mono", None)
+    monkeypatch.setattr(lifecycle, "is_ready", lambda: True)  # startup itself is not under test
+
+    st = await schema_registry.ensure_schema(migrated, create=False)  # what prod startup runs
+    assert st["errors"] == [] and st["missing_tables"] == []
+    assert (await health_state.ping(migrated))["ok"]
+
+    r = await client.get("/__health/ready")
+    assert r.status_code == 200, r.text
+    assert r.json()["schema_ok"] is True
+
+
+async def test_0016_normalises_legacy_asset_kinds(tmp_path):
+    path = tmp_path / "k.db"
+    url = f"sqlite+aiosqlite:///{path}"
+    _alembic(url, "upgrade", "0015_label_intents")
+    rows = [  # (id, kind, idx, content_type)
+        ("a1", "pdf", None, "application/pdf"),
+        ("a2", "png", 1, "image/png"),
+        ("a3", "label", 2, "image/png"),           # only content_type was right
+        ("a4", "labels_pdf", None, "application/pdf"),
+        ("a5", "photo", None, "image/jpeg"),       # not a label: left alone
+    ]
+    with sqlite3.connect(path) as db:
+        db.execute("INSERT INTO skips (id, qr_code, owner_org_id) VALUES ('s1', 'MIG-1', 'o1')")
+        db.executemany(
+            "INSERT INTO skip_assets (id, skip_id, kind, idx, content_type, bytes) VALUES (?, 's1', ?, ?, ?, x'00')",
+            rows,
+        )
+        db.execute("DROP INDEX ix_skip_assets_skip_kind")  # a create_all-then-stamp database
+
+    _alembic(url, "upgrade", "0016_normalise_asset_kinds")
+    with sqlite3.connect(path) as db:
+        kinds = dict(db.execute("SELECT id, kind FROM skip_assets"))
+        plan = db.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM skip_assets WHERE skip_id = 's1' AND kind = 'label_png' ORDER BY idx"
+        ).fetchall()
+    assert kinds == {"a1": "labels_pdf", "a2": "label_png", "a3": "label_png", "a4": "labels_pdf", "a5": "photo"}
+    assert any("ix_skip_assets_skip_kind" in str(r[-1]) for r in plan), plan
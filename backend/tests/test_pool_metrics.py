@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+from app import db
+from app.core import pool_metrics
+from app.core.pool_metrics import InstrumentedQueuePool, PoolMetrics
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def registered(tmp_path, monkeypatch):
+    """One engine built through the shared registry, kept out of the app's own."""
+    monkeypatch.setattr(db, "_ENGINES", {})
+    monkeypatch.setattr(pool_metrics, "_REGISTRY", {})
+    eng = db.create_engine_for(
+        make_url(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"), name="primary",
+        pool_size=1, max_overflow=0, pool_timeout=0.2,
+    )
+    try:
+        yield eng
+    finally:
+        await eng.dispose()
+
+
+async def test_registry_engine_counts_checkouts_waits_and_timeouts(registered, client):
+    assert db.get_engine("primary") is registered and db.engines() == {"primary": registered}
+    assert isinstance(registered.sync_engine.pool, InstrumentedQueuePool)
+    with pytest.raises(RuntimeError):
+        db.get_engine("replica")
+
+    async with registered.connect() as held:
+        await held.execute(text("select 1"))
+        with pytest.raises(PoolTimeout):  # pool_size=1, no overflow: the second caller waits, then gives up
+            async with registered.connect():
+                pass
+
+    m = pool_metrics.get_pool_metrics("primary").snapshot(registered.sync_engine.pool)
+    assert (m["connects"], m["checkouts"], m["checkins"], m["checkout_failures"]) == (1, 1, 1, 1)
+    assert m["last_failure"].startswith("TimeoutError")
+    assert m["wait_ms"]["count"] == 1 and sum(m["wait_ms"]["histogram"].values()) == 1
+    assert (m["pool"]["size"], m["pool"]["checkedout"]) == (1, 0)
+
+    # dispose() swaps in a new pool: it keeps counting into the same metrics
+    await registered.dispose()
+    async with registered.connect() as conn:
+        await conn.execute(text("select 1"))
+    assert pool_metrics.get_pool_metrics("primary").connects == 2
+
+    r = await client.get("/__debug/pool")
+    assert r.status_code == 200 and r.json()["primary"]["checkouts"] == 2
+
+
+async def test_wait_histogram_buckets():
+    m = PoolMetrics("t")
+    for ms in (0.5, 7, 7, 6000):
+        m.record_wait(ms)
+    snap = m.snapshot()["wait_ms"]
+    assert (snap["count"], snap["max"]) == (4, 6000)
+    hist = {k: v for k, v in snap["histogram"].items() if v}
+    assert hist == {"le_1ms": 1, "le_10ms": 2, "gt_5000ms": 1}
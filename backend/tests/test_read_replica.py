@@ -0,0 +1,107 @@
+# path: backend/tests/test_read_replica.py
+from __future__ import annotations
+
+import os
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.main import app as fastapi_app
+from app.api import deps
+from app.db import Base
+from app.models.skip import Skip
+
+pytestmark = pytest.mark.asyncio
+
+H_D = {"X-API-Key": os.environ.get("DRIVER_API_KEY", "driverapi")}
+
+
+@pytest_asyncio.fixture
+async def primary_and_replica(tmp_path, monkeypatch):
+    """Two SQLite files stand in for primary and (lagging) replica."""
+    engines = []
+    factories = []
+    for name in ("primary.db", "replica.db"):
+        eng = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}")
+        async with eng.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        engines.append(eng)
+        factories.append(async_sessionmaker(eng, expire_on_commit=False, class_=AsyncSession))
+
+    monkeypatch.setattr(deps, "SessionLocal", factories[0])
+    monkeypatch.setattr(deps, "ReadLocal", factories[1])
+    try:
+        yield factories[0], factories[1]
+    finally:
+        for eng in engines:
+            await eng.dispose()
+
+
+async def test_reads_go_to_replica_unless_pinned(primary_and_replica):
+    primary, _replica = primary_and_replica
+    async with primary() as s:
+        s.add(Skip(qr_code="QR-RR-1"))
+        await s.commit()
+
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        # replica has not seen the skip yet
+        r = await ac.get("/driver/scan?qr=QR-RR-1", headers=H_D)
+        assert r.status_code == 404, r.text
+
+        r = await ac.get("/driver/scan?qr=QR-RR-1", headers={**H_D, deps.DB_PIN_HEADER: "primary"})
+        assert r.status_code == 200, r.text
+
+
+async def test_collect_full_pins_client_to_primary(primary_and_replica):
+    primary, _replica = primary_and_replica
+    async with primary() as s:
+        s.add(Skip(qr_code="QR-RR-2"))
+        await s.commit()
+
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/driver/deliver-empty", headers=H_D, json={"skip_qr": "QR-RR-2", "to_zone_id": "ZONE_A"})
+        assert r.status_code == 201, r.text
+
+        r = await ac.post("/driver/collect-full", headers=H_D, json={"skip_qr": "QR-RR-2", "gross_kg": 900, "tare_kg": 400})
+        assert r.status_code == 201, r.text
+        assert r.headers.get(deps.DB_PIN_HEADER) == "primary"
+        wtn_url = r.json()["wtn_pdf_url"]
+
+        # cookie from collect_full routes the read-back to primary
+        r = await ac.get(f"{wtn_url}?format=html")
+        assert r.status_code == 200, r.text
+
+    # a fresh client without the pin reads the (stale) replica
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.get(f"{wtn_url}?format=html")
+        assert r.status_code == 404
+
+
+async def test_scan_does_not_cache_lagging_replica_reads(primary_and_replica, monkeypatch):
+    from app.services.skip_cache import skip_cache
+
+    monkeypatch.setattr(deps, "REPLICA_MAY_LAG", True)
+    for factory in primary_and_replica:
+        async with factory() as s:
+            s.add(Skip(qr_code="QR-RR-3"))
+            await s.commit()
+    skip_cache.clear()
+
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.get("/driver/scan?qr=QR-RR-3", headers=H_D)
+        assert r.status_code == 200, r.text
+        assert skip_cache.get("QR-RR-3") is None
+
+        r = await ac.post("/driver/scan/batch", headers=H_D, json={"codes": ["QR-RR-3"]})
+        assert r.status_code == 200, r.text
+        assert skip_cache.get("QR-RR-3") is None
+
+        # a read pinned to the primary is fresh enough to cache
+        r = await ac.get("/driver/scan?qr=QR-RR-3", headers={**H_D, deps.DB_PIN_HEADER: "primary"})
+        assert r.status_code == 200, r.text
+        assert skip_cache.get("QR-RR-3") is not None
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from app.core import sql_metrics, timeouts
+from app.middleware_deadline import RequestDeadlineMiddleware
+from app.middleware_sqltiming import SQLTimingMiddleware
+
+pytestmark = pytest.mark.asyncio
+
+
+def _app(*middleware) -> FastAPI:
+    router = APIRouter()
+
+    @router.get("/skips/{skip_id}/labels.pdf")
+    async def labels(skip_id: str):
+        return {"skip_id": skip_id}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    for mw in middleware:
+        app.add_middleware(mw)
+    return app
+
+
+async def test_sql_timing_keys_by_route_template():
+    sql_metrics.reset()
+    transport = ASGITransport(app=_app(SQLTimingMiddleware))
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        # a value equal to a fixed segment must not rewrite that segment
+        for skip_id in ("id0", "id1", "skips"):
+            r = await ac.get(f"/api/skips/{skip_id}/labels.pdf")
+            assert r.status_code == 200
+            assert r.headers["server-timing"].startswith("db;dur=")
+        await ac.get("/nope/1")
+        await ac.get("/nope/2")
+
+    routes = {r["route"]: r["requests"] for r in sql_metrics.top_routes(limit=100)}
+    assert routes == {"GET /api/skips/{skip_id}/labels.pdf": 3, "GET (unmatched)": 2}
+
+
+async def test_deadline_ewma_is_per_route_not_per_url():
+    timeouts.metrics.reset()
+    transport = ASGITransport(app=_app(RequestDeadlineMiddleware))
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        for i in range(5):
+            r = await ac.get(f"/api/skips/id{i}/labels.pdf")
+            assert r.status_code == 200
+
+    assert list(timeouts.metrics.route_ewma_ms) == ["GET /api/skips/{skip_id}/labels.pdf"]
+
+
+# long enough to notice if it is not interrupted, short enough not to hang the suite
+_SLOW_SQL = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 10000000) SELECT count(*) FROM c"
+)
+
+
+async def test_sqlite_statement_timeout_interrupts_the_query(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 't.db'}")
+    timeouts.install_statement_timeouts(engine)
+    try:
+        token = timeouts.set_statement_timeout(50)
+        try:
+            async with engine.connect() as conn:
+                t0 = time.perf_counter()
+                with pytest.raises(OperationalError) as err:
+                    await conn.execute(_SLOW_SQL)
+                assert timeouts.is_timeout_error(err.value)
+                assert time.perf_counter() - t0 < 2.0
+                # the timer went with the failed statement; the connection carries on
+                assert not conn.sync_connection.info.get("wms_interrupts")
+                assert (await conn.execute(text("select 1"))).scalar_one() == 1
+        finally:
+            timeouts.reset_statement_timeout(token)
+        assert timeouts.current_statement_timeout() == 0
+    finally:
+        await engine.dispose()
+
+
+async def test_postgres_statement_timeout_is_set_local_per_transaction():
+    assert event.contains(Session, "after_begin", timeouts._pg_set_local)
+    sent: list[str] = []
+
+    def conn(dialect: str) -> SimpleNamespace:
+        return SimpleNamespace(dialect=SimpleNamespace(name=dialect), exec_driver_sql=sent.append)
+
+    timeouts._pg_set_local(None, None, conn("postgresql"))  # no timeout for this request
+    token = timeouts.set_statement_timeout(1500)
+    try:
+        timeouts._pg_set_local(None, None, conn("sqlite"))
+        timeouts._pg_set_local(None, None, conn("postgresql"))
+    finally:
+        timeouts.reset_statement_timeout(token)
+    assert sent == ["SET LOCAL statement_timeout = 1500"]
+
+    pg_cancel = OperationalError("SELECT 1", {}, SimpleNamespace(sqlstate="57014"))
+    assert timeouts.is_timeout_error(pg_cancel)
+    assert not timeouts.is_timeout_error(OperationalError("SELECT 1", {}, Exception("disk I/O error")))
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from app.api import skips as skips_api
+from app.models.labels import SkipAsset
+from app.models.skip import Skip
+
+pytestmark = pytest.mark.asyncio
+
+ORG = str(uuid.uuid4())
+
+
+async def test_csv_import_reports_every_row(labels, monkeypatch):
+    monkeypatch.setattr(skips_api.settings, "SKIP_IMPORT_BATCH_SIZE", 2)
+    async with labels.factory() as s:
+        s.add(Skip(qr_code="IMP-OLD", owner_org_id=ORG))
+        await s.commit()
+
+    body = "\n".join([
+        "qr_code,owner_org_id,status",
+        f"IMP-1,{ORG},",
+        f"IMP-2,{ORG},in_stock",
+        f"IMP-1,{ORG},",          # repeated in the file
+        "IMP-3,not-a-uuid,",
+        f"IMP-OLD,{ORG},",        # already in the table
+        f"IMP-4,{ORG},NOPE",
+        f"IMP-5,{ORG},",
+    ])
+    r = await labels.client.post(
+        "/skips/import", content=body.encode(), headers={**labels.key, "Content-Type": "text/csv"}
+    )
+    assert r.status_code == 200, r.text
+    out = r.json()
+    assert (out["rows"], out["created"], out["exists"], out["duplicate"], out["invalid"]) == (7, 3, 1, 1, 2)
+    assert [x["result"] for x in out["results"]] == [
+        "created", "created", "duplicate", "invalid", "exists", "invalid", "created",
+    ]
+    assert sorted(labels.renders) == ["IMP-1", "IMP-2", "IMP-5"]
+
+    async with labels.factory() as s:
+        assert (await s.execute(select(func.count()).select_from(Skip))).scalar_one() == 4
+        assert (await s.execute(select(func.count()).select_from(SkipAsset))).scalar_one() == 12
+
+
+async def test_ndjson_import_without_labels(labels):
+    lines = [json.dumps({"qr_code": f"ND-{i}", "owner_org_id": ORG}) for i in range(3)] + ["[1]"]
+    r = await labels.client.post(
+        "/skips/import?labels=false", content="\n".join(lines).encode(),
+        headers={**labels.key, "Content-Type": "application/x-ndjson"},
+    )
+    assert r.status_code == 200, r.text
+    assert (r.json()["created"], r.json()["invalid"], r.json()["truncated"]) == (3, 1, False)
+    assert labels.renders == []
+
+    r = await labels.client.post("/skips/import", content=lines[0].encode())
+    assert r.status_code == 401
+
+
+async def test_import_over_the_row_limit_keeps_committed_batches(labels, monkeypatch):
+    monkeypatch.setattr(skips_api.settings, "SKIP_IMPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(skips_api.settings, "SKIP_IMPORT_MAX_ROWS", 3)
+    lines = [json.dumps({"qr_code": f"LIM-{i}", "owner_org_id": ORG}) for i in range(5)]
+    r = await labels.client.post(
+        "/skips/import?labels=false", content="\n".join(lines).encode(),
+        headers={**labels.key, "Content-Type": "application/x-ndjson"},
+    )
+    assert r.status_code == 200, r.text
+    out = r.json()
+    assert (out["rows"], out["created"], out["truncated"]) == (3, 3, True)
+    assert [x["qr_code"] for x in out["results"]] == ["LIM-0", "LIM-1", "LIM-2"]
+    async with labels.factory() as s:
+        qrs = (await s.execute(select(Skip.qr_code).order_by(Skip.qr_code))).scalars().all()
+        assert qrs == ["LIM-0", "LIM-1", "LIM-2"]
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api import driver
+from app.api.deps import get_db, get_read_db
+from app.db import Base
+from app.main import app as fastapi_app
+from app.models.driver import Movement, SkipPlacement
+from app.models.skip import Skip
+from app.services.skip_versions import SkipVersions, VersionConflict
+
+pytestmark = pytest.mark.asyncio
+
+H_D = {"X-API-Key": os.environ.get("DRIVER_API_KEY", "driverapi")}
+
+
+@pytest_asyncio.fixture
+async def file_db(tmp_path):
+    """A file database, so a second session really is a concurrent writer."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'cas.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    async def override():
+        async with factory() as s:
+            yield s
+
+    fastapi_app.dependency_overrides[get_db] = override
+    fastapi_app.dependency_overrides[get_read_db] = override
+    async with AsyncClient(transport=ASGITransport(app=fastapi_app), base_url="http://test") as ac:
+        yield ac, factory
+    fastapi_app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+def _racing(factory, times: int, max_attempts: int = 3) -> SkipVersions:
+    """SkipVersions whose first `times` bumps lose to another action committing first."""
+
+    class Racing(SkipVersions):
+        raced = 0
+
+        async def bump(self, db, skip, **values):
+            if self.raced < times:
+                self.raced += 1
+                async with factory() as other:
+                    await other.execute(update(Skip).where(Skip.id == skip.id).values(version=Skip.version + 1))
+                    await other.commit()
+            return await super().bump(db, skip, **values)
+
+    return Racing(max_attempts=max_attempts, backoff_ms=0)
+
+
+async def _seed(factory, qr: str) -> str:
+    async with factory() as s:
+        skip = Skip(qr_code=qr)
+        s.add(skip)
+        await s.commit()
+        return skip.id
+
+
+async def test_bump_is_a_compare_and_set(file_db):
+    _, factory = file_db
+    sid = await _seed(factory, "CAS-0")
+    versions = SkipVersions(max_attempts=1, backoff_ms=0)
+    async with factory() as a, factory() as b:
+        skip_a, skip_b = await a.get(Skip, sid), await b.get(Skip, sid)
+        assert await versions.bump(a, skip_a, zone_id="ZA") == 1
+        await a.commit()
+        with pytest.raises(VersionConflict):
+            await versions.bump(b, skip_b, zone_id="ZB")
+        await b.rollback()
+    async with factory() as s:
+        skip = await s.get(Skip, sid)
+        assert (skip.version, skip.zone_id) == (1, "ZA")
+
+
+async def test_conflict_is_retried_against_fresh_state(file_db, monkeypatch):
+    ac, factory = file_db
+    sid = await _seed(factory, "CAS-1")
+    versions = _racing(factory, times=2)
+    monkeypatch.setattr(driver, "skip_versions", versions)
+
+    r = await ac.post("/driver/deliver-empty", json={"skip_qr": "CAS-1", "to_zone_id": "Z1"}, headers=H_D)
+    assert r.status_code == 201, r.text
+    stats = versions.stats()
+    assert (stats["conflicts"], stats["retries"], stats["exhausted"]) == (2, 2, 0)
+    async with factory() as s:
+        skip = await s.get(Skip, sid)
+        assert (skip.version, skip.zone_id, skip.status) == (3, "Z1", "deployed")
+        assert (await s.execute(select(func.count()).select_from(Movement))).scalar_one() == 1
+
+
+async def test_conflicts_past_max_attempts_are_a_409(file_db, monkeypatch):
+    ac, factory = file_db
+    sid = await _seed(factory, "CAS-2")
+    versions = _racing(factory, times=99, max_attempts=3)
+    monkeypatch.setattr(driver, "skip_versions", versions)
+
+    r = await ac.post("/driver/deliver-empty", json={"skip_qr": "CAS-2", "to_zone_id": "Z1"}, headers=H_D)
+    assert r.status_code == 409, r.text
+    assert versions.stats()["by_action"] == {"deliver-empty": {"conflicts": 3, "retries": 2, "exhausted": 1}}
+    async with factory() as s:
+        skip = await s.get(Skip, sid)
+        assert (skip.version, skip.zone_id) == (3, None)  # only the other writer's bumps
+        assert (await s.execute(select(func.count()).select_from(Movement))).scalar_one() == 0
+
+
+async def test_collect_full_claims_the_skip_before_its_placement(file_db, monkeypatch):
+    ac, factory = file_db
+    monkeypatch.setattr(driver, "_get_placement_model", lambda: SkipPlacement)
+    sid = await _seed(factory, "CAS-3")
+    r = await ac.post("/driver/deliver-empty", json={"skip_qr": "CAS-3", "to_zone_id": "Z1"}, headers=H_D)
+    assert r.status_code == 201, r.text
+
+    writes: list[str] = []
+    engine = factory.kw["bind"].sync_engine
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            writes.append(statement.split()[1])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        r = await ac.post("/driver/collect-full", json={"skip_qr": "CAS-3", "net_kg": 10}, headers=H_D)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert r.status_code == 201, r.text
+    assert writes[:2] == ["skips", "skip_placements"]
+
+    async with factory() as s:
+        skip = await s.get(Skip, sid)
+        assert (skip.status, skip.zone_id, skip.current_placement_id) == ("in_transit", None, None)
+        open_ = (await s.execute(select(func.count()).select_from(SkipPlacement).where(SkipPlacement.removed_at.is_(None)))).scalar_one()
+        assert open_ == 0
+        mv = (await s.execute(select(Movement).where(Movement.id == r.json()["movement_id"]))).scalar_one()
+        assert mv.from_zone_id == "Z1"
+
+    # not deployed any more
+    r = await ac.post("/driver/collect-full", json={"skip_qr": "CAS-3"}, headers=H_D)
+    assert r.status_code == 400
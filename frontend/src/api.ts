@@ -192,6 +192,11 @@ export const api = {
       throw parseApiError(e);
     }
   },
+  // one round trip for a row of skips: { items: [{id, qr_code, status, zone_id}], not_found: [qr] }
+  scanBatch: (codes: string[]) =>
+    post("/driver/scan/batch", { codes }).catch((e) => {
+      throw parseApiError(e);
+    }),
   deliverEmpty: (p: { skip_qr: string; to_zone_id: string; driver_name: string; vehicle_reg?: string }) =>
     post("/driver/deliver-empty", p).catch((e) => {
       throw parseApiError(e);